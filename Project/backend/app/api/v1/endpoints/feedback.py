@@ -1,43 +1,91 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.database import SessionLocal
-from app.models.feedback import Feedback
-from app.utils.feedback_tags import generate_auto_tags
-from sqlalchemy import func
+from fastapi import APIRouter, BackgroundTasks, Body, HTTPException, Query
+from datetime import datetime
+from typing import Dict, List, Optional
+from app.config import Config
+from app.db.database import run_in_session
+from app.core.feedback_writer import (
+    prepare_feedback,
+    write_feedback,
+    after_feedback_write,
+    feedback_writer,
+)
+from app.core.feedback_stats import resolve_range, query_feedback_stats
+from app.core.response_cache import search_cache
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+
+async def store_feedback(rows: List[Dict], background_tasks: BackgroundTasks) -> str:
+    """
+    Write now (sync mode) or hand the rows to the write-behind queue.
+    """
+    if Config.FEEDBACK_WRITE_MODE == "write_behind":
+        try:
+            await feedback_writer.submit(rows)
+        except RuntimeError as e:
+            raise HTTPException(status_code=503, detail=str(e))
+        return "queued"
+
+    await run_in_session(write_feedback, rows)
+    # Before responding, so the client's next search is not served from cache
+    await search_cache.invalidate()
+    background_tasks.add_task(after_feedback_write, rows)
+    return "saved"
 
 
 @router.post("/feedback")
-def save_feedback(data: dict, db: Session = Depends(get_db)):
-    auto_tags = generate_auto_tags(data.get("reason", ""))
+async def save_feedback(data: dict, background_tasks: BackgroundTasks):
+    try:
+        row = prepare_feedback(data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    status = await store_feedback([row], background_tasks)
+
+    return {"message": f"Feedback {status}", "auto_tags": row["auto_tags"]}
 
-    feedback = Feedback(
-        candidate_id=data.get("candidate_id"),
-        feedback_type=data.get("feedback_type"),
-        reason=data.get("reason"),
-        auto_tags=auto_tags
-    )
 
-    db.add(feedback)
-    db.commit()
-    db.refresh(feedback)
+@router.post("/feedback/batch")
+async def save_feedback_batch(background_tasks: BackgroundTasks, items: List[dict] = Body(...)):
+    """
+    Many votes in one request, written with a single multi-row insert.
+    """
+    if len(items) > Config.FEEDBACK_BATCH_MAX:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {Config.FEEDBACK_BATCH_MAX} feedback records per batch"
+        )
 
-    return {"message": "Feedback saved", "auto_tags": auto_tags}
+    rows = []
+    for i, item in enumerate(items):
+        try:
+            rows.append(prepare_feedback(item))
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=f"Item {i}: {e}")
+
+    status = await store_feedback(rows, background_tasks) if rows else "saved"
+
+    return {
+        "message": f"Feedback {status}",
+        "count": len(rows),
+        "auto_tags": [row["auto_tags"] for row in rows]
+    }
 
 @router.get("/feedback/stats")
-def feedback_stats(db: Session = Depends(get_db)):
-    results = (
-        db.query(Feedback.auto_tags, func.count(Feedback.id))
-        .group_by(Feedback.auto_tags)
-        .all()
-    )
-
-    return results
\ No newline at end of file
+async def feedback_stats(
+    window: str = Query("7d", description="Trailing window, e.g. 24h or 7d (ignored when start is set)"),
+    start: Optional[datetime] = Query(None, description="Custom range start"),
+    end: Optional[datetime] = Query(None, description="Range end (default: now)"),
+    limit: int = Query(20, ge=1, le=100, description="Max tags and candidates returned")
+):
+    """
+    Up/down votes in a time window, read from the hourly/daily rollups:
+    totals, a per-bucket series, per-tag counts and the most voted candidates.
+    """
+    def load(db):
+        range_start, range_end = resolve_range(db, window, start, end)
+        return query_feedback_stats(db, range_start, range_end, limit)
+
+    try:
+        return await run_in_session(load)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
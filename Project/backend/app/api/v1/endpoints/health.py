@@ -1,6 +1,11 @@
 from fastapi import APIRouter
-from app.schemas.health import HealthCheckResponse
-from app.core.vector_search import vector_search
+from fastapi.responses import JSONResponse
+from app.schemas.health import HealthCheckResponse, ReadinessResponse
+from app.core.vector_search import peek_vector_search
+from app.core.search_pipeline import explanation_cache
+from app.core.response_cache import search_cache
+from app.core.lifecycle import readiness
+from app.core.feedback_writer import feedback_writer
 from app.config import Config
 
 
@@ -9,11 +14,39 @@ router = APIRouter()
 @router.get("/health", response_model=HealthCheckResponse, tags=["Health"])
 async def health_check():
 
-    qdrant_info = vector_search.get_collection_info()
+    # Liveness: never triggers the model load
+    vector_search = peek_vector_search()
+    if vector_search is None:
+        return {
+            "status": "healthy",
+            "version": Config.VERSION,
+            "qdrant": {"status": "starting"},
+            "explanation_cache": explanation_cache.stats(),
+            "search_cache": search_cache.stats(),
+            "feedback_writer": feedback_writer.stats(),
+        }
+
+    qdrant_info = await vector_search.get_collection_info()
     
 
     return {
         "status": "healthy",
         "version": Config.VERSION,
         "qdrant": qdrant_info,
-    }
\ No newline at end of file
+        "embedding_cache": vector_search.embedding_cache.stats(),
+        "embedding_batcher": vector_search.embedding_batcher.stats(),
+        "explanation_cache": explanation_cache.stats(),
+        "search_cache": search_cache.stats(),
+        "feedback_writer": feedback_writer.stats(),
+    }
+
+
+@router.get("/ready", response_model=ReadinessResponse, tags=["Health"])
+async def readiness_check():
+    """
+    200 once the encoder is loaded and warmed up, 503 before (or if warm-up failed).
+    """
+    snapshot = readiness.snapshot()
+    if not snapshot["ready"]:
+        return JSONResponse(status_code=503, content=snapshot)
+    return snapshot
@@ -1,126 +1,236 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+import json
 from typing import Dict
-from app.schemas.search import SearchRequest, SearchResponse
-from app.core.vector_search import vector_search
-from app.core.gemini import gemini_client
-from app.db.database import SessionLocal
-from app.core.feedback_optimizer import build_feedback_prompt_adjustment
-from app.core.ranking_optimizer import calculate_feedback_score
+from app.config import Config
+from app.schemas.search import (
+    SearchRequest,
+    SearchResponse,
+    SearchResultItem,
+    SearchPageResponse,
+    SearchExportRequest,
+)
+from app.core.search_pipeline import (
+    retrieve_ranked_candidates,
+    explain_candidates,
+    stream_candidate_explanations,
+    build_result_item,
+)
+from app.core.response_cache import search_cache, response_etag, etag_matches
+from app.core.search_pagination import first_page, next_page, SnapshotExpired
+from app.core.vector_search import require_vector_search, VectorSearchNotReady
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+def not_ready(e: Exception) -> HTTPException:
+    # The model is still loading in the background (see /ready)
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+
+def conditional_response(http_request: Request, body: Dict) -> Response:
+    """
+    JSON body with ETag and Cache-Control; 304 if the client already has it.
+    """
+    etag = response_etag(body)
+    headers = {"ETag": etag, "Cache-Control": Config.SEARCH_CACHE_CONTROL}
+
+    if etag_matches(http_request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=body, headers=headers)
 
 
 @router.post("/search", response_model=SearchResponse, tags=["Search"])
-async def search_candidates(
-    request: SearchRequest,
-    db: Session = Depends(get_db)
-):
+async def search_candidates(request: SearchRequest, http_request: Request):
     try:
 
         # ---------------------------------
-        # 1️⃣ Build Feedback Weights
+        # 0️⃣ Response Cache
         # ---------------------------------
-        feedback_weights: Dict[str, float] = {}
-
-        # Get broad set first
-        initial_candidates = vector_search.search_similar(
-            request.query,
-            top_k=100,
-            industry=request.industry,
-            salary_range=request.salary_range,
-            location_filter=request.location_filter
-        )
-
-        for candidate in initial_candidates:
-            candidate_id = candidate.get("id")
-            bonus = calculate_feedback_score(db, candidate_id)
-            feedback_weights[candidate_id] = 1 + bonus
+        cache_key = search_cache.request_key(request)
+        feedback_version = await search_cache.version()
+
+        cached = await search_cache.get(cache_key, feedback_version)
+        if cached is not None:
+            return conditional_response(http_request, {**cached, "query": request.query})
 
         # ---------------------------------
-        # 2️⃣ Final Vector Search (Weighted)
+        # 1️⃣ Retrieve + Feedback Re-rank
         # ---------------------------------
-        vector_result = vector_search.search_similar(
-            request.query,
-            top_k=request.top_k,
-            industry=request.industry,
-            salary_range=request.salary_range,
-            location_filter=request.location_filter,
-            feedback_weights=feedback_weights
-        )
+        ranked = await retrieve_ranked_candidates(request)
+        vector_result = ranked.candidates
 
         if not vector_result:
             raise HTTPException(status_code=404, detail="No candidates found")
 
         # ---------------------------------
-        # 3️⃣ Gemini Explanation
+        # 2️⃣ Gemini Explanation (cached)
         # ---------------------------------
-        feedback_adjustment = build_feedback_prompt_adjustment(db)
-        optimized_query = request.query + "\n" + feedback_adjustment
-
-        try:
-            explanation = gemini_client.generate_text(
-                optimized_query,
-                vector_result
-            ) or ""
-        except Exception:
-            explanation = ""
+        explanations = await explain_candidates(request.query, ranked)
 
         # ---------------------------------
-        # 4️⃣ Build Response
+        # 3️⃣ Build Response
         # ---------------------------------
-        items = []
-
-        for candidate in vector_result:
-
-            explanation_text = ""
-
-            if explanation:
-                parts = explanation.split("**")
-                for i in range(1, len(parts), 2):
-                    name = parts[i].strip()
-                    text = parts[i + 1].strip() if (i + 1) < len(parts) else ""
-                    if name == candidate.get("name"):
-                        explanation_text = text
-                        break
-
-            items.append({
-                "id": candidate.get("id"),
-                "name": candidate.get("name"),
-                "category": candidate.get("category"),
-                "industry": candidate.get("industry"),
-                "role": candidate.get("role"),
-                "role_en": candidate.get("role_en"),
-                "skills": candidate.get("skills", []),
-                "experience_years": candidate.get("experience_years"),
-                "education": candidate.get("education"),
-                "additional_education": candidate.get("additional_education", []),
-                "licenses": candidate.get("licenses", []),
-                "location": candidate.get("location"),
-                "languages": candidate.get("languages", []),
-                "salary": candidate.get("salary"),
-                "availability": candidate.get("availability"),
-                "applicable_tes": candidate.get("applicable_tes"),
-                "summary": candidate.get("summary"),
-                "qualification_issues": candidate.get("qualification_issues", []),
-                "match_score": candidate.get("score"),
-                "explanation": explanation_text
-            })
-
-        return {
+        items = [
+            build_result_item(candidate, explanations.get(candidate.get("id"), ""))
+            for candidate in vector_result
+        ]
+
+        body = jsonable_encoder(SearchResponse(query=request.query, results=items))
+
+        # A failed Gemini call leaves every explanation empty; don't pin that
+        if any(item["explanation"] for item in items):
+            await search_cache.put(cache_key, feedback_version, body)
+
+        return conditional_response(http_request, body)
+
+    except VectorSearchNotReady as e:
+        raise not_ready(e)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/search/stream", tags=["Search"])
+async def search_candidates_stream(request: SearchRequest):
+    """
+    NDJSON stream: one "results" event with the ranked candidates as soon as
+    retrieval finishes, then one "explanation" event per candidate as Gemini
+    produces it, then "done".
+    """
+    try:
+        ranked = await retrieve_ranked_candidates(request)
+    except VectorSearchNotReady as e:
+        raise not_ready(e)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not ranked.candidates:
+        raise HTTPException(status_code=404, detail="No candidates found")
+
+    items = [
+        SearchResultItem(**build_result_item(candidate))
+        for candidate in ranked.candidates
+    ]
+
+    async def events():
+        yield encode_event({
+            "type": "results",
             "query": request.query,
             "results": items
-        }
+        })
+
+        try:
+            async for candidate_id, explanation in stream_candidate_explanations(
+                request.query,
+                ranked
+            ):
+                yield encode_event({
+                    "type": "explanation",
+                    "id": candidate_id,
+                    "explanation": explanation
+                })
+        except Exception as e:
+            print("⚠️ Gemini streaming failed:")
+            import traceback
+            traceback.print_exc()
+            yield encode_event({"type": "error", "detail": str(e)})
+
+        yield encode_event({"type": "done"})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/search/page", response_model=SearchPageResponse, tags=["Search"])
+async def search_candidates_page(request: SearchRequest):
+    """
+    First page of a cursor-paginated search (top_k is the page size, at most
+    MAX_TOP_K). Follow next_cursor with GET /search/page; every page comes
+    from the same ranking snapshot. Snapshots live in Redis with
+    SEARCH_CACHE_BACKEND=redis, otherwise in the worker that created them:
+    with several workers and no sticky sessions, later pages may get 410.
+    """
+    try:
+        page = await first_page(request)
+    except VectorSearchNotReady as e:
+        raise not_ready(e)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not page["results"]:
+        raise HTTPException(status_code=404, detail="No candidates found")
+
+    return page
 
+
+@router.get("/search/page", response_model=SearchPageResponse, tags=["Search"])
+async def search_candidates_next_page(cursor: str = Query(..., description="next_cursor of the previous page")):
+    try:
+        return await next_page(cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except SnapshotExpired as e:
+        raise HTTPException(status_code=410, detail=str(e))
+    except VectorSearchNotReady as e:
+        raise not_ready(e)
     except Exception as e:
         import traceback
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/search/export", tags=["Search"])
+async def export_candidates(request: SearchExportRequest):
+    """
+    NDJSON, one candidate per line, read from Qdrant in SEARCH_EXPORT_BATCH_SIZE
+    batches with no Gemini step. Ranked by `query` when given (feedback boost
+    applies in server mode only), otherwise all matches in storage order.
+    """
+    limit = min(request.limit or Config.SEARCH_EXPORT_MAX, Config.SEARCH_EXPORT_MAX)
+
+    try:
+        vector_search = require_vector_search()
+    except VectorSearchNotReady as e:
+        raise not_ready(e)
+
+    batches = vector_search.iter_candidate_batches(
+        request.query,
+        limit=limit,
+        batch_size=Config.SEARCH_EXPORT_BATCH_SIZE,
+        industry=request.industry,
+        salary_range=request.salary_range,
+        location_filter=request.location_filter,
+        feedback_boost=Config.FEEDBACK_BOOST_MODE == "server"
+    )
+
+    async def rows():
+        try:
+            async for batch in batches:
+                lines = []
+                for candidate in batch:
+                    item = build_result_item(candidate)
+                    del item["explanation"]
+                    lines.append(encode_event({"ranking": candidate["ranking"], **item}))
+                yield "".join(lines)
+        except Exception as e:
+            print("⚠️ Candidate export failed:")
+            import traceback
+            traceback.print_exc()
+            # Status is already sent; mark the export as truncated
+            yield encode_event({"error": str(e)})
+
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="candidates.ndjson"'}
+    )
+
+
+def encode_event(event: dict) -> str:
+    return json.dumps(jsonable_encoder(event), ensure_ascii=False) + "\n"
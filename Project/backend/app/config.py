@@ -14,22 +14,114 @@ class Config:
     # Gemini AI Settings
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
     GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-flash')
+    # Approximate input tokens allowed for the candidate block of a prompt
+    GEMINI_PROMPT_TOKEN_BUDGET = int(os.getenv('GEMINI_PROMPT_TOKEN_BUDGET', 3000))
     # Qdrant Settings
     QDRANT_HOST = os.getenv('QDRANT_HOST', 'localhost')
     QDRANT_PORT = int(os.getenv('QDRANT_PORT', 6333))
     QDRANT_COLLECTION_NAME = os.getenv('QDRANT_COLLECTION_NAME', 'candidates')
+    # Candidate vector storage: "scalar" (int8), "binary" or "none" quantization,
+    # with full-precision originals on disk (quantized profiles only); applied when
+    # the collection is built
+    QDRANT_QUANTIZATION = os.getenv('QDRANT_QUANTIZATION', 'scalar')
+    QDRANT_ON_DISK_VECTORS = os.getenv('QDRANT_ON_DISK_VECTORS', 'true').lower() == 'true'
+    # Quantized search: fetch limit * oversampling candidates, then rescore with originals
+    QDRANT_SEARCH_OVERSAMPLING = float(os.getenv('QDRANT_SEARCH_OVERSAMPLING', 2.0))
+    QDRANT_SEARCH_RESCORE = os.getenv('QDRANT_SEARCH_RESCORE', 'true').lower() == 'true'
     # Embedding Settings
     EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'jinaai/jina-embeddings-v3')
+    # Matryoshka output size (32-1024); must match the collections, rebuild both after changing it
+    EMBEDDING_DIM = int(os.getenv('EMBEDDING_DIM', 1024))
+    # Query encoder backend: "torch" (reference) or "onnx" (ONNX Runtime, see
+    # scripts/export_onnx.py); intra-op threads per inference (0 = library default)
+    ENCODER_BACKEND = os.getenv('ENCODER_BACKEND', 'torch')
+    ENCODER_THREADS = int(os.getenv('ENCODER_THREADS', 0))
+    # Threads running encoder inference off the event loop
+    ENCODER_MAX_WORKERS = int(os.getenv('ENCODER_MAX_WORKERS', 2))
+    # Micro-batching of concurrent query embeddings
+    EMBEDDING_BATCH_WINDOW_MS = float(os.getenv('EMBEDDING_BATCH_WINDOW_MS', 5))
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv('EMBEDDING_BATCH_MAX_SIZE', 32))
+    # Query embedding cache (TTL in seconds, 0 = never expire; empty dir = memory only)
+    EMBEDDING_CACHE_SIZE = int(os.getenv('EMBEDDING_CACHE_SIZE', 2048))
+    EMBEDDING_CACHE_TTL = int(os.getenv('EMBEDDING_CACHE_TTL', 86400))
+    EMBEDDING_CACHE_DIR = os.getenv('EMBEDDING_CACHE_DIR', '')
+    EMBEDDING_CACHE_DISK_CAPACITY = int(os.getenv('EMBEDDING_CACHE_DISK_CAPACITY', 50000))
     TOP_K_RESULTS = 5
     MAX_TOP_K = 20
+    # Candidates retrieved once per search and re-ranked with feedback
+    SEARCH_CANDIDATE_POOL = int(os.getenv('SEARCH_CANDIDATE_POOL', 100))
+    # Feedback boost: "server" (feedback_score payload + Qdrant formula query)
+    # or "client" (Postgres rollup lookup + in-process re-rank)
+    FEEDBACK_BOOST_MODE = os.getenv('FEEDBACK_BOOST_MODE', 'server')
+    # Explanation mode: "single" (one prompt for all candidates) or
+    # "parallel" (bounded-concurrency small batches with structured JSON output)
+    EXPLANATION_MODE = os.getenv('EXPLANATION_MODE', 'single')
+    EXPLANATION_BATCH_SIZE = int(os.getenv('EXPLANATION_BATCH_SIZE', 1))
+    EXPLANATION_CONCURRENCY = int(os.getenv('EXPLANATION_CONCURRENCY', 5))
+    EXPLANATION_TIMEOUT = float(os.getenv('EXPLANATION_TIMEOUT', 20))
+    # Gemini explanation cache (exact + semantic tiers, TTL in seconds)
+    EXPLANATION_CACHE_SIZE = int(os.getenv('EXPLANATION_CACHE_SIZE', 1024))
+    EXPLANATION_SEMANTIC_CACHE_SIZE = int(os.getenv('EXPLANATION_SEMANTIC_CACHE_SIZE', 256))
+    EXPLANATION_CACHE_TTL = int(os.getenv('EXPLANATION_CACHE_TTL', 3600))
+    EXPLANATION_SEMANTIC_THRESHOLD = float(os.getenv('EXPLANATION_SEMANTIC_THRESHOLD', 0.95))
+    EXPLANATION_SEMANTIC_MIN_OVERLAP = float(os.getenv('EXPLANATION_SEMANTIC_MIN_OVERLAP', 0.5))
+    # Server worker processes (read by uvicorn and gunicorn as their default --workers)
+    WEB_CONCURRENCY = int(os.getenv('WEB_CONCURRENCY', 1))
+    # Whole /search responses, keyed on the normalized request + feedback version.
+    # "redis" (entries and version shared by all workers, SEARCH_CACHE_REDIS_URL),
+    # "memory" (per-worker LRU; default for a single worker only, since other workers'
+    # votes don't reach it: its TTL is capped at FEEDBACK_RULES_TTL) or "none"
+    SEARCH_CACHE_BACKEND = os.getenv('SEARCH_CACHE_BACKEND', 'memory' if WEB_CONCURRENCY <= 1 else 'none')
+    SEARCH_CACHE_SIZE = int(os.getenv('SEARCH_CACHE_SIZE', 1024))
+    SEARCH_CACHE_TTL = int(os.getenv('SEARCH_CACHE_TTL', 300))
+    SEARCH_CACHE_REDIS_URL = os.getenv('SEARCH_CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # Sent with /search responses; clients revalidate with If-None-Match (304 when unchanged)
+    SEARCH_CACHE_CONTROL = os.getenv('SEARCH_CACHE_CONTROL', 'private, no-cache')
+    # Cursor pagination (/search/page): ranked results kept per snapshot, and how
+    # long (seconds) a snapshot and its cursors live; stored in Redis with
+    # SEARCH_CACHE_BACKEND=redis, otherwise in process (cursors then need the same
+    # worker, i.e. a single worker or sticky sessions)
+    SEARCH_PAGE_DEPTH = int(os.getenv('SEARCH_PAGE_DEPTH', 500))
+    SEARCH_SNAPSHOT_TTL = int(os.getenv('SEARCH_SNAPSHOT_TTL', 900))
+    SEARCH_SNAPSHOT_SIZE = int(os.getenv('SEARCH_SNAPSHOT_SIZE', 256))
+    # NDJSON export (/search/export): row cap and Qdrant batch size
+    SEARCH_EXPORT_MAX = int(os.getenv('SEARCH_EXPORT_MAX', 10000))
+    SEARCH_EXPORT_BATCH_SIZE = int(os.getenv('SEARCH_EXPORT_BATCH_SIZE', 256))
     # Paths
     BASE_DIR = Path(__file__).resolve().parent.parent
     DATA_DIR = BASE_DIR / 'data'
     RAW_DIR = DATA_DIR / 'rawData'
     PROCESSED_DIR = DATA_DIR / 'processedData'
-    CANDIDATES_FILE = RAW_DIR / 'candidates.json'
+    # JSON array, NDJSON, or either gzip-compressed (*.gz)
+    CANDIDATES_FILE = Path(os.getenv('CANDIDATES_FILE', RAW_DIR / 'candidates.json'))
     QDRANT_COLLECTION_PROFESSIONALSTANDARD = os.getenv('QDRANT_COLLECTION_PROFESSIONALSTANDARD', 'professional_standards')
-    STANDARDS_FILE = RAW_DIR / 'professionalStandard.json'
+    STANDARDS_FILE = Path(os.getenv('STANDARDS_FILE', RAW_DIR / 'professionalStandard.json'))
+    # Bulk ingestion (scripts/setup_qdrant.py)
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 64))
+    INGEST_UPLOAD_WORKERS = int(os.getenv('INGEST_UPLOAD_WORKERS', 4))
+    INGEST_QUEUE_SIZE = int(os.getenv('INGEST_QUEUE_SIZE', 8))
+    INGEST_CHECKPOINT_DIR = DATA_DIR / 'checkpoints'
+    # Exported encoder (model.onnx, or model_int8.onnx when quantized)
+    ENCODER_ONNX_PATH = Path(os.getenv('ENCODER_ONNX_PATH', DATA_DIR / 'models' / 'jina-embeddings-v3' / 'model.onnx'))
+    # Feedback prompt rules: a tag's rule switches on once its down-votes (decayed with
+    # the half-life in days, 0 = no decay) reach the threshold; cached for TTL seconds
+    FEEDBACK_RULE_THRESHOLD = float(os.getenv('FEEDBACK_RULE_THRESHOLD', 1))
+    FEEDBACK_RULE_HALF_LIFE_DAYS = float(os.getenv('FEEDBACK_RULE_HALF_LIFE_DAYS', 0))
+    FEEDBACK_RULES_TTL = int(os.getenv('FEEDBACK_RULES_TTL', 60))
+    # Feedback writes: "sync" (one transaction per request) or "write_behind" (queued
+    # in process, flushed every FLUSH_SIZE rows / FLUSH_INTERVAL_MS and on shutdown)
+    FEEDBACK_WRITE_MODE = os.getenv('FEEDBACK_WRITE_MODE', 'sync')
+    FEEDBACK_FLUSH_SIZE = int(os.getenv('FEEDBACK_FLUSH_SIZE', 200))
+    FEEDBACK_FLUSH_INTERVAL_MS = float(os.getenv('FEEDBACK_FLUSH_INTERVAL_MS', 500))
+    FEEDBACK_MAX_PENDING = int(os.getenv('FEEDBACK_MAX_PENDING', 10000))
+    # Max records per /feedback/batch request
+    FEEDBACK_BATCH_MAX = int(os.getenv('FEEDBACK_BATCH_MAX', 1000))
+    # JSON {tag: [keywords]} replacing or adding to the built-in EN/FI auto-tag table
+    FEEDBACK_TAGS_FILE = os.getenv('FEEDBACK_TAGS_FILE', '')
+    # /feedback/stats: hourly buckets kept this many days (daily ones are kept)
+    FEEDBACK_HOURLY_RETENTION_DAYS = int(os.getenv('FEEDBACK_HOURLY_RETENTION_DAYS', 7))
+    # Seconds between build-version checks of the in-memory standards index (0 = never)
+    STANDARDS_REFRESH_INTERVAL = int(os.getenv('STANDARDS_REFRESH_INTERVAL', 300))
 
     DB_USER = os.getenv("DB_USER")
     DB_PASSWORD = os.getenv("DB_PASSWORD")
@@ -0,0 +1,137 @@
+import asyncio
+from collections import Counter
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+class EmbeddingBatcher:
+    """
+    Dynamic micro-batching for query embeddings.
+    Concurrent requests are collected for up to `window_ms` (or until
+    `max_batch_size` texts are queued) and encoded with one encoder call.
+    Up to `max_in_flight` batches are encoded at the same time.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str], str], List[List[float]]],
+        executor: Executor,
+        window_ms: float,
+        max_batch_size: int,
+        max_in_flight: int = 1
+    ):
+        self.encode_fn = encode_fn
+        self.executor = executor
+        self.window = window_ms / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.worker: Optional[asyncio.Task] = None
+        self.slots: Optional[asyncio.Semaphore] = None
+
+        # Metrics
+        self.batches = 0
+        self.texts = 0
+        self.max_seen_batch = 0
+        self.last_batch_size = 0
+        self.batch_sizes: Counter = Counter()
+
+    def _ensure_worker(self):
+        if self.worker is None or self.worker.done():
+            self.queue = asyncio.Queue()
+            self.slots = asyncio.Semaphore(self.max_in_flight)
+            self.worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def embed(self, text: str, task: str) -> List[float]:
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((text, task, future))
+        return await future
+
+    # ---------------------------
+    # Batch Collection
+    # ---------------------------
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.window
+
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self.slots.acquire()
+            loop.create_task(self._encode_batch(batch))
+
+    async def _encode_batch(self, batch: List[Tuple[str, str, asyncio.Future]]):
+        try:
+            self._record(len(batch))
+
+            by_task: Dict[str, Dict[str, List[asyncio.Future]]] = {}
+            for text, task, future in batch:
+                if future.done():
+                    # Caller was cancelled while queued
+                    continue
+                # Identical texts in one batch are encoded once
+                by_task.setdefault(task, {}).setdefault(text, []).append(future)
+
+            loop = asyncio.get_running_loop()
+            for task, waiters in by_task.items():
+                texts = list(waiters)
+                try:
+                    vectors = await loop.run_in_executor(
+                        self.executor, self.encode_fn, texts, task
+                    )
+                except Exception as e:
+                    for futures in waiters.values():
+                        for future in futures:
+                            if not future.done():
+                                future.set_exception(e)
+                    continue
+
+                for text, vector in zip(texts, vectors):
+                    for future in waiters[text]:
+                        if not future.done():
+                            future.set_result(vector)
+        finally:
+            self.slots.release()
+
+    def _record(self, size: int):
+        self.batches += 1
+        self.texts += size
+        self.last_batch_size = size
+        self.max_seen_batch = max(self.max_seen_batch, size)
+        self.batch_sizes[size] += 1
+
+    # ---------------------------
+    # Metrics / Shutdown
+    # ---------------------------
+    def stats(self) -> Dict:
+        return {
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "window_ms": self.window * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0.0,
+            "max_seen_batch_size": self.max_seen_batch,
+            "last_batch_size": self.last_batch_size,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+        }
+
+    async def close(self):
+        if self.worker is not None:
+            self.worker.cancel()
+            self.worker = None
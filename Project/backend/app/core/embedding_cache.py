@@ -0,0 +1,282 @@
+import fcntl
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace and case so trivially different queries share a key.
+    """
+    return " ".join((text or "").split()).casefold()
+
+
+def make_key(text: str, task: str) -> str:
+    return hashlib.sha1(f"{task}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """
+    Persistent tier: a fixed-capacity float32 memmap of vectors plus an
+    append-only index log ("key slot timestamp" per line).
+    Slots are reused round-robin once the file is full.
+
+    Worker processes may share the directory: every access holds an flock
+    on the lock file and first replays index lines other processes
+    appended, so slots are assigned from the shared log and a slot is never
+    read after another process reassigned it. Rewrites (reset, compaction)
+    replace files instead of truncating them, which other processes notice
+    as a new index inode.
+    """
+
+    def __init__(self, directory: Path, capacity: int, dim: Optional[int] = None):
+        self.directory = Path(directory)
+        self.capacity = capacity
+        self.expected_dim = dim
+        self.vectors_path = self.directory / "vectors.f32"
+        self.index_path = self.directory / "index.log"
+        self.meta_path = self.directory / "meta"
+        self.lock_path = self.directory / "lock"
+
+        self.dim: Optional[int] = None
+        self.vectors: Optional[np.memmap] = None
+        self.entries: Dict[str, Tuple[int, float]] = {}
+        self.slot_keys: Dict[int, str] = {}
+        self.next_slot = 0
+        # Identity and read position of the index log replayed so far
+        self.index_inode: Optional[int] = None
+        self.index_pos = 0
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.lock_file = open(self.lock_path, "a+")
+        with self._locked(fcntl.LOCK_EX):
+            self._load()
+
+    @contextmanager
+    def _locked(self, operation: int):
+        fcntl.flock(self.lock_file, operation)
+        try:
+            yield
+        finally:
+            fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+    # ---------------------------
+    # Load / Sync / Reset
+    # ---------------------------
+    def _load(self):
+        lines = self._reload()
+
+        # Compact the log once it is mostly overwritten entries
+        if lines > 2 * max(len(self.entries), 1):
+            self._rewrite_index()
+
+    def _reload(self) -> int:
+        """
+        Drop the in-memory index and replay the whole log. Returns the
+        number of log lines read.
+        """
+        self.dim, self.vectors = None, None
+        self.entries.clear()
+        self.slot_keys.clear()
+        self.next_slot = 0
+        self.index_inode, self.index_pos = None, 0
+
+        if not (self.meta_path.exists() and self.vectors_path.exists() and self.index_path.exists()):
+            return 0
+
+        dim, capacity = (int(v) for v in self.meta_path.read_text().split())
+        if capacity != self.capacity or (self.expected_dim and dim != self.expected_dim):
+            # Capacity or embedding dimension changed: start over rather than remap slots
+            return 0
+
+        self.dim = dim
+        self.vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, dim))
+        self.index_inode = os.stat(self.index_path).st_ino
+        return self._replay()
+
+    def _replay(self) -> int:
+        lines = 0
+        with open(self.index_path, "rb") as f:
+            f.seek(self.index_pos)
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3:
+                    self._assign(parts[0].decode("ascii"), int(parts[1]), float(parts[2]))
+                    lines += 1
+            self.index_pos = f.tell()
+        return lines
+
+    def _sync(self):
+        """
+        Catch up with index lines other processes wrote (lock held).
+        """
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            stat = None
+
+        if stat is None or stat.st_ino != self.index_inode:
+            if stat is not None or self.index_inode is not None:
+                self._reload()
+        elif stat.st_size > self.index_pos:
+            self._replay()
+
+    def _reset(self, dim: int):
+        """
+        Fresh vectors file and empty log for a new dimension (exclusive lock held).
+        """
+        tmp_path = self.vectors_path.with_name("vectors.f32.tmp")
+        np.memmap(tmp_path, dtype=np.float32, mode="w+", shape=(self.capacity, dim)).flush()
+        # Replace, don't truncate: other processes may still map the old file
+        os.replace(tmp_path, self.vectors_path)
+        self.meta_path.write_text(f"{dim} {self.capacity}")
+        self._replace_index("")
+        self._reload()
+
+    def _assign(self, key: str, slot: int, stored_at: float):
+        previous = self.slot_keys.get(slot)
+        if previous is not None and previous != key:
+            self.entries.pop(previous, None)
+
+        old = self.entries.get(key)
+        if old is not None and old[0] != slot:
+            self.slot_keys.pop(old[0], None)
+
+        self.entries[key] = (slot, stored_at)
+        self.slot_keys[slot] = key
+        self.next_slot = (slot + 1) % self.capacity
+
+    def _rewrite_index(self):
+        self._replace_index("".join(
+            f"{key} {slot} {stored_at}\n" for key, (slot, stored_at) in self.entries.items()
+        ))
+        stat = os.stat(self.index_path)
+        self.index_inode, self.index_pos = stat.st_ino, stat.st_size
+
+    def _replace_index(self, text: str):
+        tmp_path = self.index_path.with_name("index.log.tmp")
+        tmp_path.write_text(text, encoding="ascii")
+        os.replace(tmp_path, self.index_path)
+
+    # ---------------------------
+    # Get / Put
+    # ---------------------------
+    def get(self, key: str, ttl: float) -> Optional[Tuple[List[float], float]]:
+        """
+        (vector, stored_at) for the key, or None when missing or expired.
+        """
+        with self._locked(fcntl.LOCK_SH):
+            self._sync()
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+
+            slot, stored_at = entry
+            if ttl and time.time() - stored_at > ttl:
+                return None
+
+            return self.vectors[slot].tolist(), stored_at
+
+    def put(self, key: str, vector: List[float], stored_at: float):
+        with self._locked(fcntl.LOCK_EX):
+            self._sync()
+            if self.vectors is None or self.dim != len(vector):
+                self._reset(len(vector))
+
+            slot = self.entries[key][0] if key in self.entries else self.next_slot
+            self.vectors[slot] = np.asarray(vector, dtype=np.float32)
+            self.vectors.flush()
+
+            with open(self.index_path, "a", encoding="ascii") as f:
+                f.write(f"{key} {slot} {stored_at}\n")
+                self.index_pos = f.tell()
+
+            self._assign(key, slot, stored_at)
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU cache of embeddings keyed on (normalized text, task), with
+    TTL expiry, hit/miss counters and an optional on-disk tier.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl: float = 0,
+        disk_dir: Optional[str] = None,
+        disk_capacity: int = 0,
+        dim: Optional[int] = None
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, Tuple[List[float], float]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.disk = None
+        if disk_dir and disk_capacity > 0:
+            self.disk = DiskEmbeddingStore(Path(disk_dir), disk_capacity, dim)
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, text: str, task: str) -> Optional[List[float]]:
+        key = make_key(text, task)
+
+        with self.lock:
+            entry = self.entries.get(key)
+
+            if entry is not None:
+                vector, stored_at = entry
+                if not self.ttl or time.time() - stored_at <= self.ttl:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return vector
+                del self.entries[key]
+
+            if self.disk is not None:
+                entry = self.disk.get(key, self.ttl)
+                if entry is not None:
+                    vector, stored_at = entry
+                    self._remember(key, vector, stored_at)
+                    self.disk_hits += 1
+                    return vector
+
+            self.misses += 1
+            return None
+
+    def put(self, text: str, task: str, vector: List[float]):
+        key = make_key(text, task)
+        stored_at = time.time()
+
+        with self.lock:
+            self._remember(key, vector, stored_at)
+            if self.disk is not None:
+                self.disk.put(key, vector, stored_at)
+
+    def _remember(self, key: str, vector: List[float], stored_at: float):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = (vector, stored_at)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "disk_size": len(self.disk.entries) if self.disk is not None else 0,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,126 @@
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+from app.config import Config
+
+try:
+    import onnxruntime as ort
+except ImportError:  # optional: only needed for ENCODER_BACKEND=onnx
+    ort = None
+
+
+ENCODER_BACKENDS = ("torch", "onnx")
+
+
+# ---------------------------
+# PyTorch (reference)
+# ---------------------------
+class TorchEncoder:
+    """
+    The jina-embeddings-v3 PyTorch model, loaded through transformers.
+    """
+
+    def __init__(self, model_name: str, threads: int = 0):
+        from transformers import AutoModel
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+
+        self.model = AutoModel.from_pretrained(model_name, trust_remote_code=True)
+
+    def encode(self, texts, task: str, truncate_dim: Optional[int] = None) -> np.ndarray:
+        return self.model.encode(texts, task=task, truncate_dim=truncate_dim)
+
+
+# ---------------------------
+# ONNX Runtime (CPU)
+# ---------------------------
+class OnnxEncoder:
+    """
+    jina-embeddings-v3 exported to ONNX (see scripts/export_onnx.py), fp32 or
+    int8 dynamically quantized. Reproduces the model's encode(): task
+    instruction prefix, LoRA task id, mean pooling, truncation, L2 norm.
+    """
+
+    def __init__(self, model_path: Path, model_name: str, threads: int = 0, max_length: int = 8192):
+        if ort is None:
+            raise RuntimeError("ENCODER_BACKEND=onnx requires the onnxruntime package")
+
+        from transformers import AutoTokenizer, PretrainedConfig
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+
+        self.session = ort.InferenceSession(
+            str(model_path),
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+
+        model_config = PretrainedConfig.from_pretrained(model_name)
+        self.tasks: List[str] = list(model_config.lora_adaptations)
+        self.task_instructions = getattr(model_config, "task_instructions", None) or {}
+        self.max_length = max_length
+
+    def encode(self, texts, task: str, truncate_dim: Optional[int] = None) -> np.ndarray:
+        single = isinstance(texts, str)
+        if single:
+            texts = [texts]
+
+        prefix = self.task_instructions.get(task) or ""
+        tokens = self.tokenizer(
+            [prefix + text for text in texts],
+            padding=True,
+            truncation=True,
+            max_length=self.max_length,
+            return_tensors="np"
+        )
+
+        token_embeddings = self.session.run(None, {
+            "input_ids": tokens["input_ids"].astype(np.int64),
+            "attention_mask": tokens["attention_mask"].astype(np.int64),
+            "task_id": np.array(self.tasks.index(task), dtype=np.int64),
+        })[0]
+
+        # Mean pooling over non-padding tokens
+        mask = tokens["attention_mask"][..., None].astype(np.float32)
+        embeddings = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+
+        if truncate_dim:
+            embeddings = embeddings[:, :truncate_dim]
+        embeddings = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+        return embeddings[0] if single else embeddings
+
+
+def load_encoder(backend: Optional[str] = None):
+    """
+    Build the query encoder selected by Config.ENCODER_BACKEND.
+    """
+    backend = (backend or Config.ENCODER_BACKEND).lower()
+
+    if backend == "torch":
+        return TorchEncoder(Config.EMBEDDING_MODEL, Config.ENCODER_THREADS)
+    if backend == "onnx":
+        return OnnxEncoder(Config.ENCODER_ONNX_PATH, Config.EMBEDDING_MODEL, Config.ENCODER_THREADS)
+
+    raise ValueError(f"Unknown encoder backend '{backend}', expected one of {ENCODER_BACKENDS}")
+
+
+def embedding_parity(reference, candidate, texts: List[str], task: str, truncate_dim: Optional[int] = None) -> float:
+    """
+    Lowest cosine similarity between two encoders' embeddings of `texts`.
+    """
+    a = np.asarray(reference.encode(texts, task=task, truncate_dim=truncate_dim), dtype=np.float32)
+    b = np.asarray(candidate.encode(texts, task=task, truncate_dim=truncate_dim), dtype=np.float32)
+
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    b /= np.linalg.norm(b, axis=1, keepdims=True)
+
+    return float((a * b).sum(axis=1).min())
@@ -0,0 +1,182 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.embedding_cache import normalize_text
+
+
+def fingerprint(text: str) -> str:
+    return hashlib.sha1((text or "").encode("utf-8")).hexdigest()
+
+
+class ExplanationCache:
+    """
+    Two-tier cache of Gemini explanations (candidate id -> explanation).
+
+    - exact: keyed on (normalized query, ordered candidate ids,
+      feedback adjustment hash, model)
+    - semantic: reuses explanations of a cached query whose embedding is
+      within `similarity_threshold` cosine of the new one, under the same
+      feedback adjustment and model, when enough candidates overlap
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        semantic_max_size: int,
+        ttl: float,
+        similarity_threshold: float,
+        min_overlap: float
+    ):
+        self.max_size = max_size
+        self.semantic_max_size = semantic_max_size
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self.min_overlap = min_overlap
+        self.lock = threading.Lock()
+
+        self.exact: "OrderedDict[str, Tuple[Dict[str, str], float]]" = OrderedDict()
+        # key -> (unit query vector, context key, explanations, stored_at)
+        self.semantic: "OrderedDict[str, Tuple[np.ndarray, str, Dict[str, str], float]]" = OrderedDict()
+
+        self.metrics = {
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "misses": 0,
+            "exact_evictions": 0,
+            "semantic_evictions": 0,
+        }
+
+    # ---------------------------
+    # Keys
+    # ---------------------------
+    @staticmethod
+    def context_key(feedback_adjustment: str, model: str) -> str:
+        return f"{model}:{fingerprint(feedback_adjustment)}"
+
+    @staticmethod
+    def exact_key(query: str, candidate_ids: List[str], context: str) -> str:
+        raw = "\x00".join([normalize_text(query), ",".join(map(str, candidate_ids)), context])
+        return fingerprint(raw)
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl) and time.time() - stored_at > self.ttl
+
+    # ---------------------------
+    # Get / Put
+    # ---------------------------
+    def get(
+        self,
+        query: str,
+        candidate_ids: List[str],
+        feedback_adjustment: str,
+        model: str,
+        query_vector: Optional[List[float]] = None
+    ) -> Dict[str, str]:
+        """
+        Return cached explanations for (a subset of) the candidates.
+        An empty dict means a miss on both tiers.
+        """
+        context = self.context_key(feedback_adjustment, model)
+        key = self.exact_key(query, candidate_ids, context)
+
+        with self.lock:
+            entry = self.exact.get(key)
+            if entry is not None:
+                explanations, stored_at = entry
+                if not self._expired(stored_at):
+                    self.exact.move_to_end(key)
+                    self.metrics["exact_hits"] += 1
+                    return dict(explanations)
+                del self.exact[key]
+
+            if query_vector is not None and self.semantic:
+                match = self._semantic_lookup(query_vector, context, candidate_ids)
+                if match:
+                    self.metrics["semantic_hits"] += 1
+                    return match
+
+            self.metrics["misses"] += 1
+            return {}
+
+    def _semantic_lookup(
+        self,
+        query_vector: List[float],
+        context: str,
+        candidate_ids: List[str]
+    ) -> Dict[str, str]:
+        vector = unit(query_vector)
+        wanted = set(candidate_ids)
+
+        best_key, best_similarity = None, self.similarity_threshold
+        for key, (cached_vector, cached_context, explanations, stored_at) in list(self.semantic.items()):
+            if self._expired(stored_at):
+                del self.semantic[key]
+                continue
+            if cached_context != context or cached_vector.shape != vector.shape:
+                continue
+
+            overlap = len(wanted & explanations.keys()) / max(len(wanted), 1)
+            if overlap < self.min_overlap:
+                continue
+
+            similarity = float(np.dot(cached_vector, vector))
+            if similarity >= best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is None:
+            return {}
+
+        self.semantic.move_to_end(best_key)
+        explanations = self.semantic[best_key][2]
+        return {cid: text for cid, text in explanations.items() if cid in wanted}
+
+    def put(
+        self,
+        query: str,
+        candidate_ids: List[str],
+        feedback_adjustment: str,
+        model: str,
+        explanations: Dict[str, str],
+        query_vector: Optional[List[float]] = None
+    ) -> None:
+        explanations = {cid: text for cid, text in explanations.items() if text}
+        if not explanations:
+            return
+
+        context = self.context_key(feedback_adjustment, model)
+        key = self.exact_key(query, candidate_ids, context)
+        stored_at = time.time()
+
+        with self.lock:
+            if self.max_size > 0:
+                self.exact[key] = (explanations, stored_at)
+                self.exact.move_to_end(key)
+                while len(self.exact) > self.max_size:
+                    self.exact.popitem(last=False)
+                    self.metrics["exact_evictions"] += 1
+
+            if query_vector is not None and self.semantic_max_size > 0:
+                self.semantic[key] = (unit(query_vector), context, explanations, stored_at)
+                self.semantic.move_to_end(key)
+                while len(self.semantic) > self.semantic_max_size:
+                    self.semantic.popitem(last=False)
+                    self.metrics["semantic_evictions"] += 1
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {
+                "exact_size": len(self.exact),
+                "semantic_size": len(self.semantic),
+                **self.metrics,
+            }
+
+
+def unit(vector: List[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
@@ -1,39 +1,188 @@
+import asyncio
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.feedback import Feedback
+from sqlalchemy import extract, func, insert as sa_insert
+from sqlalchemy.dialects.postgresql import insert
+from app.config import Config
+from app.db.database import run_in_session
+from app.models.feedback import Feedback, FeedbackTagStats
 
 
-def build_feedback_prompt_adjustment(db: Session) -> str:
+# Down-voted tag -> prompt rule (in prompt order)
+EMPHASIS_RULES: Dict[str, str] = {
+    "salary": "Strongly prioritize salary match.",
+    "skills": "Strongly emphasize required skills and certifications.",
+    "distance": "Prioritize candidates closer to company location.",
+    "certification": "Ensure required certifications are strictly matched.",
+    "education": "Pay attention to education level requirements.",
+}
+
+
+def _half_life_seconds() -> float:
+    return Config.FEEDBACK_RULE_HALF_LIFE_DAYS * 86400
+
+
+def _decay_since(timestamp):
     """
-    Analyze negative feedback trends and adjust prompt emphasis.
-    Lightweight RLHF-style optimization.
+    SQL decay factor for a score last decayed at `timestamp` (1 without a half-life).
+    """
+    half_life = _half_life_seconds()
+    if not half_life:
+        return 1.0
+    return func.power(0.5, extract("epoch", func.now() - timestamp) / half_life)
+
+
+def update_feedback_tag_stats(db: Session, votes: Iterable[Tuple[str, List[str]]]) -> None:
     """
+    Add (feedback_type, auto_tags) votes to the per-tag down-vote counters.
+    Runs in the caller's transaction; the caller commits.
+    """
+
+    counts: Dict[str, int] = {}
+
+    for feedback_type, tags in votes:
+        if feedback_type != "down":
+            continue
+        for tag in set(tags or []):
+            counts[tag] = counts.get(tag, 0) + 1
+
+    if not counts:
+        return
 
-    stats = (
-        db.query(Feedback.auto_tags, func.count(Feedback.id))
+    stmt = insert(FeedbackTagStats).values([
+        {"tag": tag, "down_count": count, "decayed_score": float(count)}
+        for tag, count in counts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[FeedbackTagStats.tag],
+        set_={
+            "down_count": FeedbackTagStats.down_count + stmt.excluded.down_count,
+            "decayed_score": FeedbackTagStats.decayed_score * _decay_since(FeedbackTagStats.decayed_at)
+                             + stmt.excluded.decayed_score,
+            "decayed_at": func.now(),
+        }
+    )
+
+    db.execute(stmt)
+
+
+def rebuild_feedback_tag_stats(db: Session) -> None:
+    """
+    Recompute the tag counters from the raw feedback table.
+    """
+
+    db.query(FeedbackTagStats).delete()
+
+    tag = func.unnest(Feedback.auto_tags).label("tag")
+    votes = (
+        db.query(tag, Feedback.created_at.label("created_at"))
         .filter(Feedback.feedback_type == "down")
-        .group_by(Feedback.auto_tags)
-        .all()
+        .subquery()
+    )
+    source = (
+        db.query(
+            votes.c.tag,
+            func.count(),
+            func.sum(_decay_since(votes.c.created_at)),
+            func.now()
+        )
+        .group_by(votes.c.tag)
     )
 
-    emphasis_rules = []
+    db.execute(
+        sa_insert(FeedbackTagStats).from_select(
+            ["tag", "down_count", "decayed_score", "decayed_at"],
+            source
+        )
+    )
+    db.commit()
 
-    for tags, count in stats:
-        if not tags:
-            continue
 
-        if "salary" in tags:
-            emphasis_rules.append("Strongly prioritize salary match.")
-        if "skills" in tags:
-            emphasis_rules.append("Strongly emphasize required skills and certifications.")
-        if "distance" in tags:
-            emphasis_rules.append("Prioritize candidates closer to company location.")
-        if "certification" in tags:
-            emphasis_rules.append("Ensure required certifications are strictly matched.")
-        if "education" in tags:
-            emphasis_rules.append("Pay attention to education level requirements.")
+def ensure_feedback_tag_stats(db: Session) -> None:
+    """
+    Backfill the tag counters once for feedback recorded before they existed.
+    """
+
+    stats_empty = db.query(FeedbackTagStats.tag).first() is None
+    has_down_votes = db.query(Feedback.id).filter(Feedback.feedback_type == "down").first() is not None
+
+    if stats_empty and has_down_votes:
+        rebuild_feedback_tag_stats(db)
+
+
+def build_feedback_prompt_adjustment(db: Session) -> str:
+    """
+    Analyze negative feedback trends and adjust prompt emphasis.
+    Lightweight RLHF-style optimization: a tag's rule applies once its
+    (decayed) down-vote count reaches FEEDBACK_RULE_THRESHOLD.
+    """
+
+    scores = dict(
+        db.query(
+            FeedbackTagStats.tag,
+            FeedbackTagStats.decayed_score * _decay_since(FeedbackTagStats.decayed_at)
+        )
+        .filter(FeedbackTagStats.tag.in_(list(EMPHASIS_RULES)))
+        .all()
+    )
+
+    emphasis_rules = [
+        rule for tag, rule in EMPHASIS_RULES.items()
+        if scores.get(tag, 0) >= Config.FEEDBACK_RULE_THRESHOLD
+    ]
 
     if not emphasis_rules:
         return ""
 
-    return "\nIMPORTANT OPTIMIZATION RULES BASED ON USER FEEDBACK:\n" + "\n".join(set(emphasis_rules))
+    return "\nIMPORTANT OPTIMIZATION RULES BASED ON USER FEEDBACK:\n" + "\n".join(emphasis_rules)
+
+
+class FeedbackRulesCache:
+    """
+    In-process copy of the prompt rules so searches do no DB work.
+    Refreshed when this process records feedback (version bump) or after
+    FEEDBACK_RULES_TTL seconds, which also picks up other workers' writes
+    and decay. Stale text is served while the refresh runs.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.text: Optional[str] = None
+        self.version = 0
+        self.loaded_version = -1
+        self.loaded_at = 0.0
+        self.refreshing: Optional[asyncio.Task] = None
+
+    def invalidate(self) -> None:
+        self.version += 1
+
+    def is_stale(self) -> bool:
+        if self.loaded_version != self.version:
+            return True
+        return bool(self.ttl) and time.monotonic() - self.loaded_at > self.ttl
+
+    async def refresh(self) -> str:
+        version = self.version
+        try:
+            text = await run_in_session(build_feedback_prompt_adjustment)
+        except Exception as e:
+            print(f"⚠️ Failed to refresh feedback rules: {e}")
+            text = self.text or ""
+
+        self.text = text
+        self.loaded_version = version
+        self.loaded_at = time.monotonic()
+        return text
+
+    async def get(self) -> str:
+        if self.text is None:
+            return await self.refresh()
+
+        if self.is_stale() and (self.refreshing is None or self.refreshing.done()):
+            self.refreshing = asyncio.create_task(self.refresh())
+
+        return self.text
+
+
+feedback_rules = FeedbackRulesCache(ttl=Config.FEEDBACK_RULES_TTL)
@@ -0,0 +1,276 @@
+import asyncio
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, literal, select, union_all, insert as sa_insert
+from sqlalchemy.dialects.postgresql import insert
+from app.config import Config
+from app.db.database import run_in_session
+from app.models.feedback import Feedback, FeedbackHourlyStats, FeedbackDailyStats
+
+
+# (model, date_trunc unit)
+ROLLUPS = ((FeedbackHourlyStats, "hour"), (FeedbackDailyStats, "day"))
+
+# Windows up to this long are served from hourly buckets, longer ones from daily
+HOURLY_MAX_SPAN = timedelta(hours=48)
+MAX_RANGE = timedelta(days=366)
+
+_WINDOW_RE = re.compile(r"^(\d+)([hd])$")
+
+# Seconds between expired hourly bucket deletes (background task, per worker)
+PRUNE_INTERVAL = 3600
+
+
+# ---------------------------
+# Write Path
+# ---------------------------
+def bucket_counts(rows: Iterable[Dict]) -> Dict[Tuple[str, str, str], int]:
+    """
+    Feedback rows -> {(dimension, key, feedback_type): count}, tags unnested.
+    """
+    counts: Dict[Tuple[str, str, str], int] = {}
+
+    for row in rows:
+        feedback_type = row.get("feedback_type")
+        if feedback_type not in ("up", "down"):
+            continue
+
+        keys = [("all", "")]
+        if row.get("candidate_id"):
+            keys.append(("candidate", row["candidate_id"]))
+        keys.extend(("tag", tag) for tag in set(row.get("auto_tags") or []))
+
+        for dimension, key in keys:
+            counts[(dimension, key, feedback_type)] = counts.get((dimension, key, feedback_type), 0) + 1
+
+    return counts
+
+
+def update_feedback_time_rollups(db: Session, rows: Iterable[Dict]) -> None:
+    """
+    Add feedback rows to the current hour and day buckets.
+    Runs in the caller's transaction; the caller commits.
+    """
+    counts = bucket_counts(rows)
+    if not counts:
+        return
+
+    for model, unit in ROLLUPS:
+        # Same clock as Feedback.created_at (server_default now())
+        bucket = func.date_trunc(unit, func.localtimestamp())
+
+        stmt = insert(model).values([
+            {"bucket": bucket, "dimension": dimension, "key": key, "feedback_type": feedback_type, "count": count}
+            for (dimension, key, feedback_type), count in counts.items()
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[model.bucket, model.dimension, model.key, model.feedback_type],
+            set_={"count": model.count + stmt.excluded.count}
+        )
+        db.execute(stmt)
+
+
+# ---------------------------
+# Backfill
+# ---------------------------
+def rebuild_feedback_time_rollups(db: Session) -> None:
+    """
+    Recompute hourly and daily buckets from the raw feedback table.
+    """
+    for model, unit in ROLLUPS:
+        db.query(model).delete()
+
+        votes = (
+            select(
+                func.date_trunc(unit, Feedback.created_at).label("bucket"),
+                Feedback.candidate_id,
+                Feedback.feedback_type,
+                Feedback.auto_tags
+            )
+            .where(Feedback.feedback_type.in_(["up", "down"]))
+            .subquery()
+        )
+        tags = (
+            select(votes.c.bucket, func.unnest(votes.c.auto_tags).label("tag"), votes.c.feedback_type)
+            .subquery()
+        )
+
+        source = union_all(
+            select(votes.c.bucket, literal("all"), literal(""), votes.c.feedback_type, func.count())
+            .group_by(votes.c.bucket, votes.c.feedback_type),
+            select(votes.c.bucket, literal("candidate"), votes.c.candidate_id, votes.c.feedback_type, func.count())
+            .where(votes.c.candidate_id.isnot(None))
+            .group_by(votes.c.bucket, votes.c.candidate_id, votes.c.feedback_type),
+            select(tags.c.bucket, literal("tag"), tags.c.tag, tags.c.feedback_type, func.count())
+            .group_by(tags.c.bucket, tags.c.tag, tags.c.feedback_type),
+        )
+
+        db.execute(
+            sa_insert(model).from_select(
+                ["bucket", "dimension", "key", "feedback_type", "count"],
+                source
+            )
+        )
+
+    db.commit()
+
+
+def delete_expired_hourly_stats(db: Session) -> None:
+    # Hourly buckets only serve short windows; the caller commits
+    db.query(FeedbackHourlyStats).filter(
+        FeedbackHourlyStats.bucket < func.localtimestamp() - timedelta(days=Config.FEEDBACK_HOURLY_RETENTION_DAYS)
+    ).delete(synchronize_session=False)
+
+
+def prune_hourly_stats(db: Session) -> None:
+    delete_expired_hourly_stats(db)
+    db.commit()
+
+
+async def prune_hourly_stats_periodically(interval: float = PRUNE_INTERVAL) -> None:
+    """
+    Drop expired hourly buckets every `interval` seconds in a transaction
+    of their own, off the feedback write path. Runs until cancelled.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_session(prune_hourly_stats)
+        except Exception as e:
+            print(f"⚠️ Hourly feedback stats prune failed: {e}")
+
+
+def ensure_feedback_time_rollups(db: Session) -> None:
+    """
+    Backfill the buckets once for feedback recorded before they existed,
+    and drop expired hourly buckets.
+    """
+    rollups_empty = db.query(FeedbackDailyStats.bucket).first() is None
+    has_feedback = db.query(Feedback.id).first() is not None
+
+    if rollups_empty and has_feedback:
+        rebuild_feedback_time_rollups(db)
+
+    prune_hourly_stats(db)
+
+
+# ---------------------------
+# Windowed Queries
+# ---------------------------
+def parse_window(window: str) -> timedelta:
+    match = _WINDOW_RE.match((window or "").strip().lower())
+    if not match:
+        raise ValueError(f"Invalid window '{window}', expected e.g. 24h or 7d")
+
+    amount, unit = int(match.group(1)), match.group(2)
+    return timedelta(hours=amount) if unit == "h" else timedelta(days=amount)
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    # Buckets are naive local timestamps, like Feedback.created_at
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def resolve_range(
+    db: Session,
+    window: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None
+) -> Tuple[datetime, datetime]:
+    """
+    Custom [start, end] range if start is given, else the trailing window
+    ending at `end` (default: now).
+    """
+    start, end = _naive(start), _naive(end)
+    if end is None:
+        end = db.scalar(select(func.localtimestamp()))
+    if start is None:
+        start = end - parse_window(window)
+
+    if start >= end:
+        raise ValueError("start must be before end")
+    if end - start > MAX_RANGE:
+        raise ValueError(f"Range is limited to {MAX_RANGE.days} days")
+
+    return start, end
+
+
+def select_rollup(start: datetime, end: datetime, now: datetime) -> Tuple[type, str, datetime]:
+    """
+    (model, unit, first bucket) for [start, end]. Hourly buckets serve short
+    ranges that are still within FEEDBACK_HOURLY_RETENTION_DAYS of `now`;
+    older or longer ones come from daily buckets.
+    """
+    hourly_horizon = now - timedelta(days=Config.FEEDBACK_HOURLY_RETENTION_DAYS)
+    use_hourly = end - start <= HOURLY_MAX_SPAN and start >= hourly_horizon
+    model, unit = ROLLUPS[0] if use_hourly else ROLLUPS[1]
+
+    first_bucket = start.replace(minute=0, second=0, microsecond=0)
+    if unit == "day":
+        first_bucket = first_bucket.replace(hour=0)
+    return model, unit, first_bucket
+
+
+def query_feedback_stats(db: Session, start: datetime, end: datetime, limit: int) -> Dict:
+    """
+    Totals, a per-bucket series, per-tag counts and the `limit` most voted
+    candidates in [start, end], read from the rollups (see select_rollup).
+    Ranges are widened to whole buckets.
+    """
+    model, unit, first_bucket = select_rollup(start, end, db.scalar(select(func.localtimestamp())))
+    in_range = and_(model.bucket >= first_bucket, model.bucket <= end)
+
+    up = func.sum(case((model.feedback_type == "up", model.count), else_=0))
+    down = func.sum(case((model.feedback_type == "down", model.count), else_=0))
+
+    series = (
+        db.query(model.bucket, up, down)
+        .filter(in_range, model.dimension == "all")
+        .group_by(model.bucket)
+        .order_by(model.bucket)
+        .all()
+    )
+
+    tags = (
+        db.query(model.key, up, down)
+        .filter(in_range, model.dimension == "tag")
+        .group_by(model.key)
+        .order_by(func.sum(model.count).desc())
+        .limit(limit)
+        .all()
+    )
+
+    candidates = (
+        db.query(model.key, up, down)
+        .filter(in_range, model.dimension == "candidate")
+        .group_by(model.key)
+        .order_by(func.sum(model.count).desc())
+        .limit(limit)
+        .all()
+    )
+
+    return {
+        "start": start,
+        "end": end,
+        "granularity": unit,
+        "totals": {
+            "up": sum(int(row[1]) for row in series),
+            "down": sum(int(row[2]) for row in series),
+        },
+        "series": [
+            {"bucket": bucket, "up": int(u), "down": int(d)}
+            for bucket, u, d in series
+        ],
+        "tags": [
+            {"tag": tag, "up": int(u), "down": int(d)}
+            for tag, u, d in tags
+        ],
+        "candidates": [
+            {"candidate_id": candidate_id, "up": int(u), "down": int(d)}
+            for candidate_id, u, d in candidates
+        ],
+    }
@@ -0,0 +1,204 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+from app.config import Config
+from app.db.database import run_in_session
+from app.models.feedback import Feedback
+from app.utils.feedback_tags import generate_auto_tags
+from app.core.ranking_optimizer import update_feedback_rollup, push_feedback_scores
+from app.core.feedback_optimizer import update_feedback_tag_stats, feedback_rules
+from app.core.feedback_stats import update_feedback_time_rollups
+from app.core.response_cache import search_cache
+
+
+FEEDBACK_TYPES = ("up", "down")
+
+
+# ---------------------------
+# Write Path
+# ---------------------------
+def prepare_feedback(data: Dict) -> Dict:
+    """
+    Feedback request body -> feedback row (with auto tags). Raises
+    ValueError for a body the feedback table cannot store.
+    """
+    candidate_id = data.get("candidate_id")
+    feedback_type = data.get("feedback_type")
+    reason = data.get("reason")
+
+    if isinstance(candidate_id, int) and not isinstance(candidate_id, bool):
+        candidate_id = str(candidate_id)
+    max_length = Feedback.candidate_id.type.length
+    if not isinstance(candidate_id, str) or not 0 < len(candidate_id) <= max_length:
+        raise ValueError(f"candidate_id must be a non-empty string of at most {max_length} characters")
+    if feedback_type not in FEEDBACK_TYPES:
+        raise ValueError(f"feedback_type must be one of {', '.join(FEEDBACK_TYPES)}")
+    if reason is not None and not isinstance(reason, str):
+        raise ValueError("reason must be a string")
+
+    return {
+        "candidate_id": candidate_id,
+        "feedback_type": feedback_type,
+        "reason": reason,
+        "auto_tags": generate_auto_tags(reason or ""),
+    }
+
+
+def write_feedback(db: Session, rows: List[Dict]) -> None:
+    """
+    Store feedback rows with one multi-row INSERT and update the candidate
+    rollup, tag counters and time-bucketed stats in the same transaction.
+    """
+    if not rows:
+        return
+
+    db.execute(insert(Feedback).values(rows))
+    update_feedback_rollup(db, [(row["candidate_id"], row["feedback_type"]) for row in rows])
+    update_feedback_tag_stats(db, [(row["feedback_type"], row["auto_tags"]) for row in rows])
+    update_feedback_time_rollups(db, rows)
+    db.commit()
+
+
+async def after_feedback_write(rows: List[Dict]) -> None:
+    """
+    Post-commit side effects: prompt rules refresh, Qdrant feedback_score,
+    cached search responses.
+    """
+    feedback_rules.invalidate()
+    await push_feedback_scores(row["candidate_id"] for row in rows)
+    # After the push: a search cached while it ran still saw the old scores
+    await search_cache.invalidate()
+
+
+# ---------------------------
+# Write-behind Buffer
+# ---------------------------
+class FeedbackWriter:
+    """
+    Queues feedback in process and writes it in batches once flush_size
+    rows are pending or flush_interval seconds passed. Batches that fail
+    on a transient error stay queued for the next flush; rows the database
+    rejects are dropped. close() flushes whatever is left.
+    """
+
+    def __init__(self, flush_size: int, flush_interval: float, max_pending: int):
+        self.flush_size = max(1, flush_size)
+        self.flush_interval = flush_interval
+        self.max_pending = max(self.flush_size, max_pending)
+
+        self.pending: List[Dict] = []
+        self.lock = asyncio.Lock()
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+        self.closing = False
+
+        self.written = 0
+        self.batches = 0
+        self.failed_flushes = 0
+        self.dropped = 0
+
+    def start(self) -> None:
+        if self.task is None:
+            # Bind the sync primitives to the running loop
+            self.lock = asyncio.Lock()
+            self.wakeup = asyncio.Event()
+            self.closing = False
+            self.task = asyncio.create_task(self._run())
+
+    async def submit(self, rows: List[Dict]) -> None:
+        if len(self.pending) + len(rows) > self.max_pending:
+            # Backpressure: the caller waits for the write instead of growing the queue
+            await self.flush()
+            if self.pending:
+                raise RuntimeError("Feedback queue is full, database writes are failing")
+
+        self.pending.extend(rows)
+        if len(self.pending) >= self.flush_size:
+            self.wakeup.set()
+
+    async def _run(self) -> None:
+        while not self.closing:
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self.wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> None:
+        async with self.lock:
+            while self.pending:
+                written, handled, error = await self._write_batch(self.pending[:self.flush_size])
+
+                del self.pending[:handled]
+                if written:
+                    self.written += len(written)
+                    self.batches += 1
+                    await after_feedback_write(written)
+
+                if error is not None:
+                    self.failed_flushes += 1
+                    print(f"⚠️ Feedback flush failed, {len(self.pending)} records kept queued: {error}")
+                    return
+
+    async def _write_batch(self, rows: List[Dict]) -> Tuple[List[Dict], int, Optional[Exception]]:
+        """
+        Write rows in queue order. A batch the database rejects as invalid
+        (DataError / IntegrityError) is split in halves until the bad rows
+        are isolated; those are logged and dropped, since retrying them
+        would block the queue. Returns (written rows, rows that left the
+        queue, transient error that stopped the write).
+        """
+        written: List[Dict] = []
+        handled = 0
+        parts = [rows]
+
+        while parts:
+            part = parts.pop()
+            try:
+                await run_in_session(write_feedback, part)
+            except (DataError, IntegrityError) as e:
+                if len(part) > 1:
+                    middle = len(part) // 2
+                    parts += [part[middle:], part[:middle]]
+                    continue
+                self.dropped += 1
+                print(f"⚠️ Dropping feedback record rejected by the database: {part[0]} ({e.orig})")
+            except Exception as e:
+                return written, handled, e
+            else:
+                written += part
+            handled += len(part)
+
+        return written, handled, None
+
+    async def close(self) -> None:
+        # Let the loop finish its current flush rather than cancelling it
+        # mid-write (the batch could commit without leaving the queue)
+        if self.task is not None:
+            self.closing = True
+            self.wakeup.set()
+            await self.task
+            self.task = None
+
+        await self.flush()
+        if self.pending:
+            print(f"⚠️ {len(self.pending)} feedback records could not be written on shutdown")
+
+    def stats(self) -> Dict:
+        return {
+            "pending": len(self.pending),
+            "written": self.written,
+            "batches": self.batches,
+            "failed_flushes": self.failed_flushes,
+            "dropped": self.dropped,
+        }
+
+
+feedback_writer = FeedbackWriter(
+    flush_size=Config.FEEDBACK_FLUSH_SIZE,
+    flush_interval=Config.FEEDBACK_FLUSH_INTERVAL_MS / 1000,
+    max_pending=Config.FEEDBACK_MAX_PENDING
+)
@@ -1,90 +1,68 @@
 from google import genai
+from google.genai import types
 from app.config import Config
-from typing import List, Dict
+from app.schemas.search import CandidateExplanation
+from app.utils.candidate_digest import build_candidate_digest
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import threading
+
+_client: Optional[genai.Client] = None
+_client_lock = threading.Lock()
+
+
+def get_genai_client() -> genai.Client:
+    """
+    Shared genai client, created on first use rather than at import.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = genai.Client()
+    return _client
 
-# Initialize the client once
-client = genai.Client()
 
 class GeminiClient:
     def __init__(self):
         self.model = Config.GEMINI_MODEL  # e.g., "gemini-2.5-flash"
 
-    def format_candidates(self, candidates: List[Dict]) -> str:
+    @property
+    def client(self) -> genai.Client:
+        return get_genai_client()
+
+    def format_candidates(self, candidates: List[Dict], include_ids: bool = False) -> str:
         """
-        Format candidates to readable text for Gemini API.
+        Format candidates to compact text for Gemini API.
+        Uses the digest precomputed at ingest and keeps the whole block
+        within GEMINI_PROMPT_TOKEN_BUDGET (~4 chars per token) by giving
+        each candidate an equal share.
         """
-        formatted = ""
+        if not candidates:
+            return ""
+
+        max_chars = max(80, Config.GEMINI_PROMPT_TOKEN_BUDGET * 4 // len(candidates))
+
+        lines = []
         for c in candidates:
-            formatted += f"Name: {c.get('name')}\n"
-            formatted += f"Role: {c.get('role')} ({c.get('role_en')})\n"
-            formatted += f"Industry: {c.get('industry')} / {c.get('category')}\n"
-
-            skills = c.get("skills", [])
-            if skills:
-                formatted += f"Skills: {', '.join(skills)}\n"
-
-            formatted += f"Experience: {c.get('experience_years')} years\n"
-
-            edu = c.get("education", {})
-            if isinstance(edu, dict):
-                parts = [
-                    edu.get("level"),
-                    edu.get("field"),
-                    f"from {edu.get('institution')}"
-                ]
-                formatted += f"Education: {' '.join(filter(None, parts))}\n"
-
-            add_edu = c.get("additional_education", [])
-            if add_edu:
-                edu_list = []
-                for e in add_edu[:3]:
-                    if isinstance(e, dict):
-                        edu_list.append(f"{e.get('type', 'Degree')} in {e.get('name', '')}")
-                formatted += "Advanced Qualifications: " + ", ".join(edu_list)
-                if len(add_edu) > 3:
-                    formatted += f" (+{len(add_edu)-3} more)"
-                formatted += "\n"
-
-            licenses = c.get("licenses", [])
-            if licenses:
-                formatted += f"Licenses: {', '.join([l.get('name', '') for l in licenses if isinstance(l, dict)])}\n"
-
-            languages = c.get("languages", [])
-            if languages:
-                lang_list = []
-                for lang in languages:
-                    if isinstance(lang, dict):
-                        language = lang.get("language")
-                        prof = lang.get("proficiency")
-                        if language:
-                            lang_list.append(f"{language} ({prof})" if prof else language)
-                formatted += f"Languages: {', '.join(lang_list)}\n"
-
-            loc = c.get("location", {})
-            if isinstance(loc, dict) and loc.get("city"):
-                formatted += f"Location: {loc.get('city')}\n"
-
-            salary = c.get("salary")
-            if salary:
-                formatted += f"Salary: €{salary:,}/month\n"
-
-            if c.get("availability"):
-                formatted += f"Availability: {c.get('availability')}\n"
-
-            if c.get("summary"):
-                formatted += f"Summary: {c.get('summary')}\n"
+            digest = c.get("digest") or build_candidate_digest(c)
 
+            prefix = f"[{c.get('id')}] " if include_ids else ""
             score = c.get("score")
-            if score is not None:
-                formatted += f"Match Score: {score}%\n"
+            suffix = f" | match {score}%" if score is not None else ""
+
+            room = max_chars - len(prefix) - len(suffix)
+            if len(digest) > room:
+                digest = digest[:max(room - 1, 0)] + "…"
 
-            formatted += "\n" + "-" * 80 + "\n\n"
+            lines.append(prefix + digest + suffix)
 
-        return formatted
+        return "\n".join(lines) + "\n"
 
-    def generate_text(self, prompt: str, coming_candidates: List[Dict]) -> str:
+    def build_prompt(self, prompt: str, coming_candidates: List[Dict]) -> str:
         """
-        Generate match explanations for candidates using Gemini
+        Build the explanation prompt for the given candidates.
         """
         formatted_candidates = self.format_candidates(coming_candidates)
 
@@ -92,7 +70,7 @@ class GeminiClient:
 
 Job requirement / search query: "{prompt}"
 
-Here are the top matching candidates:
+Here are the top matching candidates (one per line):
 
 {formatted_candidates}
 
@@ -111,10 +89,17 @@ Output format (strictly follow):
 
 (No introduction or conclusion, just the list.)
 """
+        return full_prompt
+
+    async def generate_text(self, prompt: str, coming_candidates: List[Dict]) -> str:
+        """
+        Generate match explanations for candidates using Gemini
+        """
+        full_prompt = self.build_prompt(prompt, coming_candidates)
 
         try:
-            # === Correct API call ===
-            response = client.models.generate_content(
+            # === Async API call (does not block the event loop) ===
+            response = await self.client.aio.models.generate_content(
                 model=self.model,
                 contents=full_prompt
             )
@@ -125,6 +110,190 @@ Output format (strictly follow):
             traceback.print_exc()
             return ""
 
+    async def stream_text(self, prompt: str, coming_candidates: List[Dict]) -> AsyncIterator[str]:
+        """
+        Stream the explanation text chunk by chunk as Gemini produces it.
+        """
+        full_prompt = self.build_prompt(prompt, coming_candidates)
+
+        stream = await self.client.aio.models.generate_content_stream(
+            model=self.model,
+            contents=full_prompt
+        )
+        async for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
+    async def stream_explanations(
+        self,
+        prompt: str,
+        coming_candidates: List[Dict]
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Yield (candidate id, explanation) as soon as each candidate's
+        section of the streamed response is complete.
+        """
+        ids_by_name = candidate_ids_by_name(coming_candidates)
+        buffer = ""
+
+        async for chunk in self.stream_text(prompt, coming_candidates):
+            buffer += chunk
+            sections = list(split_explanations(buffer))
+            # The last section may still be growing
+            for name, text, end in sections[:-1]:
+                candidate_id = take_candidate_id(ids_by_name, name)
+                if candidate_id is not None:
+                    yield candidate_id, text
+            if len(sections) > 1:
+                buffer = buffer[sections[-2][2]:]
+
+        for name, text, _ in split_explanations(buffer):
+            candidate_id = take_candidate_id(ids_by_name, name)
+            if candidate_id is not None:
+                yield candidate_id, text
+
+    # ---------------------------
+    # Parallel Structured Explanations
+    # ---------------------------
+    def build_structured_prompt(self, prompt: str, coming_candidates: List[Dict]) -> str:
+        formatted_candidates = self.format_candidates(coming_candidates, include_ids=True)
+
+        return f"""You are a professional recruitment assistant analyzing candidate matches.
+
+Job requirement / search query: "{prompt}"
+
+Candidates (one per line):
+
+{formatted_candidates}
+
+Your task:
+- For EACH candidate, explain in 4-5 sentences why they match (or don't match) the job requirement
+- Focus on: relevant experience, key skills, education level, licenses/certifications, language abilities, salary...
+- Be specific and reference actual qualifications
+- Each line starts with the candidate id in brackets; return one entry per candidate, using that id as candidate_id
+"""
+
+    async def generate_structured(self, prompt: str, coming_candidates: List[Dict]) -> Dict[str, str]:
+        """
+        Explain a small batch of candidates with JSON-schema output keyed by candidate id.
+        """
+        response = await self.client.aio.models.generate_content(
+            model=self.model,
+            contents=self.build_structured_prompt(prompt, coming_candidates),
+            config=types.GenerateContentConfig(
+                response_mime_type="application/json",
+                response_schema=list[CandidateExplanation]
+            )
+        )
+
+        entries = response.parsed
+        if entries is None:
+            entries = [CandidateExplanation(**e) for e in json.loads(response.text or "[]")]
+
+        # Map the schema's string ids back to the payload ids
+        ids = {str(c.get("id")): c.get("id") for c in coming_candidates}
+        return {
+            ids[entry.candidate_id]: entry.explanation
+            for entry in entries
+            if entry.candidate_id in ids
+        }
+
+    async def iter_structured_explanations(
+        self,
+        prompt: str,
+        coming_candidates: List[Dict]
+    ) -> AsyncIterator[Tuple[str, str]]:
+        """
+        Explain candidates in small batches with bounded concurrency and
+        yield (candidate id, explanation) as each batch finishes.
+        Batches that fail or time out are skipped, so results may be partial.
+        """
+        size = max(1, Config.EXPLANATION_BATCH_SIZE)
+        batches = [coming_candidates[i:i + size] for i in range(0, len(coming_candidates), size)]
+        semaphore = asyncio.Semaphore(max(1, Config.EXPLANATION_CONCURRENCY))
+
+        async def explain(batch: List[Dict]) -> Dict[str, str]:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(
+                        self.generate_structured(prompt, batch),
+                        timeout=Config.EXPLANATION_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    print(f"⚠️ Gemini explanation timed out for {[c.get('id') for c in batch]}")
+                except Exception as e:
+                    print(f"⚠️ Gemini explanation failed for {[c.get('id') for c in batch]}: {e}")
+                return {}
+
+        tasks = [asyncio.ensure_future(explain(batch)) for batch in batches]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                for candidate_id, text in (await finished).items():
+                    yield candidate_id, text
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def generate_structured_explanations(
+        self,
+        prompt: str,
+        coming_candidates: List[Dict]
+    ) -> Dict[str, str]:
+        """
+        Candidate id -> explanation using parallel structured requests.
+        """
+        return {
+            candidate_id: text
+            async for candidate_id, text in self.iter_structured_explanations(prompt, coming_candidates)
+        }
+
+
+# ---------------------------
+# Explanation Parsing
+# ---------------------------
+def split_explanations(text: str) -> Iterator[Tuple[str, str, int]]:
+    """
+    Split "**Name**\nexplanation" sections.
+    Yields (name, explanation, end offset of the section).
+    """
+    start = text.find("**")
+    while start >= 0:
+        name_end = text.find("**", start + 2)
+        if name_end < 0:
+            return
+        next_start = text.find("**", name_end + 2)
+        end = next_start if next_start >= 0 else len(text)
+        yield text[start + 2:name_end].strip(), text[name_end + 2:end].strip(), end
+        start = next_start
+
+
+def candidate_ids_by_name(candidates: List[Dict]) -> Dict[str, List[str]]:
+    ids_by_name: Dict[str, List[str]] = {}
+    for candidate in candidates:
+        ids_by_name.setdefault(candidate.get("name"), []).append(candidate.get("id"))
+    return ids_by_name
+
+
+def take_candidate_id(ids_by_name: Dict[str, List[str]], name: str):
+    # Candidates sharing a name get their sections in ranking order
+    ids = ids_by_name.get(name)
+    return ids.pop(0) if ids else None
+
+
+def parse_explanations(text: str, candidates: List[Dict]) -> Dict[str, str]:
+    """
+    Map candidate id -> explanation from a full Gemini response.
+    """
+    ids_by_name = candidate_ids_by_name(candidates)
+    explanations: Dict[str, str] = {}
+
+    for name, explanation, _ in split_explanations(text or ""):
+        candidate_id = take_candidate_id(ids_by_name, name)
+        if candidate_id is not None:
+            explanations[candidate_id] = explanation
+
+    return explanations
+
 
 # Singleton instance
 gemini_client = GeminiClient()
@@ -0,0 +1,106 @@
+import asyncio
+import time
+from typing import Awaitable, Dict, Optional
+from app.db.database import init_db, run_in_session
+from app.core.ranking_optimizer import ensure_feedback_rollup, ensure_feedback_scores
+from app.core.feedback_optimizer import ensure_feedback_tag_stats, feedback_rules
+from app.core.feedback_writer import feedback_writer
+from app.core.feedback_stats import ensure_feedback_time_rollups, prune_hourly_stats_periodically
+from app.config import Config
+from app.core.vector_search import get_vector_search, close_vector_search
+from app.core.response_cache import search_cache
+from app.core.search_pagination import snapshot_store
+
+
+class Readiness:
+    """
+    Warm-up progress and per-step timings, reported by /ready.
+    """
+
+    def __init__(self):
+        self.ready = False
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+        self.started = time.perf_counter()
+
+    async def step(self, name: str, awaitable: Awaitable):
+        started = time.perf_counter()
+        result = await awaitable
+        self.timings[f"{name}_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def snapshot(self) -> Dict:
+        return {
+            "ready": self.ready,
+            "error": self.error,
+            "timings": dict(self.timings),
+        }
+
+
+readiness = Readiness()
+_warm_up_task: Optional[asyncio.Task] = None
+_prune_task: Optional[asyncio.Task] = None
+
+
+async def warm_up() -> None:
+    """
+    Build the heavy resources and exercise them once. Runs in the
+    background so the process answers /health while the model loads;
+    /ready turns 200 only when this finishes.
+    """
+    try:
+        vector_search = await readiness.step("load_encoder", asyncio.to_thread(get_vector_search))
+        await readiness.step("check_embedding_dim", vector_search.check_embedding_dim())
+        await readiness.step("load_standards", vector_search.load_standards())
+        await vector_search.check_payload_indexes()
+        await readiness.step("feedback_scores", ensure_feedback_scores(vector_search))
+        await readiness.step("feedback_rules", feedback_rules.refresh())
+        readiness.timings.update(await vector_search.warm_up())
+
+        readiness.timings["total_ms"] = round((time.perf_counter() - readiness.started) * 1000, 1)
+        readiness.ready = True
+        print(f"Warm-up complete in {readiness.timings['total_ms']} ms")
+
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        readiness.error = str(e)
+        print("⚠️ Warm-up failed, worker stays not ready:")
+        import traceback
+        traceback.print_exc()
+
+
+async def startup() -> None:
+    global _warm_up_task, _prune_task
+
+    await readiness.step("init_db", asyncio.to_thread(init_db))
+    await readiness.step("feedback_rollup", run_in_session(ensure_feedback_rollup))
+    await readiness.step("feedback_tag_stats", run_in_session(ensure_feedback_tag_stats))
+    await readiness.step("feedback_time_rollups", run_in_session(ensure_feedback_time_rollups))
+
+    if Config.FEEDBACK_WRITE_MODE == "write_behind":
+        feedback_writer.start()
+
+    _prune_task = asyncio.create_task(prune_hourly_stats_periodically())
+    _warm_up_task = asyncio.create_task(warm_up())
+
+
+async def cancel_task(task: Optional[asyncio.Task]) -> None:
+    if task is not None and not task.done():
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+
+async def shutdown() -> None:
+    # Queued feedback is written before the Qdrant client goes away
+    await feedback_writer.close()
+
+    await cancel_task(_prune_task)
+    await cancel_task(_warm_up_task)
+
+    await close_vector_search()
+    await search_cache.close()
+    await snapshot_store.close()
@@ -0,0 +1,177 @@
+from typing import Dict, List, Optional
+from qdrant_client import models
+from app.config import Config
+
+
+QUANTIZATION_PROFILES = ("scalar", "binary", "none")
+
+
+# ---------------------------
+# Embedding Dimension
+# ---------------------------
+def embedding_metadata() -> Dict[str, object]:
+    # Stored on each collection at build time
+    return {
+        "embedding_model": Config.EMBEDDING_MODEL,
+        "embedding_dim": Config.EMBEDDING_DIM,
+    }
+
+
+def collection_embedding_dim(collection_info) -> Optional[int]:
+    """
+    Dimension a collection was built with: the recorded metadata, falling
+    back to the vector size for collections built before it was recorded.
+    """
+    metadata = getattr(collection_info.config, "metadata", None) or {}
+    if metadata.get("embedding_dim"):
+        return int(metadata["embedding_dim"])
+
+    vectors = collection_info.config.params.vectors
+    return getattr(vectors, "size", None)
+
+
+# ---------------------------
+# Vector Storage
+# ---------------------------
+def candidate_vectors_config(size: int, profile: Optional[str] = None) -> models.VectorParams:
+    # Originals only serve the rescoring step once quantized, so they can live on
+    # disk; without quantization they are what HNSW searches and stay in RAM
+    quantized = (profile or Config.QDRANT_QUANTIZATION).lower() != "none"
+    return models.VectorParams(
+        size=size,
+        distance=models.Distance.COSINE,
+        on_disk=Config.QDRANT_ON_DISK_VECTORS and quantized
+    )
+
+
+def candidate_quantization_config(profile: Optional[str] = None) -> Optional[models.QuantizationConfig]:
+    """
+    Quantized copy kept in RAM for the HNSW search: int8 scalar (~4x smaller)
+    or binary (~32x smaller, needs more oversampling). None = plain float32.
+    """
+    profile = (profile or Config.QDRANT_QUANTIZATION).lower()
+    if profile not in QUANTIZATION_PROFILES:
+        raise ValueError(f"Unknown quantization profile '{profile}', expected one of {QUANTIZATION_PROFILES}")
+
+    if profile == "scalar":
+        return models.ScalarQuantization(
+            scalar=models.ScalarQuantizationConfig(
+                type=models.ScalarType.INT8,
+                quantile=0.99,
+                always_ram=True
+            )
+        )
+    if profile == "binary":
+        return models.BinaryQuantization(
+            binary=models.BinaryQuantizationConfig(always_ram=True)
+        )
+    return None
+
+
+def candidate_search_params(
+    oversampling: Optional[float] = None,
+    rescore: Optional[bool] = None
+) -> Optional[models.SearchParams]:
+    """
+    Search params for quantized collections: oversample on the quantized
+    vectors, then rescore the top hits with the originals.
+    """
+    if Config.QDRANT_QUANTIZATION.lower() == "none":
+        return None
+
+    return models.SearchParams(
+        quantization=models.QuantizationSearchParams(
+            ignore=False,
+            rescore=Config.QDRANT_SEARCH_RESCORE if rescore is None else rescore,
+            oversampling=oversampling or Config.QDRANT_SEARCH_OVERSAMPLING
+        )
+    )
+
+
+# ---------------------------
+# Payload Indexes
+# ---------------------------
+# Every payload field used in a search filter needs an index, otherwise
+# Qdrant checks the filter point by point during HNSW traversal.
+
+# Candidates: search_similar filters, plus "id" for feedback_score updates by filter
+CANDIDATE_PAYLOAD_INDEXES: Dict[str, models.PayloadSchemaType] = {
+    "id": models.PayloadSchemaType.KEYWORD,
+    "industry": models.PayloadSchemaType.KEYWORD,
+    "salary": models.PayloadSchemaType.INTEGER,
+    "location.coordinates": models.PayloadSchemaType.GEO,
+}
+
+# Professional standards: looked up by industry
+STANDARD_PAYLOAD_INDEXES: Dict[str, models.PayloadSchemaType] = {
+    "industry": models.PayloadSchemaType.KEYWORD,
+}
+
+
+def create_payload_indexes(client, collection_name: str, indexes: Dict[str, models.PayloadSchemaType]) -> None:
+    """
+    Create the declared payload indexes (sync client; used by the setup scripts).
+    Existing indexes are left alone, so this is safe to re-run.
+    """
+    existing = client.get_collection(collection_name).payload_schema or {}
+
+    for field, schema in indexes.items():
+        if field in existing and existing[field].data_type == schema:
+            continue
+        client.create_payload_index(
+            collection_name=collection_name,
+            field_name=field,
+            field_schema=schema,
+            wait=True
+        )
+        print(f"Payload index: {collection_name}.{field} ({schema.value})")
+
+
+def missing_payload_indexes(collection_info, indexes: Dict[str, models.PayloadSchemaType]) -> List[str]:
+    """
+    Declared fields that are unindexed (or indexed with another type) in a
+    collection, from its get_collection() info.
+    """
+    existing = collection_info.payload_schema or {}
+    return [
+        field for field, schema in indexes.items()
+        if field not in existing or existing[field].data_type != schema
+    ]
+
+
+# ---------------------------
+# Feedback Boost
+# ---------------------------
+FEEDBACK_SCORE_FIELD = "feedback_score"
+
+
+def feedback_boost_formula() -> models.FormulaQuery:
+    """
+    $score * (1 + feedback_score), evaluated by Qdrant over the prefetched
+    pool; points without feedback keep their vector score.
+    """
+    return models.FormulaQuery(
+        formula=models.MultExpression(mult=[
+            "$score",
+            models.SumExpression(sum=[1.0, FEEDBACK_SCORE_FIELD])
+        ]),
+        defaults={FEEDBACK_SCORE_FIELD: 0.0}
+    )
+
+
+def feedback_score_operations(scores: Dict[str, float]) -> List[models.SetPayloadOperation]:
+    """
+    One set_payload per candidate, addressed by the payload "id" so it
+    works regardless of point id scheme.
+    """
+    return [
+        models.SetPayloadOperation(
+            set_payload=models.SetPayload(
+                payload={FEEDBACK_SCORE_FIELD: score},
+                filter=models.Filter(must=[
+                    models.FieldCondition(key="id", match=models.MatchValue(value=candidate_id))
+                ])
+            )
+        )
+        for candidate_id, score in scores.items()
+    ]
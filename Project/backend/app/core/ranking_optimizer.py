@@ -1,6 +1,63 @@
+import asyncio
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.models.feedback import Feedback
+from typing import Dict, Iterable, Iterator, List, Tuple
+from sqlalchemy import func, case, insert as sa_insert
+from sqlalchemy.dialects.postgresql import insert
+from app.config import Config
+from app.db.database import run_in_session
+from app.models.feedback import Feedback, CandidateFeedbackStats
+
+UP_VOTE_BONUS = 2.0       # 👍 adds +2 per vote
+DOWN_VOTE_PENALTY = 3.0   # 👎 subtracts -3 per vote
+
+
+def calculate_feedback_scores(db: Session, candidate_ids: Iterable[str]) -> Dict[str, float]:
+    """
+    Calculate ranking bonus/penalty for many candidates with a single query
+    against the per-candidate feedback rollup.
+    Candidates without feedback are absent from the result.
+    """
+
+    ids = list({cid for cid in candidate_ids if cid is not None})
+    if not ids:
+        return {}
+
+    rows = (
+        db.query(
+            CandidateFeedbackStats.candidate_id,
+            CandidateFeedbackStats.up_count,
+            CandidateFeedbackStats.down_count
+        )
+        .filter(CandidateFeedbackStats.candidate_id.in_(ids))
+        .all()
+    )
+
+    return {
+        candidate_id: feedback_bonus(up_count, down_count)
+        for candidate_id, up_count, down_count in rows
+    }
+
+
+def feedback_bonus(up_count: int, down_count: int) -> float:
+    return up_count * UP_VOTE_BONUS - down_count * DOWN_VOTE_PENALTY
+
+
+def iter_feedback_scores(db: Session, batch_size: int = 1000) -> Iterator[Tuple[str, float]]:
+    """
+    (candidate_id, bonus) for every candidate in the rollup, streamed.
+    """
+
+    rows = (
+        db.query(
+            CandidateFeedbackStats.candidate_id,
+            CandidateFeedbackStats.up_count,
+            CandidateFeedbackStats.down_count
+        )
+        .yield_per(batch_size)
+    )
+
+    for candidate_id, up_count, down_count in rows:
+        yield candidate_id, feedback_bonus(up_count, down_count)
 
 
 def calculate_feedback_score(db: Session, candidate_id: str) -> float:
@@ -8,22 +65,155 @@ def calculate_feedback_score(db: Session, candidate_id: str) -> float:
     Calculate ranking bonus/penalty based on feedback history.
     """
 
-    feedback_stats = (
+    return calculate_feedback_scores(db, [candidate_id]).get(candidate_id, 0.0)
+
+
+def update_feedback_rollup(db: Session, votes: Iterable[Tuple[str, str]]) -> None:
+    """
+    Add (candidate_id, feedback_type) votes to the rollup table.
+    Runs in the caller's transaction; the caller commits.
+    """
+
+    counts: Dict[str, List[int]] = {}
+
+    for candidate_id, feedback_type in votes:
+        if not candidate_id or feedback_type not in ("up", "down"):
+            continue
+        up_down = counts.setdefault(candidate_id, [0, 0])
+        up_down[0 if feedback_type == "up" else 1] += 1
+
+    if not counts:
+        return
+
+    stmt = insert(CandidateFeedbackStats).values([
+        {"candidate_id": candidate_id, "up_count": up, "down_count": down}
+        for candidate_id, (up, down) in counts.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CandidateFeedbackStats.candidate_id],
+        set_={
+            "up_count": CandidateFeedbackStats.up_count + stmt.excluded.up_count,
+            "down_count": CandidateFeedbackStats.down_count + stmt.excluded.down_count,
+            "updated_at": func.now(),
+        }
+    )
+
+    db.execute(stmt)
+
+
+async def push_feedback_scores(candidate_ids: Iterable[str]) -> None:
+    """
+    Copy the candidates' current rollup bonus into their Qdrant
+    feedback_score payload (server-side boost). The rollup stays the source
+    of truth; scripts/sync_feedback_scores.py repairs missed updates.
+    """
+
+    if Config.FEEDBACK_BOOST_MODE != "server":
+        return
+
+    from app.core.vector_search import get_vector_search
+
+    ids = list({cid for cid in candidate_ids if cid})
+    try:
+        scores = await run_in_session(calculate_feedback_scores, ids)
+        # In a thread: during warm-up this waits for the model load
+        vector_search = await asyncio.to_thread(get_vector_search)
+        await vector_search.set_feedback_scores({cid: scores.get(cid, 0.0) for cid in ids})
+    except Exception as e:
+        print(f"⚠️ Failed to update feedback_score in Qdrant: {e}")
+
+
+def load_feedback_scores(db: Session) -> Dict[str, float]:
+    return dict(iter_feedback_scores(db))
+
+
+async def ensure_feedback_scores(vector_search, batch_size: int = 256) -> None:
+    """
+    Backfill the Qdrant feedback_score payload once when the live collection
+    has none but the rollup has votes (a collection built before server-side
+    boost existed). Otherwise past votes would stop affecting ranking.
+    """
+
+    if Config.FEEDBACK_BOOST_MODE != "server":
+        return
+
+    try:
+        if await vector_search.has_feedback_scores():
+            return
+
+        scores = list((await run_in_session(load_feedback_scores)).items())
+        for start in range(0, len(scores), batch_size):
+            await vector_search.set_feedback_scores(dict(scores[start:start + batch_size]))
+    except Exception as e:
+        print(f"⚠️ Could not backfill feedback_score ({e}); run scripts/sync_feedback_scores.py")
+        return
+
+    if scores:
+        print(f"Backfilled feedback_score for {len(scores)} candidates")
+
+
+def rebuild_feedback_rollup(db: Session) -> None:
+    """
+    Recompute the rollup table from the raw feedback table.
+    """
+
+    db.query(CandidateFeedbackStats).delete()
+
+    source = (
         db.query(
-            Feedback.feedback_type,
-            func.count(Feedback.id)
+            Feedback.candidate_id,
+            func.count(case((Feedback.feedback_type == "up", 1))),
+            func.count(case((Feedback.feedback_type == "down", 1)))
         )
-        .filter(Feedback.candidate_id == candidate_id)
-        .group_by(Feedback.feedback_type)
-        .all()
+        .filter(Feedback.candidate_id.isnot(None))
+        .group_by(Feedback.candidate_id)
     )
 
-    bonus = 0.0
+    db.execute(
+        sa_insert(CandidateFeedbackStats).from_select(
+            ["candidate_id", "up_count", "down_count"],
+            source
+        )
+    )
+    db.commit()
+
+
+def ensure_feedback_rollup(db: Session) -> None:
+    """
+    Backfill the rollup once for feedback recorded before it existed.
+    """
+
+    rollup_empty = db.query(CandidateFeedbackStats.candidate_id).first() is None
+    has_feedback = db.query(Feedback.id).first() is not None
+
+    if rollup_empty and has_feedback:
+        rebuild_feedback_rollup(db)
+
+
+def rerank_with_feedback(
+    candidates: List[Dict],
+    feedback_weights: Dict[str, float],
+    top_k: int
+) -> List[Dict]:
+    """
+    Apply feedback multipliers to a retrieved candidate pool,
+    re-sort it and keep the best top_k.
+    """
+
+    reranked = []
+
+    for candidate in candidates:
+        weight = feedback_weights.get(candidate.get("id"), 1.0)
+        reranked.append({
+            **candidate,
+            "score": round(candidate.get("score", 0.0) * weight, 2)
+        })
+
+    # Stable sort keeps vector order for equal scores
+    reranked.sort(key=lambda c: c["score"], reverse=True)
 
-    for feedback_type, count in feedback_stats:
-        if feedback_type == "up":
-            bonus += count * 2.0     # 👍 adds +2 per vote
-        elif feedback_type == "down":
-            bonus -= count * 3.0     # 👎 subtracts -3 per vote
+    top = reranked[:top_k]
+    for i, candidate in enumerate(top, 1):
+        candidate["ranking"] = i
 
-    return bonus
+    return top
@@ -0,0 +1,226 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from app.config import Config
+from app.core.embedding_cache import normalize_text
+from app.schemas.search import SearchRequest
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # optional: only needed for SEARCH_CACHE_BACKEND=redis
+    aioredis = None
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def response_etag(body: Dict) -> str:
+    return '"' + hashlib.sha1(_dumps(body).encode("utf-8")).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+# ---------------------------
+# Stores
+# ---------------------------
+class MemoryResponseStore:
+    """
+    In-process LRU. Entries and the feedback version are per worker.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[str, Tuple[Dict, float]]" = OrderedDict()
+        self.feedback_version = 0
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[Dict]:
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at and time.monotonic() > expires_at:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    async def set(self, key: str, value: Dict, ttl: float) -> None:
+        with self.lock:
+            self.entries[key] = (value, time.monotonic() + ttl if ttl else 0.0)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    async def get_version(self) -> int:
+        return self.feedback_version
+
+    async def incr_version(self) -> int:
+        with self.lock:
+            self.feedback_version += 1
+            # Older versions can never be read again
+            self.entries.clear()
+            return self.feedback_version
+
+    async def close(self) -> None:
+        pass
+
+    def stats(self) -> Dict:
+        with self.lock:
+            return {"size": len(self.entries), "evictions": self.evictions}
+
+
+class RedisResponseStore:
+    """
+    Redis (or any server speaking its protocol): entries and the feedback
+    version are shared by all workers. Stale versions expire with their TTL.
+    """
+
+    backend = "redis"
+
+    def __init__(self, url: str, prefix: str = "search_cache:"):
+        if aioredis is None:
+            raise RuntimeError("SEARCH_CACHE_BACKEND=redis requires the redis package")
+
+        self.client = aioredis.from_url(url)
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[Dict]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: Dict, ttl: float) -> None:
+        await self.client.set(self.prefix + key, _dumps(value), ex=int(ttl) or None)
+
+    async def get_version(self) -> int:
+        return int(await self.client.get(self.prefix + "feedback_version") or 0)
+
+    async def incr_version(self) -> int:
+        return await self.client.incr(self.prefix + "feedback_version")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def stats(self) -> Dict:
+        return {}
+
+
+# ---------------------------
+# Response Cache
+# ---------------------------
+class ResponseCache:
+    """
+    Whole search responses keyed on the normalized request and the
+    feedback version current when the search started. Every feedback write
+    bumps the version, so a ranking computed before it is never served
+    again. Backend errors only bypass the cache.
+    """
+
+    def __init__(self, store, ttl: float):
+        self.store = store
+        self.ttl = ttl
+        self.metrics = {"hits": 0, "misses": 0, "errors": 0, "invalidations": 0}
+
+    @staticmethod
+    def request_key(request: SearchRequest) -> str:
+        raw = _dumps({
+            "query": normalize_text(request.query),
+            "top_k": request.top_k or Config.TOP_K_RESULTS,
+            "industry": request.industry,
+            "salary_range": request.salary_range,
+            "location_filter": request.location_filter,
+            # Settings that change the response for the same request
+            "context": [Config.FEEDBACK_BOOST_MODE, Config.EXPLANATION_MODE, Config.GEMINI_MODEL],
+        })
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _failed(self, action: str, e: Exception) -> None:
+        self.metrics["errors"] += 1
+        print(f"⚠️ Search cache {action} failed: {e}")
+
+    async def version(self) -> Optional[int]:
+        """
+        Current feedback version, or None when the cache is off or unreachable.
+        """
+        if self.store is None:
+            return None
+        try:
+            return await self.store.get_version()
+        except Exception as e:
+            self._failed("version read", e)
+            return None
+
+    async def get(self, key: str, version: Optional[int]) -> Optional[Dict]:
+        if version is None:
+            return None
+        try:
+            body = await self.store.get(f"{version}:{key}")
+        except Exception as e:
+            self._failed("read", e)
+            return None
+
+        self.metrics["hits" if body is not None else "misses"] += 1
+        return body
+
+    async def put(self, key: str, version: Optional[int], body: Dict) -> None:
+        if version is None:
+            return
+        try:
+            await self.store.set(f"{version}:{key}", body, self.ttl)
+        except Exception as e:
+            self._failed("write", e)
+
+    async def invalidate(self) -> None:
+        if self.store is None:
+            return
+        try:
+            await self.store.incr_version()
+            self.metrics["invalidations"] += 1
+        except Exception as e:
+            self._failed("invalidation", e)
+
+    async def close(self) -> None:
+        if self.store is not None:
+            await self.store.close()
+
+    def stats(self) -> Dict:
+        if self.store is None:
+            return {"backend": "none"}
+        return {"backend": self.store.backend, **self.store.stats(), **self.metrics}
+
+
+def build_response_store():
+    if Config.SEARCH_CACHE_BACKEND == "redis":
+        return RedisResponseStore(Config.SEARCH_CACHE_REDIS_URL)
+    if Config.SEARCH_CACHE_BACKEND == "memory" and Config.SEARCH_CACHE_SIZE > 0:
+        return MemoryResponseStore(Config.SEARCH_CACHE_SIZE)
+    return None
+
+
+def response_cache_ttl() -> float:
+    # A per-worker store never sees other workers' votes; bound its staleness
+    # the way the prompt rules cache is bounded
+    if Config.SEARCH_CACHE_BACKEND == "memory" and Config.FEEDBACK_RULES_TTL > 0:
+        if Config.SEARCH_CACHE_TTL <= 0:
+            return Config.FEEDBACK_RULES_TTL
+        return min(Config.SEARCH_CACHE_TTL, Config.FEEDBACK_RULES_TTL)
+    return Config.SEARCH_CACHE_TTL
+
+
+search_cache = ResponseCache(build_response_store(), ttl=response_cache_ttl())
@@ -0,0 +1,132 @@
+import base64
+import binascii
+import json
+import secrets
+from typing import Dict, List, Optional, Tuple
+
+from app.config import Config
+from app.core.vector_search import require_vector_search
+from app.core.response_cache import MemoryResponseStore, RedisResponseStore
+from app.core.search_pipeline import (
+    RankedCandidates,
+    retrieve_ranked_candidates,
+    explain_candidates,
+    build_result_item,
+)
+from app.schemas.search import SearchRequest
+
+
+class SnapshotExpired(Exception):
+    pass
+
+
+# ---------------------------
+# Cursors
+# ---------------------------
+def encode_cursor(snapshot_id: str, offset: int, page_size: int) -> str:
+    raw = json.dumps({"s": snapshot_id, "o": offset, "n": page_size}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        snapshot_id, offset, page_size = str(data["s"]), int(data["o"]), int(data["n"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+
+    if offset < 0 or not 0 < page_size <= Config.MAX_TOP_K:
+        raise ValueError("Invalid cursor")
+    return snapshot_id, offset, page_size
+
+
+# ---------------------------
+# Ranking Snapshots
+# ---------------------------
+def build_snapshot_store():
+    # Same backend as the response cache, but not cleared by feedback writes:
+    # a cursor keeps paging the ranking it started with
+    if Config.SEARCH_CACHE_BACKEND == "redis":
+        return RedisResponseStore(Config.SEARCH_CACHE_REDIS_URL, prefix="search_snapshot:")
+    return MemoryResponseStore(max(1, Config.SEARCH_SNAPSHOT_SIZE))
+
+
+snapshot_store = build_snapshot_store()
+
+
+def _next_cursor(snapshot_id: str, offset: int, page_size: int, total: int) -> Optional[str]:
+    if offset + page_size >= total:
+        return None
+    return encode_cursor(snapshot_id, offset + page_size, page_size)
+
+
+async def _explained_page(query: str, candidates: List[Dict], feedback_adjustment: str) -> List[Dict]:
+    # Gemini only ever sees one page, never the whole ranking
+    explanations = await explain_candidates(
+        query, RankedCandidates(candidates, feedback_adjustment, None)
+    )
+    return [
+        build_result_item(candidate, explanations.get(candidate.get("id"), ""))
+        for candidate in candidates
+    ]
+
+
+async def first_page(request: SearchRequest) -> Dict:
+    """
+    Rank up to SEARCH_PAGE_DEPTH candidates once, keep the ranking (point
+    ids and scores only) as a snapshot, and return its first top_k results.
+    """
+    page_size = min(request.top_k or Config.TOP_K_RESULTS, Config.MAX_TOP_K)
+
+    ranked = await retrieve_ranked_candidates(
+        request.model_copy(update={"top_k": max(page_size, Config.SEARCH_PAGE_DEPTH)})
+    )
+    candidates = ranked.candidates
+
+    snapshot_id = secrets.token_urlsafe(12)
+    await snapshot_store.set(
+        snapshot_id,
+        {
+            "query": request.query,
+            "feedback_adjustment": ranked.feedback_adjustment,
+            "hits": [[c["point_id"], c["score"]] for c in candidates],
+        },
+        Config.SEARCH_SNAPSHOT_TTL
+    )
+
+    return {
+        "query": request.query,
+        "results": await _explained_page(request.query, candidates[:page_size], ranked.feedback_adjustment),
+        "next_cursor": _next_cursor(snapshot_id, 0, page_size, len(candidates)),
+        "total": len(candidates),
+    }
+
+
+async def next_page(cursor: str) -> Dict:
+    """
+    Page of a stored ranking. Payloads are re-read from Qdrant by point id;
+    candidates deleted since the snapshot are skipped.
+    """
+    snapshot_id, offset, page_size = decode_cursor(cursor)
+
+    snapshot = await snapshot_store.get(snapshot_id)
+    if snapshot is None:
+        # Also what a cursor issued by another worker looks like without Redis
+        raise SnapshotExpired("Cursor expired or unknown to this worker, start a new search")
+
+    hits = snapshot["hits"][offset:offset + page_size]
+    payloads = await require_vector_search().get_candidates([point_id for point_id, _ in hits])
+
+    candidates = [
+        {"ranking": offset + i, "point_id": point_id, "id": point_id, "score": score, **payloads[point_id]}
+        for i, (point_id, score) in enumerate(hits, 1)
+        if point_id in payloads
+    ]
+
+    return {
+        "query": snapshot["query"],
+        "results": await _explained_page(snapshot["query"], candidates, snapshot["feedback_adjustment"]),
+        "next_cursor": _next_cursor(snapshot_id, offset, page_size, len(snapshot["hits"])),
+        "total": len(snapshot["hits"]),
+    }
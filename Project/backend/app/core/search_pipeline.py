@@ -0,0 +1,194 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, NamedTuple, Tuple
+from app.config import Config
+from app.core.vector_search import require_vector_search
+from app.core.gemini import gemini_client, parse_explanations
+from app.core.explanation_cache import ExplanationCache
+from app.db.database import run_in_session
+from app.core.feedback_optimizer import feedback_rules
+from app.core.ranking_optimizer import calculate_feedback_scores, rerank_with_feedback
+from app.schemas.search import SearchRequest
+
+
+explanation_cache = ExplanationCache(
+    max_size=Config.EXPLANATION_CACHE_SIZE,
+    semantic_max_size=Config.EXPLANATION_SEMANTIC_CACHE_SIZE,
+    ttl=Config.EXPLANATION_CACHE_TTL,
+    similarity_threshold=Config.EXPLANATION_SEMANTIC_THRESHOLD,
+    min_overlap=Config.EXPLANATION_SEMANTIC_MIN_OVERLAP
+)
+
+
+class RankedCandidates(NamedTuple):
+    candidates: List[Dict]
+    feedback_adjustment: str
+    query_vector: List[float]
+
+
+async def retrieve_ranked_candidates(request: SearchRequest) -> RankedCandidates:
+    """
+    Retrieve the candidate pool once and rank it with feedback: inside
+    Qdrant (FEEDBACK_BOOST_MODE=server) or in process (client).
+    """
+
+    top_k = request.top_k or Config.TOP_K_RESULTS
+    vector_search = require_vector_search()
+
+    # ---------------------------------
+    # 1️⃣ Embed Query + feedback prompt rules (in-process cache)
+    # ---------------------------------
+    query_vector, feedback_adjustment = await asyncio.gather(
+        vector_search.embed_query(request.query, request.industry),
+        feedback_rules.get()
+    )
+
+    # ---------------------------------
+    # 2️⃣ Server-side boost: Qdrant ranks the pool by feedback_score
+    # ---------------------------------
+    if Config.FEEDBACK_BOOST_MODE == "server":
+        candidates = await vector_search.search_similar(
+            request.query,
+            top_k=top_k,
+            industry=request.industry,
+            salary_range=request.salary_range,
+            location_filter=request.location_filter,
+            query_vector=query_vector,
+            feedback_boost=True
+        )
+        return RankedCandidates(candidates, feedback_adjustment, query_vector)
+
+    # ---------------------------------
+    # 2️⃣ Retrieve Candidate Pool (single pass)
+    # ---------------------------------
+    candidate_pool = await vector_search.search_similar(
+        request.query,
+        top_k=max(Config.SEARCH_CANDIDATE_POOL, top_k),
+        industry=request.industry,
+        salary_range=request.salary_range,
+        location_filter=request.location_filter,
+        query_vector=query_vector
+    )
+
+    # ---------------------------------
+    # 3️⃣ Feedback Re-rank (in process)
+    # ---------------------------------
+    feedback_bonuses = await run_in_session(
+        calculate_feedback_scores,
+        [candidate.get("id") for candidate in candidate_pool]
+    )
+
+    feedback_weights: Dict[str, float] = {
+        candidate_id: 1 + bonus
+        for candidate_id, bonus in feedback_bonuses.items()
+    }
+
+    return RankedCandidates(
+        rerank_with_feedback(candidate_pool, feedback_weights, top_k),
+        feedback_adjustment,
+        query_vector
+    )
+
+
+def _cached_explanations(query: str, ranked: RankedCandidates) -> Tuple[Dict[str, str], List[Dict]]:
+    """
+    Look up the explanation cache; return (cached explanations, candidates still to explain).
+    """
+    candidate_ids = [c.get("id") for c in ranked.candidates]
+    cached = explanation_cache.get(
+        query, candidate_ids, ranked.feedback_adjustment, gemini_client.model, ranked.query_vector
+    )
+    missing = [c for c in ranked.candidates if c.get("id") not in cached]
+    return cached, missing
+
+
+def _store_explanations(query: str, ranked: RankedCandidates, explanations: Dict[str, str]) -> None:
+    explanation_cache.put(
+        query,
+        [c.get("id") for c in ranked.candidates],
+        ranked.feedback_adjustment,
+        gemini_client.model,
+        explanations,
+        ranked.query_vector
+    )
+
+
+async def explain_candidates(query: str, ranked: RankedCandidates) -> Dict[str, str]:
+    """
+    Candidate id -> Gemini explanation, served from the explanation cache
+    where possible. Only uncached candidates are sent to Gemini.
+    """
+    explanations, missing = _cached_explanations(query, ranked)
+
+    if missing:
+        optimized_query = query + "\n" + ranked.feedback_adjustment
+
+        if Config.EXPLANATION_MODE == "parallel":
+            explanations.update(
+                await gemini_client.generate_structured_explanations(optimized_query, missing)
+            )
+        else:
+            try:
+                text = await gemini_client.generate_text(optimized_query, missing) or ""
+            except Exception:
+                text = ""
+            explanations.update(parse_explanations(text, missing))
+
+        _store_explanations(query, ranked, explanations)
+
+    return explanations
+
+
+async def stream_candidate_explanations(
+    query: str,
+    ranked: RankedCandidates
+) -> AsyncIterator[Tuple[str, str]]:
+    """
+    Yield (candidate id, explanation): cached ones first, then the rest
+    as Gemini streams them.
+    """
+    explanations, missing = _cached_explanations(query, ranked)
+
+    for candidate_id, text in explanations.items():
+        yield candidate_id, text
+
+    if not missing:
+        return
+
+    optimized_query = query + "\n" + ranked.feedback_adjustment
+
+    if Config.EXPLANATION_MODE == "parallel":
+        stream = gemini_client.iter_structured_explanations(optimized_query, missing)
+    else:
+        stream = gemini_client.stream_explanations(optimized_query, missing)
+
+    try:
+        async for candidate_id, text in stream:
+            explanations[candidate_id] = text
+            yield candidate_id, text
+    finally:
+        _store_explanations(query, ranked, explanations)
+
+
+def build_result_item(candidate: Dict, explanation: str = "") -> Dict:
+    return {
+        "id": candidate.get("id"),
+        "name": candidate.get("name"),
+        "category": candidate.get("category"),
+        "industry": candidate.get("industry"),
+        "role": candidate.get("role"),
+        "role_en": candidate.get("role_en"),
+        "skills": candidate.get("skills", []),
+        "experience_years": candidate.get("experience_years"),
+        "education": candidate.get("education"),
+        "additional_education": candidate.get("additional_education", []),
+        "licenses": candidate.get("licenses", []),
+        "location": candidate.get("location"),
+        "languages": candidate.get("languages", []),
+        "salary": candidate.get("salary"),
+        "availability": candidate.get("availability"),
+        "applicable_tes": candidate.get("applicable_tes"),
+        "summary": candidate.get("summary"),
+        "qualification_issues": candidate.get("qualification_issues", []),
+        "match_score": candidate.get("score"),
+        "explanation": explanation
+    }
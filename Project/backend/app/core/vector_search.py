@@ -1,82 +1,107 @@
-from qdrant_client import QdrantClient, models
-from transformers import AutoModel
-from typing import List, Dict, Optional
+from qdrant_client import AsyncQdrantClient, models
+from typing import AsyncIterator, List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+import time
 from app.config import Config
+from app.core.embedding_cache import EmbeddingCache
+from app.core.embedding_batcher import EmbeddingBatcher
+from app.core.encoders import load_encoder
+from app.core.qdrant_schema import (
+    CANDIDATE_PAYLOAD_INDEXES,
+    FEEDBACK_SCORE_FIELD,
+    STANDARD_PAYLOAD_INDEXES,
+    candidate_search_params,
+    collection_embedding_dim,
+    feedback_boost_formula,
+    feedback_score_operations,
+    missing_payload_indexes,
+)
+
+# Seconds between retries of a failed professional standards load
+STANDARDS_RETRY_INTERVAL = 30
 
 
 class VectorSearch:
     def __init__(self):
-        self.encoder = AutoModel.from_pretrained(
-            "jinaai/jina-embeddings-v3",
-            trust_remote_code=True
-        )
-        self.client = QdrantClient(
+        self.encoder = load_encoder()
+        self.client = AsyncQdrantClient(
             host=Config.QDRANT_HOST,
             port=Config.QDRANT_PORT
         )
+        # Encoder inference runs off the event loop in a bounded pool
+        self.encoder_executor = ThreadPoolExecutor(
+            max_workers=Config.ENCODER_MAX_WORKERS,
+            thread_name_prefix="encoder"
+        )
+        self.embedding_batcher = EmbeddingBatcher(
+            encode_fn=self.encode,
+            executor=self.encoder_executor,
+            window_ms=Config.EMBEDDING_BATCH_WINDOW_MS,
+            max_batch_size=Config.EMBEDDING_BATCH_MAX_SIZE,
+            max_in_flight=Config.ENCODER_MAX_WORKERS
+        )
+        self.embedding_cache = EmbeddingCache(
+            max_size=Config.EMBEDDING_CACHE_SIZE,
+            ttl=Config.EMBEDDING_CACHE_TTL,
+            disk_dir=Config.EMBEDDING_CACHE_DIR,
+            disk_capacity=Config.EMBEDDING_CACHE_DISK_CAPACITY,
+            dim=Config.EMBEDDING_DIM
+        )
+
+        # industry -> professional standard payload / enriched query text
+        self.standards: Dict[str, Dict] = {}
+        self.standard_queries: Dict[str, str] = {}
+        self.default_standard_query = self.build_standard_query({})
+        self.standards_version: Optional[str] = None
+        self.standards_loaded = False
+        self.standards_checked_at = 0.0
 
     # ---------------------------
     # Embed Query
     # ---------------------------
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        return self.encoder.encode(
-            texts,
-            task="retrieval.query"
-        ).tolist()
+    def encode(self, texts: List[str], task: str) -> List[List[float]]:
+        vectors = self.encoder.encode(texts, task=task, truncate_dim=Config.EMBEDDING_DIM).tolist()
 
-    # ---------------------------
-    # Collection Info
-    # ---------------------------
-    def get_collection_info(self) -> Dict:
-        try:
-            return {
-                "status": "ok",
-                "candidates_collection":
-                    self.client.get_collection(Config.QDRANT_COLLECTION_NAME),
-                "professional_standards_collection":
-                    self.client.get_collection(Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD)
-            }
-        except Exception as e:
-            return {"status": "error", "error": str(e)}
+        for text, vector in zip(texts, vectors):
+            self.embedding_cache.put(text, task, vector)
 
-    # ---------------------------
-    # Search Similar Candidates
-    # ---------------------------
-    def search_similar(
-        self,
-        query: str,
-        top_k: int = Config.TOP_K_RESULTS,
-        industry: Optional[str] = None,
-        salary_range: Optional[Dict[str, int]] = None,
-        location_filter: Optional[float] = None,
-        feedback_weights: Optional[Dict[str, float]] = None
-    ) -> List[Dict]:
+        return vectors
 
-        # ---------------------------
-        # 1️⃣ Get professional standard
-        # ---------------------------
-        standard_payload = {}
+    def embed_texts(self, texts: List[str], task: str = "retrieval.query") -> List[List[float]]:
+        embeddings = [self.embedding_cache.get(text, task) for text in texts]
 
-        if industry:
-            try:
-                standard_search = self.client.query_points(
-                    collection_name=Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD,
-                    query_filter=models.Filter(must=[
-                        models.FieldCondition(
-                            key="industry",
-                            match=models.MatchValue(value=industry)
-                        )
-                    ]),
-                    limit=1,
-                    with_payload=True
-                )
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            vectors = self.encode([texts[i] for i in missing], task)
+            for i, vector in zip(missing, vectors):
+                embeddings[i] = vector
+
+        return embeddings
+
+    async def aembed_texts(self, texts: List[str], task: str = "retrieval.query") -> List[List[float]]:
+        """
+        Same as embed_texts, but cache misses go through the micro-batcher,
+        which encodes concurrent requests together in the encoder pool.
+        """
+        embeddings = [self.embedding_cache.get(text, task) for text in texts]
 
-                if hasattr(standard_search, "points") and standard_search.points:
-                    standard_payload = standard_search.points[0].payload
+        missing = [i for i, vector in enumerate(embeddings) if vector is None]
+        if missing:
+            vectors = await asyncio.gather(*(
+                self.embedding_batcher.embed(texts[i], task) for i in missing
+            ))
+            for i, vector in zip(missing, vectors):
+                embeddings[i] = vector
 
-            except Exception:
-                pass
+        return embeddings
 
+    # ---------------------------
+    # Professional Standards Index
+    # ---------------------------
+    @staticmethod
+    def build_standard_query(standard_payload: Dict) -> str:
         # Extract licenses
         license_names = []
         if isinstance(standard_payload.get("mandatory_licenses"), list):
@@ -85,20 +110,167 @@ class VectorSearch:
                     license_names.append(lic.get("name", ""))
                     license_names.append(lic.get("name_en", ""))
 
-        # Build enriched query
-        standard_query = (
+        return (
             f"{standard_payload.get('min_education', '')}, "
             f"{standard_payload.get('min_education_en', '')}, "
             f"{license_names}"
         )
 
+    async def get_standards_version(self) -> Optional[str]:
+        info = await self.client.get_collection(Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD)
+        metadata = getattr(info.config, "metadata", None) or {}
+        return metadata.get("build_version")
+
+    async def load_standards(self) -> None:
+        """
+        Load every professional standard into an industry -> standard map.
+        The collection is small and only rebuilt by setup_professionalStandard.py.
+        """
+        try:
+            version = await self.get_standards_version()
+
+            standards: Dict[str, Dict] = {}
+            offset = None
+            while True:
+                points, offset = await self.client.scroll(
+                    collection_name=Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD,
+                    limit=256,
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=False
+                )
+                for point in points:
+                    industry = (point.payload or {}).get("industry")
+                    if industry and industry not in standards:
+                        standards[industry] = point.payload
+                if offset is None:
+                    break
+
+        except Exception as e:
+            # Retried by refresh_standards() until a load succeeds
+            print(f"⚠️ Failed to load professional standards: {e}")
+            self.standards_loaded = False
+            self.standards_checked_at = time.monotonic()
+            return
+
+        self.standards = standards
+        self.standard_queries = {
+            industry: self.build_standard_query(payload)
+            for industry, payload in standards.items()
+        }
+        self.standards_version = version
+        self.standards_loaded = True
+        self.standards_checked_at = time.monotonic()
+
+    async def refresh_standards(self, force: bool = False) -> None:
+        """
+        Reload standards when forced, when the last load failed (retried every
+        STANDARDS_RETRY_INTERVAL seconds), or when the collection's build
+        version changed (checked at most every STANDARDS_REFRESH_INTERVAL).
+        """
+        if force:
+            await self.load_standards()
+            return
+
+        if not self.standards_loaded:
+            if time.monotonic() - self.standards_checked_at >= STANDARDS_RETRY_INTERVAL:
+                # Stamp before awaiting, so requests arriving during the
+                # load don't each start their own scroll
+                self.standards_checked_at = time.monotonic()
+                await self.load_standards()
+            return
+
+        interval = Config.STANDARDS_REFRESH_INTERVAL
+        if not interval or time.monotonic() - self.standards_checked_at < interval:
+            return
+
+        self.standards_checked_at = time.monotonic()
+        try:
+            if await self.get_standards_version() != self.standards_version:
+                await self.load_standards()
+        except Exception:
+            pass
+
+    # ---------------------------
+    # Collection Info
+    # ---------------------------
+    async def get_collection_info(self) -> Dict:
+        try:
+            candidates = await self.client.get_collection(Config.QDRANT_COLLECTION_NAME)
+            standards = await self.client.get_collection(Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD)
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+
+        missing = {
+            name: fields
+            for name, fields in (
+                (Config.QDRANT_COLLECTION_NAME,
+                 missing_payload_indexes(candidates, CANDIDATE_PAYLOAD_INDEXES)),
+                (Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD,
+                 missing_payload_indexes(standards, STANDARD_PAYLOAD_INDEXES)),
+            )
+            if fields
+        }
+
+        return {
+            "status": "degraded" if missing else "ok",
+            "candidates_collection": candidates,
+            "professional_standards_collection": standards,
+            "missing_payload_indexes": missing
+        }
+
+    async def check_embedding_dim(self) -> None:
+        """
+        Fail startup when a collection was built with a different embedding
+        dimension than Config.EMBEDDING_DIM; every search would be rejected.
+        """
+        for name in (Config.QDRANT_COLLECTION_NAME, Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD):
+            try:
+                dim = collection_embedding_dim(await self.client.get_collection(name))
+            except Exception as e:
+                print(f"⚠️ Could not verify embedding dimension of '{name}': {e}")
+                continue
+
+            if dim is not None and dim != Config.EMBEDDING_DIM:
+                raise RuntimeError(
+                    f"Collection '{name}' holds {dim}-dim vectors but EMBEDDING_DIM is "
+                    f"{Config.EMBEDDING_DIM}; rebuild it or change EMBEDDING_DIM"
+                )
+
+    async def check_payload_indexes(self) -> None:
+        """
+        Warn at startup when filtered fields are not indexed; re-run the
+        setup scripts to create them.
+        """
+        info = await self.get_collection_info()
+        if info["status"] == "error":
+            print(f"⚠️ Could not verify payload indexes: {info['error']}")
+        for name, fields in info.get("missing_payload_indexes", {}).items():
+            print(f"⚠️ Missing payload indexes on '{name}': {', '.join(fields)}")
+
+    # ---------------------------
+    # Embed Enriched Query
+    # ---------------------------
+    async def embed_query(self, query: str, industry: Optional[str] = None) -> List[float]:
+        """
+        Enrich the query with the industry's professional standard and embed it.
+        """
+        await self.refresh_standards()
+        standard_query = self.standard_queries.get(industry, self.default_standard_query)
+
         new_query = f"{query}. Based on professional standard: {standard_query}"
 
-        query_embedding = self.embed_texts([new_query])[0]
+        return (await self.aembed_texts([new_query]))[0]
 
-        # ---------------------------
-        # 2️⃣ Build Filters Safely
-        # ---------------------------
+    # ---------------------------
+    # Candidate Filters
+    # ---------------------------
+    @staticmethod
+    def build_candidate_filter(
+        industry: Optional[str] = None,
+        salary_range: Optional[Dict[str, int]] = None,
+        location_filter: Optional[float] = None
+    ) -> Optional[models.Filter]:
         must_conditions = []
 
         if industry:
@@ -131,32 +303,96 @@ class VectorSearch:
                 )
             )
 
-        query_filter = models.Filter(must=must_conditions) if must_conditions else None
+        return models.Filter(must=must_conditions) if must_conditions else None
+
+    # ---------------------------
+    # Ranked Candidate Points
+    # ---------------------------
+    async def query_candidates(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        query_filter: Optional[models.Filter] = None,
+        search_params: Optional[models.SearchParams] = None,
+        feedback_boost: bool = False,
+        with_payload: bool = True
+    ) -> List[models.ScoredPoint]:
+        """
+        Top `limit` points for the embedding, optionally feedback-boosted
+        inside Qdrant.
+        """
+        if feedback_boost:
+            # Vector search over the pool, then $score * (1 + feedback_score)
+            search_result = await self.client.query_points(
+                collection_name=Config.QDRANT_COLLECTION_NAME,
+                prefetch=models.Prefetch(
+                    query=query_embedding,
+                    filter=query_filter,
+                    params=search_params,
+                    limit=max(Config.SEARCH_CANDIDATE_POOL, limit)
+                ),
+                query=feedback_boost_formula(),
+                limit=limit,
+                with_payload=with_payload,
+            )
+        else:
+            search_result = await self.client.query_points(
+                collection_name=Config.QDRANT_COLLECTION_NAME,
+                query=query_embedding,
+                limit=limit,
+                query_filter=query_filter,
+                search_params=search_params,
+                with_payload=with_payload,
+            )
+
+        return search_result.points if hasattr(search_result, "points") else search_result
+
+    # ---------------------------
+    # Search Similar Candidates
+    # ---------------------------
+    async def search_similar(
+        self,
+        query: str,
+        top_k: int = Config.TOP_K_RESULTS,
+        industry: Optional[str] = None,
+        salary_range: Optional[Dict[str, int]] = None,
+        location_filter: Optional[float] = None,
+        query_vector: Optional[List[float]] = None,
+        oversampling: Optional[float] = None,
+        rescore: Optional[bool] = None,
+        feedback_boost: bool = False
+    ) -> List[Dict]:
 
         # ---------------------------
-        # 3️⃣ Vector Search
+        # 1️⃣ Enriched query embedding (unless precomputed)
         # ---------------------------
-        search_result = self.client.query_points(
-            collection_name=Config.QDRANT_COLLECTION_NAME,
-            query=query_embedding,
+        query_embedding = query_vector or await self.embed_query(query, industry)
+
+        # ---------------------------
+        # 2️⃣ Build Filters Safely
+        # ---------------------------
+        query_filter = self.build_candidate_filter(industry, salary_range, location_filter)
+
+        # ---------------------------
+        # 3️⃣ Vector Search (optionally feedback-boosted inside Qdrant)
+        # ---------------------------
+        points = await self.query_candidates(
+            query_embedding,
             limit=top_k,
             query_filter=query_filter,
-            with_payload=True,
+            search_params=candidate_search_params(oversampling, rescore),
+            feedback_boost=feedback_boost
         )
 
         results = []
-        points = search_result.points if hasattr(search_result, "points") else search_result
 
         for i, hit in enumerate(points, 1):
 
             base_score = hit.score * 100
 
-            # 🔥 Apply feedback multiplier dynamically
-            if feedback_weights and hit.id in feedback_weights:
-                base_score *= feedback_weights[hit.id]
-
             results.append({
                 "ranking": i,
+                "point_id": hit.id,
                 "id": hit.id,
                 "score": round(base_score, 2),
                 **hit.payload
@@ -164,6 +400,196 @@ class VectorSearch:
 
         return results
 
+    # ---------------------------
+    # Paging & Export
+    # ---------------------------
+    async def get_candidates(self, point_ids: List) -> Dict:
+        """
+        Point id -> payload for the given points (missing ones are left out).
+        """
+        points = await self.client.retrieve(
+            collection_name=Config.QDRANT_COLLECTION_NAME,
+            ids=point_ids,
+            with_payload=True,
+            with_vectors=False
+        )
+        return {point.id: point.payload for point in points}
+
+    async def iter_candidate_batches(
+        self,
+        query: Optional[str],
+        limit: int,
+        batch_size: int,
+        industry: Optional[str] = None,
+        salary_range: Optional[Dict[str, int]] = None,
+        location_filter: Optional[float] = None,
+        feedback_boost: bool = False
+    ) -> AsyncIterator[List[Dict]]:
+        """
+        Up to `limit` matching candidates, `batch_size` at a time: ranked by
+        `query` (one ranking, payloads fetched per batch) or, without a query,
+        in storage order (scroll). Only one batch of payloads is held in memory.
+        """
+        if not query:
+            query_filter = self.build_candidate_filter(industry, salary_range, location_filter)
+            offset, sent = None, 0
+            while sent < limit:
+                points, offset = await self.client.scroll(
+                    collection_name=Config.QDRANT_COLLECTION_NAME,
+                    scroll_filter=query_filter,
+                    limit=min(batch_size, limit - sent),
+                    offset=offset,
+                    with_payload=True,
+                    with_vectors=False
+                )
+                if points:
+                    yield [
+                        {"ranking": sent + i, "point_id": point.id, "id": point.id, "score": None, **point.payload}
+                        for i, point in enumerate(points, 1)
+                    ]
+                    sent += len(points)
+                if offset is None:
+                    return
+            return
+
+        # Rank once (ids and scores only) and slice that fixed order: paging
+        # with offsets would re-rank a growing boosted pool on every batch
+        query_filter = self.build_candidate_filter(industry, salary_range, location_filter)
+        hits = await self.query_candidates(
+            await self.embed_query(query, industry),
+            limit=limit,
+            query_filter=query_filter,
+            search_params=candidate_search_params(),
+            feedback_boost=feedback_boost,
+            with_payload=False
+        )
+
+        for start in range(0, len(hits), batch_size):
+            batch_hits = hits[start:start + batch_size]
+            payloads = await self.get_candidates([hit.id for hit in batch_hits])
+            batch = [
+                {
+                    "ranking": i,
+                    "point_id": hit.id,
+                    "id": hit.id,
+                    "score": round(hit.score * 100, 2),
+                    **payloads[hit.id]
+                }
+                # Candidates deleted since the ranking are skipped
+                for i, hit in enumerate(batch_hits, start + 1) if hit.id in payloads
+            ]
+            if batch:
+                yield batch
+
+    # ---------------------------
+    # Feedback Scores
+    # ---------------------------
+    async def set_feedback_scores(self, scores: Dict[str, float]) -> None:
+        """
+        Write feedback_score payloads for the given candidates in one batch.
+        """
+        if not scores:
+            return
+        await self.client.batch_update_points(
+            collection_name=Config.QDRANT_COLLECTION_NAME,
+            update_operations=feedback_score_operations(scores)
+        )
+
+    # ---------------------------
+    # Warm-up
+    # ---------------------------
+    async def has_feedback_scores(self) -> bool:
+        """
+        Whether any candidate carries a feedback_score payload.
+        """
+        points, _ = await self.client.scroll(
+            collection_name=Config.QDRANT_COLLECTION_NAME,
+            scroll_filter=models.Filter(must_not=[
+                models.IsEmptyCondition(is_empty=models.PayloadField(key=FEEDBACK_SCORE_FIELD))
+            ]),
+            limit=1,
+            with_payload=False,
+            with_vectors=False
+        )
+        return bool(points)
+
+    async def warm_up(self) -> Dict[str, float]:
+        """
+        One dummy encode and one Qdrant query, so the first real request
+        does not pay for lazy model/kernel init or a cold connection.
+        Returns per-step durations in ms; nothing is cached.
+        """
+        timings = {}
+        loop = asyncio.get_running_loop()
+
+        started = time.perf_counter()
+        vector = await loop.run_in_executor(
+            self.encoder_executor,
+            lambda: self.encoder.encode(["warm up"], task="retrieval.query",
+                                        truncate_dim=Config.EMBEDDING_DIM).tolist()[0]
+        )
+        timings["encode_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        started = time.perf_counter()
+        await self.client.query_points(
+            collection_name=Config.QDRANT_COLLECTION_NAME,
+            query=vector,
+            limit=1,
+            search_params=candidate_search_params(),
+            with_payload=False
+        )
+        timings["qdrant_query_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        return timings
+
+    async def close(self) -> None:
+        await self.embedding_batcher.close()
+        await self.client.close()
+        self.encoder_executor.shutdown(wait=False)
+
+
+# ---------------------------
+# Lazy Singleton
+# ---------------------------
+_vector_search: Optional[VectorSearch] = None
+_vector_search_lock = threading.Lock()
+
+
+def get_vector_search() -> VectorSearch:
+    """
+    Shared VectorSearch, built on first use (model load + Qdrant client).
+    The app builds it during warm-up, off the event loop.
+    """
+    global _vector_search
+    if _vector_search is None:
+        with _vector_search_lock:
+            if _vector_search is None:
+                _vector_search = VectorSearch()
+    return _vector_search
+
+
+def peek_vector_search() -> Optional[VectorSearch]:
+    # The instance if already built; never triggers a model load
+    return _vector_search
+
+
+class VectorSearchNotReady(RuntimeError):
+    pass
+
+
+def require_vector_search() -> VectorSearch:
+    """
+    For request handlers: the built instance, or VectorSearchNotReady while
+    warm-up is still loading the model. Never builds it, or waits on the
+    build lock, on the event loop.
+    """
+    if _vector_search is None:
+        raise VectorSearchNotReady("Search is warming up, retry shortly")
+    return _vector_search
+
 
-# ✅ IMPORTANT FIX
-vector_search = VectorSearch()
+async def close_vector_search() -> None:
+    global _vector_search
+    if _vector_search is not None:
+        await _vector_search.close()
+        _vector_search = None
@@ -1,5 +1,6 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
 import os
 
 DB_USER = os.getenv("DB_USER")
@@ -13,4 +14,32 @@ DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NA
 engine = create_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
+
+
+def init_db():
+    """
+    Create missing tables and indexes (indexes too for tables that already exist).
+    """
+    from app.models import feedback  # noqa: F401  registers models on Base
+
+    Base.metadata.create_all(bind=engine)
+
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
+
+async def run_in_session(fn, *args):
+    """
+    Run a synchronous DB function with its own session in a worker thread,
+    so independent DB stages can run concurrently without blocking the loop.
+    """
+    def call():
+        db = SessionLocal()
+        try:
+            return fn(db, *args)
+        finally:
+            db.close()
+
+    return await asyncio.to_thread(call)
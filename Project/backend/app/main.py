@@ -3,14 +3,26 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.router import router as api_v1_router
 from app.config import Config
+from app.core.lifecycle import startup, shutdown
+from contextlib import asynccontextmanager
 import logging
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # DB setup runs before serving; the model load and warm-up continue in
+    # the background (see /ready)
+    await startup()
+    yield
+    await shutdown()
+
+
 # Create app
 app = FastAPI(
     title=Config.APP_NAME,
     version=Config.VERSION,
-    description="AI-powered candidate search using Qdrant + Google Gemini"
+    description="AI-powered candidate search using Qdrant + Google Gemini",
+    lifespan=lifespan
 )
 
 # CORS
@@ -31,5 +43,6 @@ async def root():
         "app": Config.APP_NAME,
         "version": Config.VERSION,
         "docs": "/docs",
-        "health": f"{Config.API_V1_PREFIX}/health"
+        "health": f"{Config.API_V1_PREFIX}/health",
+        "ready": f"{Config.API_V1_PREFIX}/ready"
     }
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, Float, String, Text, TIMESTAMP
 from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -7,8 +7,61 @@ class Feedback(Base):
     __tablename__ = "feedback"
 
     id = Column(Integer, primary_key=True, index=True)
-    candidate_id = Column(String(100))
+    candidate_id = Column(String(100), index=True)
     feedback_type = Column(String(10))
     reason = Column(Text)
     auto_tags = Column(ARRAY(String))
-    created_at = Column(TIMESTAMP, server_default=func.now())
\ No newline at end of file
+    created_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class CandidateFeedbackStats(Base):
+    """
+    Per-candidate up/down rollup kept current by the /feedback write path.
+    """
+    __tablename__ = "candidate_feedback_stats"
+
+    candidate_id = Column(String(100), primary_key=True)
+    up_count = Column(Integer, nullable=False, default=0, server_default="0")
+    down_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(TIMESTAMP, server_default=func.now(), onupdate=func.now())
+
+
+class FeedbackTagStats(Base):
+    """
+    Per-tag down-vote counters behind the prompt emphasis rules, kept
+    current by the /feedback write path. decayed_score is the time-decayed
+    count as of decayed_at.
+    """
+    __tablename__ = "feedback_tag_stats"
+
+    tag = Column(String(50), primary_key=True)
+    down_count = Column(Integer, nullable=False, default=0, server_default="0")
+    decayed_score = Column(Float, nullable=False, default=0.0, server_default="0")
+    decayed_at = Column(TIMESTAMP, server_default=func.now())
+
+
+class FeedbackHourlyStats(Base):
+    """
+    Vote counts per hour bucket for each dimension: "tag" (one row per
+    unnested auto tag), "candidate" and "all" (key ""), split by feedback type.
+    """
+    __tablename__ = "feedback_hourly_stats"
+
+    bucket = Column(TIMESTAMP, primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    feedback_type = Column(String(10), primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
+
+
+class FeedbackDailyStats(Base):
+    """
+    Same as FeedbackHourlyStats with day buckets, for windows longer than two days.
+    """
+    __tablename__ = "feedback_daily_stats"
+
+    bucket = Column(TIMESTAMP, primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    key = Column(String(100), primary_key=True)
+    feedback_type = Column(String(10), primary_key=True)
+    count = Column(Integer, nullable=False, default=0, server_default="0")
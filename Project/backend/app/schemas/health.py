@@ -4,3 +4,14 @@ class HealthCheckResponse(BaseModel):
     status: str = Field(..., description="Status of the service")
     version: Optional[str] = Field(None, description="Version of the service")
     qdrant: Dict[str, Any] = Field(..., description="Health status of the Qdrant service")
+    embedding_cache: Optional[Dict[str, Any]] = Field(None, description="Query embedding cache size and hit/miss counters")
+    embedding_batcher: Optional[Dict[str, Any]] = Field(None, description="Query embedding micro-batcher queue depth and batch sizes")
+    explanation_cache: Optional[Dict[str, Any]] = Field(None, description="Gemini explanation cache sizes and per-tier hit counters")
+    search_cache: Optional[Dict[str, Any]] = Field(None, description="Search response cache backend, size and hit/miss counters")
+    feedback_writer: Optional[Dict[str, Any]] = Field(None, description="Write-behind feedback queue depth and flush counters")
+
+
+class ReadinessResponse(BaseModel):
+    ready: bool = Field(..., description="True once the encoder and Qdrant have been warmed up")
+    error: Optional[str] = Field(None, description="Why warm-up failed, if it did")
+    timings: Dict[str, float] = Field(default_factory=dict, description="Startup and warm-up step durations in ms")
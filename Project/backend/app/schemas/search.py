@@ -61,4 +61,27 @@ class SearchResultItem(BaseModel):
 
 class SearchResponse(BaseModel):
     query: str
-    results: List[SearchResultItem] = Field(..., description="List of search results")
\ No newline at end of file
+    results: List[SearchResultItem] = Field(..., description="List of search results")
+
+
+class SearchPageResponse(BaseModel):
+    query: str
+    results: List[SearchResultItem] = Field(..., description="One page of the ranked results")
+    next_cursor: Optional[str] = Field(None, description="Opaque cursor for the next page; null on the last page")
+    total: int = Field(..., description="Ranked results in the snapshot behind the cursor")
+
+
+class SearchExportRequest(BaseModel):
+    query: Optional[str] = Field(
+        None, description="Rank the export by this query; without one, matches are exported in storage order"
+    )
+    industry: Optional[str] = None
+    salary_range: Optional[Dict[str, int]] = None
+    location_filter: Optional[float] = None
+    limit: Optional[int] = Field(None, description="Maximum number of candidates (capped by SEARCH_EXPORT_MAX)")
+
+
+class CandidateExplanation(BaseModel):
+    # Structured Gemini output for parallel explanation mode
+    candidate_id: str
+    explanation: str
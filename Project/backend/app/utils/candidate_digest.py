@@ -0,0 +1,78 @@
+def _names(items, key, limit):
+    names = []
+    for item in (items or [])[:limit]:
+        if isinstance(item, dict):
+            name = item.get(key)
+        else:
+            name = item
+        if name:
+            names.append(str(name))
+    return names
+
+
+def build_candidate_digest(candidate: dict) -> str:
+    """
+    Compact one-line summary of a candidate for LLM prompts.
+    Computed once at ingest (scripts/setup_qdrant.py) and stored in the payload.
+    """
+    c = candidate
+    parts = []
+
+    role = c.get("role")
+    if c.get("role_en") and c.get("role_en") != role:
+        role = f"{role} ({c.get('role_en')})"
+    parts.append(f"{c.get('name')}: {role}")
+
+    if c.get("industry") or c.get("category"):
+        parts.append("/".join(filter(None, [c.get("industry"), c.get("category")])))
+
+    if c.get("experience_years") is not None:
+        parts.append(f"{c.get('experience_years')}y exp")
+
+    skills = _names(c.get("skills"), None, 8)
+    if skills:
+        parts.append("skills " + ", ".join(skills))
+
+    edu = c.get("education")
+    if isinstance(edu, dict):
+        edu = " ".join(filter(None, [edu.get("level"), edu.get("field")]))
+    if edu:
+        parts.append(f"edu {edu}")
+
+    add_edu = [
+        e.get("name") for e in (c.get("additional_education") or [])[:2]
+        if isinstance(e, dict) and e.get("name")
+    ]
+    if add_edu:
+        parts.append("also " + ", ".join(add_edu))
+
+    licenses = _names(c.get("licenses"), "name", 3)
+    if licenses:
+        parts.append("lic " + ", ".join(licenses))
+
+    languages = []
+    for lang in (c.get("languages") or [])[:3]:
+        if isinstance(lang, dict) and lang.get("language"):
+            prof = lang.get("proficiency")
+            languages.append(f"{lang['language']}({prof})" if prof else lang["language"])
+        elif isinstance(lang, str):
+            languages.append(lang)
+    if languages:
+        parts.append("lang " + ", ".join(languages))
+
+    loc = c.get("location")
+    city = loc.get("city") if isinstance(loc, dict) else loc
+    if city:
+        parts.append(str(city))
+
+    if isinstance(c.get("salary"), (int, float)):
+        parts.append(f"€{c['salary']:,}/mo")
+
+    if c.get("availability"):
+        parts.append(f"avail {c.get('availability')}")
+
+    summary = (c.get("summary") or "").strip()
+    if summary:
+        parts.append(summary[:200])
+
+    return " | ".join(parts)
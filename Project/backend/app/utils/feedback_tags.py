@@ -1,17 +1,98 @@
+import json
+import re
+from typing import Dict, List, Optional
+from app.config import Config
+
+
+# Tag -> keywords (English and Finnish). Keywords match as case-insensitive
+# substrings, so word stems cover inflected forms ("palkk" -> palkka, palkkaa,
+# palkkatoive). A "re:" prefix marks a regular expression instead, for words
+# that are too short to match as substrings ("iso" is also Finnish for "big":
+# only a standard number or the upper-case acronym counts). Tags come out in
+# this order.
+REGEX_PREFIX = "re:"
+
+DEFAULT_TAG_KEYWORDS: Dict[str, List[str]] = {
+    "salary": ["salary", "wage", "palkk"],
+    "skills": ["skill", "experience", "taito", "taidot", "osaami", "kokemu", "kokenu"],
+    "distance": ["distance", "location", "commute", "etäisyy", "sijain", "työmatk", "kaukana"],
+    "certification": [
+        "certificate", "sertifi", "pätevyy", "todistu",
+        r"re:\biso[\s-]?\d", r"re:(?-i:\bISO\b)",
+    ],
+    "education": ["education", "degree", "koulutu", "tutkin"],
+}
+
+
+def load_tag_keywords(path: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Default table, with tags from the JSON file at `path` (or
+    Config.FEEDBACK_TAGS_FILE) replacing or adding to it:
+    {"salary": ["salary", "palkk", ...], "certification": ["re:\\biso\\d", ...], ...}
+    """
+    table = {tag: list(keywords) for tag, keywords in DEFAULT_TAG_KEYWORDS.items()}
+
+    path = path if path is not None else Config.FEEDBACK_TAGS_FILE
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            table.update({tag: list(keywords) for tag, keywords in json.load(f).items()})
+
+    return table
+
+
+def keyword_pattern(keyword: str) -> str:
+    if keyword.startswith(REGEX_PREFIX):
+        return keyword[len(REGEX_PREFIX):]
+    return re.escape(keyword.casefold())
+
+
+class FeedbackTagger:
+    """
+    All keywords compiled into one case-insensitive regex, one group per
+    keyword. The alternation sits in a lookahead, so every position is
+    tried and overlapping keywords are all found in a single pass over
+    the reason.
+    """
+
+    def __init__(self, table: Dict[str, List[str]]):
+        self.tags = list(table)
+        tag_by_pattern: Dict[str, str] = {}
+        for tag, keywords in table.items():
+            for keyword in keywords:
+                tag_by_pattern.setdefault(keyword_pattern(keyword), tag)
+
+        # Longest first, so a keyword is never shadowed by its own prefix
+        patterns = sorted(tag_by_pattern, key=len, reverse=True)
+        # Group k<i> belongs to patterns[i] (named, so groups inside a
+        # regex keyword don't shift the numbering)
+        self.group_tags = {f"k{i}": tag_by_pattern[p] for i, p in enumerate(patterns)}
+        self.pattern = re.compile(
+            "(?=(?:" + "|".join(f"(?P<k{i}>{p})" for i, p in enumerate(patterns)) + "))",
+            re.IGNORECASE
+        ) if patterns else None
+
+    def __call__(self, reason: Optional[str]) -> List[str]:
+        if not reason or self.pattern is None:
+            return []
+
+        found = set()
+        for match in self.pattern.finditer(reason):
+            found.add(self.group_tags[match.lastgroup])
+            if len(found) == len(self.tags):
+                break
+
+        return [tag for tag in self.tags if tag in found]
+
+
+_tagger: Optional[FeedbackTagger] = None
+
+
+def get_tagger() -> FeedbackTagger:
+    global _tagger
+    if _tagger is None:
+        _tagger = FeedbackTagger(load_tag_keywords())
+    return _tagger
+
+
 def generate_auto_tags(reason: str):
-    tags = []
-
-    reason = (reason or "").lower()
-
-    if "salary" in reason:
-        tags.append("salary")
-    if "skill" in reason or "experience" in reason:
-        tags.append("skills")
-    if "distance" in reason or "location" in reason:
-        tags.append("distance")
-    if "certificate" in reason or "iso" in reason:
-        tags.append("certification")
-    if "education" in reason:
-        tags.append("education")
-
-    return tags
+    return get_tagger()(reason)
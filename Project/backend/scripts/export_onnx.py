@@ -0,0 +1,88 @@
+import argparse
+import shutil
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import Config
+from app.core.encoders import OnnxEncoder, TorchEncoder, embedding_parity
+
+
+PARITY_TEXTS = [
+    "Experienced electrician with a Finnish SETI license, available immediately",
+    "Sairaanhoitaja, 5 vuoden kokemus päivystyksestä, Helsinki",
+    "Forklift driver, warehouse logistics, night shifts",
+    "Software developer: Python, FastAPI, PostgreSQL",
+]
+
+# Lowest acceptable cosine similarity against the PyTorch embeddings
+FP32_MIN_SIMILARITY = 0.999
+INT8_MIN_SIMILARITY = 0.98
+
+
+def download_onnx(output_dir: Path) -> Path:
+    """
+    Fetch the ONNX export published with the model (graph + external weights).
+    """
+    from huggingface_hub import hf_hub_download
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for filename in ("onnx/model.onnx", "onnx/model.onnx_data"):
+        print(f"Downloading {Config.EMBEDDING_MODEL}/{filename}")
+        cached = hf_hub_download(Config.EMBEDDING_MODEL, filename)
+        shutil.copy(cached, output_dir / Path(filename).name)
+
+    return output_dir / "model.onnx"
+
+
+def quantize_int8(model_path: Path) -> Path:
+    """
+    Dynamic int8 quantization of the MatMul weights (activations stay fp32).
+    """
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    output_path = model_path.with_name("model_int8.onnx")
+    print(f"Quantizing to {output_path}")
+    quantize_dynamic(
+        model_input=str(model_path),
+        model_output=str(output_path),
+        weight_type=QuantType.QInt8,
+        use_external_data_format=True
+    )
+    return output_path
+
+
+def check_parity(model_path: Path, min_similarity: float) -> bool:
+    print(f"Parity check: {model_path.name} vs PyTorch")
+    reference = TorchEncoder(Config.EMBEDDING_MODEL)
+    candidate = OnnxEncoder(model_path, Config.EMBEDDING_MODEL, Config.ENCODER_THREADS)
+
+    ok = True
+    for task in ("retrieval.query", "retrieval.passage"):
+        similarity = embedding_parity(reference, candidate, PARITY_TEXTS, task, Config.EMBEDDING_DIM)
+        print(f"   {task}: min cosine {similarity:.5f} (required {min_similarity})")
+        ok = ok and similarity >= min_similarity
+
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the query encoder to ONNX for ENCODER_BACKEND=onnx")
+    parser.add_argument("--output-dir", type=Path, default=Config.ENCODER_ONNX_PATH.parent)
+    parser.add_argument("--quantize", action="store_true", help="also write a dynamic int8 model")
+    parser.add_argument("--skip-parity", action="store_true", help="do not compare against the PyTorch model")
+    args = parser.parse_args()
+
+    model_path = download_onnx(args.output_dir)
+    min_similarity = FP32_MIN_SIMILARITY
+
+    if args.quantize:
+        model_path = quantize_int8(model_path)
+        min_similarity = INT8_MIN_SIMILARITY
+
+    if not args.skip_parity and not check_parity(model_path, min_similarity):
+        print("Parity check failed, do not deploy this model")
+        sys.exit(1)
+
+    print(f"\nDone. Set ENCODER_BACKEND=onnx and ENCODER_ONNX_PATH={model_path}")
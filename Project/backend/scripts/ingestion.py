@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from qdrant_client import QdrantClient, models
+from qdrant_client.models import PointStruct
+
+
+_STOP = object()
+
+
+# ---------------------------
+# Checkpoint
+# ---------------------------
+class Checkpoint:
+    """
+    Records which collection an ingest writes to and how many source
+    records are safely stored there, so an interrupted run resumes where
+    it stopped.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    def load(self) -> Tuple[Optional[str], int]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None, 0
+        return state.get("collection"), int(state.get("next_index", 0))
+
+    def save(self, collection_name: str, next_index: int):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"collection": collection_name, "next_index": next_index}, f)
+        os.replace(tmp, self.path)
+
+    def clear(self):
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+# ---------------------------
+# Blue/Green Collections
+# ---------------------------
+def versioned_collection_name(alias: str) -> str:
+    return f"{alias}_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}"
+
+
+def resolve_alias(client: QdrantClient, alias: str) -> Optional[str]:
+    """
+    Collection currently behind `alias`, or None.
+    """
+    for entry in client.get_aliases().aliases:
+        if entry.alias_name == alias:
+            return entry.collection_name
+    return None
+
+
+def live_collection(client: QdrantClient, alias: str) -> Optional[str]:
+    """
+    Collection searches currently read: the alias target, or a legacy
+    collection literally named like the alias.
+    """
+    target = resolve_alias(client, alias)
+    if target:
+        return target
+    return alias if client.collection_exists(alias) else None
+
+
+def swap_alias(client: QdrantClient, alias: str, collection_name: str, keep_old: bool = False):
+    """
+    Atomically point `alias` at `collection_name` and drop the previous
+    collection (unless keep_old).
+    """
+    old = resolve_alias(client, alias)
+    operations = []
+
+    if old:
+        operations.append(models.DeleteAliasOperation(
+            delete_alias=models.DeleteAlias(alias_name=alias)
+        ))
+    elif client.collection_exists(alias):
+        # One-time migration: a real collection still owns the alias name
+        print(f"Migrating legacy collection '{alias}' to an alias")
+        client.delete_collection(alias)
+
+    operations.append(models.CreateAliasOperation(
+        create_alias=models.CreateAlias(collection_name=collection_name, alias_name=alias)
+    ))
+    client.update_collection_aliases(change_aliases_operations=operations)
+    print(f"Alias '{alias}' -> '{collection_name}'")
+
+    if old and old != collection_name and not keep_old:
+        client.delete_collection(old)
+        print(f"Deleted previous collection '{old}'")
+
+
+# ---------------------------
+# Delta Sync
+# ---------------------------
+def content_hash(value) -> str:
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(value.encode('utf-8')).hexdigest()
+
+
+def stored_hashes(client: QdrantClient, collection_name: str) -> Dict[str, Tuple[str, str]]:
+    """
+    point id -> (text_hash, payload_hash) for every point in the collection.
+    """
+    hashes = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            limit=1000,
+            offset=offset,
+            with_payload=["text_hash", "payload_hash"],
+            with_vectors=False
+        )
+        for point in points:
+            payload = point.payload or {}
+            hashes[str(point.id)] = (payload.get("text_hash"), payload.get("payload_hash"))
+        if offset is None:
+            return hashes
+
+
+# ---------------------------
+# Pipeline
+# ---------------------------
+def ingest(
+    client: QdrantClient,
+    encoder,
+    collection_name: str,
+    records: Iterable[Tuple[int, Dict]],
+    build_text: Callable[[Dict], str],
+    build_point: Callable[[int, Dict, List[float]], PointStruct],
+    checkpoint: Optional[Checkpoint] = None,
+    start_index: int = 0,
+    batch_size: int = 64,
+    upload_workers: int = 4,
+    queue_size: int = 8,
+    report_every: int = 1000,
+    truncate_dim: Optional[int] = None
+) -> int:
+    """
+    Batched encode -> bounded queue -> parallel chunked upserts.
+
+    The calling thread encodes `batch_size` records at a time and puts the
+    resulting points on a queue of at most `queue_size` chunks, which
+    `upload_workers` threads upsert concurrently. Memory therefore stays
+    bounded by the queue, not the dataset.
+
+    Records with index < start_index are skipped. After each chunk is
+    stored, the checkpoint advances to the end of the longest fully
+    stored prefix. Returns the number of records ingested.
+
+    truncate_dim is passed to the encoder (Matryoshka output size).
+    """
+    chunks: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+    lock = threading.Lock()
+    errors: List[BaseException] = []
+
+    # chunk start -> (chunk end, size, done); committed advances over finished chunks in order
+    pending: Dict[int, Tuple[int, int, bool]] = {}
+    order: List[int] = []
+    state = {"committed": start_index, "stored": 0}
+
+    def commit(chunk_start: int):
+        with lock:
+            end, size, _ = pending[chunk_start]
+            pending[chunk_start] = (end, size, True)
+            state["stored"] += size
+            while order and pending[order[0]][2]:
+                first = order.pop(0)
+                state["committed"] = pending.pop(first)[0]
+            if checkpoint is not None:
+                checkpoint.save(collection_name, state["committed"])
+
+    def upload_worker():
+        while True:
+            item = chunks.get()
+            if item is _STOP:
+                return
+            chunk_start, points = item
+            try:
+                client.upsert(collection_name=collection_name, points=points, wait=True)
+                commit(chunk_start)
+            except BaseException as e:
+                errors.append(e)
+
+    workers = [
+        threading.Thread(target=upload_worker, name=f"upsert-{i}", daemon=True)
+        for i in range(max(1, upload_workers))
+    ]
+    for worker in workers:
+        worker.start()
+
+    started = time.monotonic()
+    encoded = 0
+    last_report = 0
+
+    def flush(batch: List[Tuple[int, Dict]]):
+        nonlocal encoded
+        texts = [build_text(record) for _, record in batch]
+        vectors = encoder.encode(texts, task="retrieval.passage", truncate_dim=truncate_dim).tolist()
+        points = [
+            build_point(idx, record, vector)
+            for (idx, record), vector in zip(batch, vectors)
+        ]
+
+        chunk_start, chunk_end = batch[0][0], batch[-1][0] + 1
+        with lock:
+            pending[chunk_start] = (chunk_end, len(points), False)
+            order.append(chunk_start)
+        chunks.put((chunk_start, points))
+        encoded += len(batch)
+
+    try:
+        batch: List[Tuple[int, Dict]] = []
+        for idx, record in records:
+            if errors:
+                break
+            if idx < start_index:
+                continue
+            batch.append((idx, record))
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+
+            if encoded - last_report >= report_every:
+                last_report = encoded
+                elapsed = time.monotonic() - started
+                print(f"   Encoded: {encoded} | stored: {state['stored']} | "
+                      f"{encoded / elapsed:.1f} docs/sec")
+
+        if batch and not errors:
+            flush(batch)
+    finally:
+        for _ in workers:
+            chunks.put(_STOP)
+        for worker in workers:
+            worker.join()
+
+    if errors:
+        raise errors[0]
+
+    elapsed = max(time.monotonic() - started, 1e-9)
+    print(f"Ingested {state['stored']} records in {elapsed:.1f}s "
+          f"({state['stored'] / elapsed:.1f} docs/sec)")
+
+    return state["stored"]
@@ -0,0 +1,85 @@
+import gzip
+import json
+from pathlib import Path
+from typing import IO, Any, Iterator
+
+CHUNK_SIZE = 1 << 16
+NUMBER_CHARS = "0123456789+-.eE"
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def open_text(path: Path) -> IO[str]:
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_records(path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """
+    Yield records one at a time from a JSON array file, an NDJSON file
+    (one value per line) or either of them gzip-compressed (*.gz).
+    Only the record being decoded is held in memory.
+    """
+    with open_text(path) as f:
+        yield from iter_json_values(f, chunk_size)
+
+
+def iter_json_values(f: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    in_array = None
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    while True:
+        # Skip whitespace (and commas between array elements)
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ',')):
+                pos += 1
+            if pos < len(buffer) or not fill():
+                break
+
+        if pos >= len(buffer):
+            if in_array:
+                raise ValueError("Unterminated JSON array")
+            return
+
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+                continue
+
+        if in_array and buffer[pos] == ']':
+            return
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof or not fill():
+                    raise
+                continue
+            # A number cut at the end of the buffer may continue in the next chunk,
+            # including right after "." or "e" (raw_decode stops before those)
+            if not eof and _is_number(value) and not buffer[end:].strip(NUMBER_CHARS):
+                if fill():
+                    continue
+            break
+
+        pos = end
+        yield value
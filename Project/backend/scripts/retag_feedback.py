@@ -0,0 +1,100 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import String, Integer, column, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
+from app.db.database import SessionLocal
+from app.models.feedback import Feedback
+from app.utils.feedback_tags import FeedbackTagger, load_tag_keywords
+from app.core.feedback_optimizer import rebuild_feedback_tag_stats
+from app.core.feedback_stats import rebuild_feedback_time_rollups
+
+
+def apply_tags(db, changes) -> None:
+    """
+    One UPDATE ... FROM (VALUES ...) per chunk instead of a statement per row.
+    """
+    rows = values(
+        column("id", Integer),
+        column("auto_tags", ARRAY(String)),
+        name="retagged"
+    ).data(changes)
+
+    db.execute(
+        update(Feedback)
+        .where(Feedback.id == rows.c.id)
+        .values(auto_tags=rows.c.auto_tags)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def retag_feedback(tagger: FeedbackTagger, chunk_size: int = 5000, dry_run: bool = False) -> int:
+    """
+    Recompute auto_tags for every stored feedback row with the current
+    tag table. Rows stream through a server-side cursor on one session;
+    changed tags are written in chunks on another, so commits do not close
+    the cursor. Returns the number of rows whose tags changed.
+    """
+    reader = SessionLocal()
+    writer = SessionLocal()
+    scanned = changed = 0
+    pending = []
+    start = time.perf_counter()
+
+    def flush():
+        nonlocal changed
+        if pending:
+            if not dry_run:
+                apply_tags(writer, pending)
+            changed += len(pending)
+            pending.clear()
+
+    try:
+        rows = reader.execute(
+            select(Feedback.id, Feedback.reason, Feedback.auto_tags)
+            .order_by(Feedback.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for feedback_id, reason, auto_tags in rows:
+            scanned += 1
+            tags = tagger(reason)
+            if tags != (auto_tags or []):
+                pending.append((feedback_id, tags))
+                if len(pending) >= chunk_size:
+                    flush()
+
+            if scanned % (chunk_size * 20) == 0:
+                print(f"   {scanned} rows scanned, {changed + len(pending)} retagged")
+        flush()
+
+        print(f"Scanned {scanned} rows, {changed} retagged in {time.perf_counter() - start:.1f}s")
+
+        if changed and not dry_run:
+            # Tag counters and tag rollups were built from the old tags
+            rebuild_feedback_tag_stats(writer)
+            rebuild_feedback_time_rollups(writer)
+            print("Rebuilt feedback tag stats and time rollups")
+    finally:
+        reader.close()
+        writer.close()
+
+    return changed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-run the auto-tagger over stored feedback")
+    parser.add_argument("--tags-file", help="JSON tag table (default: FEEDBACK_TAGS_FILE / built-in)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--dry-run", action="store_true", help="Count changes without writing them")
+    args = parser.parse_args()
+
+    retag_feedback(
+        FeedbackTagger(load_tag_keywords(args.tags_file)),
+        chunk_size=args.chunk_size,
+        dry_run=args.dry_run
+    )
@@ -1,5 +1,5 @@
-import json
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -8,15 +8,16 @@ from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, VectorParams, PointStruct
 from transformers import AutoModel
 from app.config import Config
+from app.core.qdrant_schema import STANDARD_PAYLOAD_INDEXES, create_payload_indexes, embedding_metadata
+from scripts.ingestion import swap_alias, versioned_collection_name
+from scripts.loaders import iter_records
 
 def setup_vector_db():
     print(" Starting Vector Database Setup...\n")
     
-    # Load data
-    print(f" Loading professional standards from: {Config.STANDARDS_FILE}")
-    with open(Config.STANDARDS_FILE, 'r', encoding='utf-8') as f:
-        standards = json.load(f)
-    print(f" Loaded {len(standards)} professional standards\n")
+    # Load data (streamed: JSON array, NDJSON or .gz)
+    print(f" Streaming professional standards from: {Config.STANDARDS_FILE}\n")
+    standards = iter_records(Config.STANDARDS_FILE)
     
     # Load encoder
     print(f" Loading embedding model: {Config.EMBEDDING_MODEL}")
@@ -34,25 +35,24 @@ def setup_vector_db():
         print(f" Failed to connect to Qdrant: {e}")
         return
     
-    # Delete old collection
-    print(f"  Deleting old collection: {Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD}")
-    try:
-        client.delete_collection(Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD)
-        print("Old collection deleted\n")
-    except:
-        print("No existing collection to delete\n")
-    
+    # Build into a new versioned collection; the alias keeps serving the old one
+    alias = Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD
+    collection_name = versioned_collection_name(alias)
+
     # Create new collection
-    print(f" Creating new collection: {Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD}")
+    print(f" Creating new collection: {collection_name}")
     client.create_collection(
-        collection_name=Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD,
-        vectors_config=VectorParams(size=1024, distance=Distance.COSINE)
+        collection_name=collection_name,
+        vectors_config=VectorParams(size=Config.EMBEDDING_DIM, distance=Distance.COSINE),
+        metadata=embedding_metadata()
     )
+    create_payload_indexes(client, collection_name, STANDARD_PAYLOAD_INDEXES)
     print("Collection created\n")
     
-    # Encode and prepare points
+    # Encode and upload in chunks so memory stays bounded
     print("Encoding professional standards...")
     points = []
+    stored = 0
     for idx, standard in enumerate(standards):
         # Build comprehensive text for embedding
         text_parts = [
@@ -77,7 +77,7 @@ def setup_vector_db():
         text = ' '.join(filter(None, text_parts))
         
         # Encode to vector
-        vector = encoder.encode(text,task="retrieval.passage").tolist()
+        vector = encoder.encode(text,task="retrieval.passage", truncate_dim=Config.EMBEDDING_DIM).tolist()
         
         # Create point
         points.append(PointStruct(
@@ -86,21 +86,33 @@ def setup_vector_db():
             payload=standard
         ))
         
+        if len(points) >= Config.INGEST_BATCH_SIZE:
+            client.upsert(collection_name=collection_name, points=points)
+            stored += len(points)
+            points = []
+
         # Progress indicator
         if (idx + 1) % 10 == 0:
-            print(f"   Processed: {idx + 1}/{len(standards)} ...")
+            print(f"   Processed: {idx + 1} ...")
     
     
-    # Upload to Qdrant
-    print("Uploading to Qdrant...")
-    client.upsert(
-        collection_name=Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD, 
-        points=points
+    # Upload the remainder
+    if points:
+        client.upsert(collection_name=collection_name, points=points)
+        stored += len(points)
+    print(f"Upload complete: {stored} standards\n")
+
+    # Stamp the build so running APIs reload their in-memory standards index
+    client.update_collection(
+        collection_name=collection_name,
+        metadata={**embedding_metadata(), "build_version": datetime.now(timezone.utc).isoformat()}
     )
-    print("Upload complete\n")
     
-    # Verify
-    info = client.get_collection(Config.QDRANT_COLLECTION_PROFESSIONALSTANDARD)
+    # Verify, then switch the alias atomically
+    info = client.get_collection(collection_name)
+    print(f" Collection verified: {info.points_count} points stored\n")
+
+    swap_alias(client, alias, collection_name)
     
 
 if __name__ == "__main__":
@@ -1,114 +1,324 @@
-import json
+import argparse
 import sys
+import uuid
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
+from qdrant_client import QdrantClient, models
+from qdrant_client.models import PointStruct
 from transformers import AutoModel
 from app.config import Config
+from app.core.qdrant_schema import (
+    CANDIDATE_PAYLOAD_INDEXES,
+    candidate_quantization_config,
+    candidate_vectors_config,
+    collection_embedding_dim,
+    create_payload_indexes,
+    embedding_metadata,
+)
+from app.utils.candidate_digest import build_candidate_digest
+from scripts.loaders import iter_records
+from scripts.sync_feedback_scores import try_sync_feedback_scores
+from scripts.ingestion import (
+    Checkpoint,
+    content_hash,
+    ingest,
+    live_collection,
+    resolve_alias,
+    stored_hashes,
+    swap_alias,
+    versioned_collection_name,
+)
 
-def setup_vector_db():
-    
-    # Load data
-    print(f"Loading candidates from: {Config.CANDIDATES_FILE}")
-    with open(Config.CANDIDATES_FILE, 'r', encoding='utf-8') as f:
-        candidates = json.load(f)
-    print(f"Loaded {len(candidates)} candidates\n")
-    
-    # Load encoder
-    print(f"Loading embedding model: {Config.EMBEDDING_MODEL}")
-    encoder =  AutoModel.from_pretrained("jinaai/jina-embeddings-v3", trust_remote_code=True)
-    print("Model loaded\n")
-    
-    # Connect Qdrant
+
+def build_candidate_text(candidate: dict) -> str:
+    # Build text representation - FIX: handle nested education field
+    education_text = ""
+    if isinstance(candidate.get('education'), dict):
+        education_text = f"{candidate['education'].get('level', '')} {candidate['education'].get('field', '')} {candidate['education'].get('institution', '')}"
+    else:
+        education_text = str(candidate.get('education', ''))
+
+    # Build comprehensive text for embedding
+    text_parts = [
+        candidate.get('name', ''),
+        candidate.get('industry', ''),
+        candidate.get('category', ''),
+        candidate.get('role', ''),
+        candidate.get('role_en', ''),
+        ' '.join(candidate.get('skills', [])),
+        str(candidate.get('experience_years', '')),
+        education_text,
+        candidate.get('summary', ''),
+        candidate.get('location', {}).get('city', ''),
+        candidate.get('location', {}).get('postal code', ''),
+    ]
+
+    # Add licenses
+    if 'licenses' in candidate and isinstance(candidate['licenses'], list):
+        text_parts.extend([lic.get('name', '') for lic in candidate['licenses']])
+
+    # Add languages
+    if 'languages' in candidate and isinstance(candidate['languages'], list):
+        text_parts.extend([lang.get('language', '') for lang in candidate['languages']])
+
+    return ' '.join(filter(None, text_parts))
+
+
+def candidate_point_id(idx: int, candidate: dict):
+    # Stable across rebuilds so delta syncs can address existing points
+    if candidate.get('id') is not None:
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, f"candidate:{candidate['id']}"))
+    return idx
+
+
+def build_candidate_payload(candidate: dict, text: str) -> dict:
+    return {
+        **candidate,
+        "digest": build_candidate_digest(candidate),
+        # Used by --delta to detect changed records
+        "text_hash": content_hash(text),
+        "payload_hash": content_hash(candidate),
+    }
+
+
+def build_candidate_point(idx: int, candidate: dict, vector) -> PointStruct:
+    # Create point (with a compact digest for LLM prompts)
+    return PointStruct(
+        id=candidate_point_id(idx, candidate),
+        vector=vector,
+        payload=build_candidate_payload(candidate, build_candidate_text(candidate))
+    )
+
+
+def connect_qdrant():
     print(f"Connecting to Qdrant at {Config.QDRANT_HOST}:{Config.QDRANT_PORT}")
     client = QdrantClient(host=Config.QDRANT_HOST, port=Config.QDRANT_PORT)
-    
+
     try:
         collections = client.get_collections()
         print("Connected to Qdrant\n")
     except Exception as e:
         print(f"Failed to connect to Qdrant: {e}")
+        return None
+    return client
+
+
+def load_encoder():
+    print(f"Loading embedding model: {Config.EMBEDDING_MODEL}")
+    encoder =  AutoModel.from_pretrained("jinaai/jina-embeddings-v3", trust_remote_code=True)
+    print("Model loaded\n")
+    return encoder
+
+
+class LazyEncoder:
+    # Loads the model on first use, so a delta sync with no changes skips it
+    def __init__(self):
+        self.encoder = None
+
+    def encode(self, texts, **kwargs):
+        if self.encoder is None:
+            self.encoder = load_encoder()
+        return self.encoder.encode(texts, **kwargs)
+
+
+def load_candidates():
+    """
+    Stream candidates from Config.CANDIDATES_FILE (JSON array, NDJSON or .gz)
+    instead of parsing the whole export into memory.
+    """
+    print(f"Streaming candidates from: {Config.CANDIDATES_FILE}\n")
+    return iter_records(Config.CANDIDATES_FILE)
+
+
+def setup_vector_db(fresh: bool = False, keep_old: bool = False):
+    """
+    Full rebuild into a new versioned collection, then an atomic swap of
+    the Config.QDRANT_COLLECTION_NAME alias. Searches keep reading the
+    previous collection until the swap.
+    """
+    alias = Config.QDRANT_COLLECTION_NAME
+
+    # Load data (lazily)
+    candidates = load_candidates()
+
+    # Load encoder
+    encoder = load_encoder()
+
+    # Connect Qdrant
+    client = connect_qdrant()
+    if client is None:
         return
-    
-    # Delete old collection
-    print(f"Deleting old collection: {Config.QDRANT_COLLECTION_NAME}")
-    try:
-        client.delete_collection(Config.QDRANT_COLLECTION_NAME)
-        print("Old collection deleted\n")
-    except:
-        print("No existing collection to delete\n")
-    
-    # Create new collection
-    print(f"Creating new collection: {Config.QDRANT_COLLECTION_NAME}")
-    client.create_collection(
-        collection_name=Config.QDRANT_COLLECTION_NAME,
-        vectors_config=VectorParams(size=1024 , distance=Distance.COSINE)
-    )
-    
-    # Encode and prepare points
-    points = []
-    for idx, candidate in enumerate(candidates):
-        # Build text representation - FIX: handle nested education field
-        education_text = ""
-        if isinstance(candidate.get('education'), dict):
-            education_text = f"{candidate['education'].get('level', '')} {candidate['education'].get('field', '')} {candidate['education'].get('institution', '')}"
-        else:
-            education_text = str(candidate.get('education', ''))
-        
-        # Build comprehensive text for embedding
-        text_parts = [
-            candidate.get('name', ''),
-            candidate.get('industry', ''),
-            candidate.get('category', ''),
-            candidate.get('role', ''),
-            candidate.get('role_en', ''),
-            ' '.join(candidate.get('skills', [])),
-            str(candidate.get('experience_years', '')),
-            education_text,
-            candidate.get('summary', ''),
-            candidate.get('location', {}).get('city', ''),
-            candidate.get('location', {}).get('postal code', ''),
-        ]
-        
-        # Add licenses
-        if 'licenses' in candidate and isinstance(candidate['licenses'], list):
-            text_parts.extend([lic.get('name', '') for lic in candidate['licenses']])
-        
-        # Add languages
-        if 'languages' in candidate and isinstance(candidate['languages'], list):
-            text_parts.extend([lang.get('language', '') for lang in candidate['languages']])
-        
-        text = ' '.join(filter(None, text_parts))
-        
-        # Encode to vector
-        vector = encoder.encode(text,task="retrieval.passage").tolist()
-        
-        # Create point
-        points.append(PointStruct(
-            id=idx, 
-            vector=vector, 
-            payload=candidate
-        ))
-        
-        # Progress indicator
-        if (idx + 1) % 10 == 0:
-            print(f"   Processed: {idx + 1}/{len(candidates)} candidates...")
-    
-    
-    # Upload to Qdrant
-    client.upsert(
-        collection_name=Config.QDRANT_COLLECTION_NAME, 
-        points=points
+
+    # Resume an interrupted build if its checkpoint and collection still exist
+    checkpoint = Checkpoint(Config.INGEST_CHECKPOINT_DIR / f"{alias}.json")
+    collection_name, start_index = checkpoint.load()
+
+    # A build started with another EMBEDDING_DIM cannot be resumed
+    if collection_name and client.collection_exists(collection_name) \
+            and collection_embedding_dim(client.get_collection(collection_name)) != Config.EMBEDDING_DIM:
+        print(f"{collection_name} has a different embedding dimension, starting over\n")
+        fresh = True
+
+    if fresh or not collection_name or not client.collection_exists(collection_name):
+        if collection_name and client.collection_exists(collection_name) \
+                and collection_name != resolve_alias(client, alias):
+            client.delete_collection(collection_name)
+
+        # Create new versioned collection
+        collection_name = versioned_collection_name(alias)
+        start_index = 0
+        print(f"Creating new collection: {collection_name} "
+              f"(quantization: {Config.QDRANT_QUANTIZATION}, on-disk vectors: {Config.QDRANT_ON_DISK_VECTORS})")
+        client.create_collection(
+            collection_name=collection_name,
+            vectors_config=candidate_vectors_config(Config.EMBEDDING_DIM),
+            quantization_config=candidate_quantization_config(),
+            metadata=embedding_metadata()
+        )
+        checkpoint.save(collection_name, 0)
+    else:
+        print(f"Resuming {collection_name}: {start_index} candidates already stored\n")
+
+    # Index filtered fields before upload so they are built incrementally
+    create_payload_indexes(client, collection_name, CANDIDATE_PAYLOAD_INDEXES)
+
+    # Encode and upload in batches
+    ingest(
+        client,
+        encoder,
+        collection_name,
+        enumerate(candidates),
+        build_text=build_candidate_text,
+        build_point=build_candidate_point,
+        checkpoint=checkpoint,
+        start_index=start_index,
+        batch_size=Config.INGEST_BATCH_SIZE,
+        upload_workers=Config.INGEST_UPLOAD_WORKERS,
+        queue_size=Config.INGEST_QUEUE_SIZE,
+        truncate_dim=Config.EMBEDDING_DIM
     )
     print("Upload complete\n")
-    
-    # Verify
-    info = client.get_collection(Config.QDRANT_COLLECTION_NAME)
+
+    # Carry feedback boosts over to the new collection before it goes live
+    try_sync_feedback_scores(client, collection_name)
+
+    # Verify, then switch searches over
+    info = client.get_collection(collection_name)
     print(f"Collection verified: {info.points_count} points stored\n")
-    
+
+    swap_alias(client, alias, collection_name, keep_old=keep_old)
+    checkpoint.clear()
+
+
+def sync_vector_db():
+    """
+    Delta sync of the live collection: re-encode and upsert only candidates
+    whose embedding text changed, rewrite payloads that changed, and delete
+    candidates that disappeared from the source file.
+    """
+    alias = Config.QDRANT_COLLECTION_NAME
+
+    candidates = load_candidates()
+
+    client = connect_qdrant()
+    if client is None:
+        return
+
+    collection_name = live_collection(client, alias)
+    if collection_name is None:
+        print(f"No live collection behind '{alias}', running a full build instead\n")
+        return setup_vector_db()
+
+    live_dim = collection_embedding_dim(client.get_collection(collection_name))
+    if live_dim != Config.EMBEDDING_DIM:
+        print(f"{collection_name} uses {live_dim}-dim vectors but EMBEDDING_DIM is "
+              f"{Config.EMBEDDING_DIM}, running a full build instead\n")
+        return setup_vector_db()
+
+    create_payload_indexes(client, collection_name, CANDIDATE_PAYLOAD_INDEXES)
+
+    print(f"Reading stored hashes from {collection_name}")
+    existing = stored_hashes(client, collection_name)
+
+    counts = {"changed": 0, "payload": 0, "unchanged": 0}
+    payload_updates = []
+    seen = set()
+
+    def flush_payload_updates():
+        if payload_updates:
+            client.batch_update_points(collection_name, list(payload_updates))
+            payload_updates.clear()
+
+    def changed_candidates():
+        # Streams changed records straight into the encoder; payload-only
+        # changes are written in batches along the way
+        for idx, candidate in enumerate(candidates):
+            point_id = candidate_point_id(idx, candidate)
+            seen.add(str(point_id))
+
+            text = build_candidate_text(candidate)
+            text_hash, payload_hash = existing.get(str(point_id), (None, None))
+
+            if text_hash != content_hash(text):
+                counts["changed"] += 1
+                yield idx, candidate
+            elif payload_hash != content_hash(candidate):
+                counts["payload"] += 1
+                payload_updates.append(models.OverwritePayloadOperation(
+                    overwrite_payload=models.SetPayload(
+                        payload=build_candidate_payload(candidate, text),
+                        points=[point_id]
+                    )
+                ))
+                if len(payload_updates) >= 256:
+                    flush_payload_updates()
+            else:
+                counts["unchanged"] += 1
+
+    ingest(
+        client,
+        LazyEncoder(),
+        collection_name,
+        changed_candidates(),
+        build_text=build_candidate_text,
+        build_point=build_candidate_point,
+        batch_size=Config.INGEST_BATCH_SIZE,
+        upload_workers=Config.INGEST_UPLOAD_WORKERS,
+        queue_size=Config.INGEST_QUEUE_SIZE,
+        truncate_dim=Config.EMBEDDING_DIM
+    )
+    flush_payload_updates()
+
+    removed = [point_id for point_id in existing if point_id not in seen]
+
+    print(f"Changed: {counts['changed']} | payload only: {counts['payload']} | "
+          f"removed: {len(removed)} | unchanged: {counts['unchanged']}\n")
+
+    # Re-upserted and overwritten points lost their feedback_score
+    if counts["changed"] or counts["payload"]:
+        try_sync_feedback_scores(client, collection_name)
+
+    if removed:
+        client.delete(
+            collection_name=collection_name,
+            points_selector=models.PointIdsList(
+                points=[int(p) if p.isdigit() else p for p in removed]
+            )
+        )
+
+    print("Delta sync complete\n")
+
 
 if __name__ == "__main__":
-    setup_vector_db()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Embed candidates and load them into Qdrant")
+    parser.add_argument("--delta", action="store_true", help="only re-embed candidates that changed since the last build")
+    parser.add_argument("--fresh", action="store_true", help="ignore any checkpoint and rebuild from scratch")
+    parser.add_argument("--keep-old", action="store_true", help="keep the previous collection after the alias swap")
+    args = parser.parse_args()
+
+    if args.delta:
+        sync_vector_db()
+    else:
+        setup_vector_db(fresh=args.fresh, keep_old=args.keep_old)
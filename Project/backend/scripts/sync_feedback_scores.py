@@ -0,0 +1,62 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from qdrant_client import QdrantClient
+from app.config import Config
+from app.core.qdrant_schema import feedback_score_operations
+
+
+def sync_feedback_scores(client: QdrantClient, collection_name: str, batch_size: int = 256) -> int:
+    """
+    Copy every candidate's feedback bonus from the Postgres rollup into the
+    feedback_score payload of `collection_name`. Needed after a rebuild or
+    delta sync (new or overwritten points start without it) and to repair
+    updates the API failed to push. Returns the number of candidates synced.
+    """
+    from app.db.database import SessionLocal
+    from app.core.ranking_optimizer import iter_feedback_scores
+
+    synced = 0
+    batch = {}
+
+    def flush():
+        nonlocal synced
+        if batch:
+            client.batch_update_points(collection_name, feedback_score_operations(batch))
+            synced += len(batch)
+            batch.clear()
+
+    db = SessionLocal()
+    try:
+        for candidate_id, score in iter_feedback_scores(db):
+            batch[candidate_id] = score
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+    finally:
+        db.close()
+
+    print(f"Synced feedback_score for {synced} candidates into {collection_name}")
+    return synced
+
+
+def try_sync_feedback_scores(client: QdrantClient, collection_name: str) -> None:
+    # Used by the setup scripts: a missing database must not fail a reindex
+    try:
+        sync_feedback_scores(client, collection_name)
+    except Exception as e:
+        print(f"⚠️ Could not sync feedback scores ({e}); run scripts/sync_feedback_scores.py later")
+
+
+if __name__ == "__main__":
+    from scripts.ingestion import live_collection
+
+    client = QdrantClient(host=Config.QDRANT_HOST, port=Config.QDRANT_PORT)
+    collection_name = live_collection(client, Config.QDRANT_COLLECTION_NAME)
+    if collection_name is None:
+        print(f"No collection behind '{Config.QDRANT_COLLECTION_NAME}'")
+        sys.exit(1)
+
+    sync_feedback_scores(client, collection_name)
@@ -0,0 +1,100 @@
+# backend/tests/test_candidate_export.py
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.core.vector_search import VectorSearch
+
+
+class FakeQdrant:
+    """
+    Candidate i has vector score 1 - i / 10000; a few have feedback scores.
+    Boosted queries rank the prefetch pool by score * (1 + feedback_score).
+    """
+
+    def __init__(self, count, feedback_scores):
+        self.count = count
+        self.feedback_scores = feedback_scores
+        self.queries = []
+        self.retrieved = []
+
+    async def query_points(self, collection_name, query, limit, with_payload, prefetch=None, **kwargs):
+        self.queries.append(limit)
+        pool = range(self.count)
+        if prefetch is not None:
+            pool = range(min(self.count, prefetch.limit))
+
+        hits = [
+            SimpleNamespace(id=i, score=(1 - i / 10000) * (1 + self.feedback_scores.get(i, 0) if prefetch else 1))
+            for i in pool
+        ]
+        hits.sort(key=lambda hit: -hit.score)
+        return SimpleNamespace(points=hits[:limit])
+
+    async def retrieve(self, collection_name, ids, with_payload, with_vectors):
+        self.retrieved.append(len(ids))
+        return [SimpleNamespace(id=i, payload={"name": f"c{i}"}) for i in ids]
+
+
+def make_vector_search(client):
+    vector_search = VectorSearch.__new__(VectorSearch)
+    vector_search.client = client
+
+    async def embed_query(query, industry=None):
+        return [1.0, 0.0]
+
+    vector_search.embed_query = embed_query
+    return vector_search
+
+
+def export(vector_search, limit, batch_size, feedback_boost=True):
+    async def collect():
+        return [
+            batch async for batch in vector_search.iter_candidate_batches(
+                "electrician", limit=limit, batch_size=batch_size, feedback_boost=feedback_boost
+            )
+        ]
+    return asyncio.run(collect())
+
+
+def test_boosted_export_has_no_duplicates_or_gaps(monkeypatch):
+    monkeypatch.setattr(Config, "SEARCH_CANDIDATE_POOL", 256)
+    # Vector rank 300 jumps to the top once it is inside the pool
+    client = FakeQdrant(1000, {300: 2.0})
+
+    batches = export(make_vector_search(client), limit=600, batch_size=256)
+    ids = [row["id"] for batch in batches for row in batch]
+
+    assert len(ids) == len(set(ids)) == 600
+    assert ids[0] == 300
+    assert set(ids) == set(range(600))
+    assert [row["ranking"] for batch in batches for row in batch] == list(range(1, 601))
+    assert [len(batch) for batch in batches] == [256, 256, 88]
+
+
+def test_export_ranks_once_and_fetches_payloads_per_batch():
+    client = FakeQdrant(50, {})
+
+    batches = export(make_vector_search(client), limit=30, batch_size=10, feedback_boost=False)
+
+    assert client.queries == [30]
+    assert client.retrieved == [10, 10, 10]
+    assert batches[1][0] == {"ranking": 11, "point_id": 10, "id": 10, "score": 99.9, "name": "c10"}
+
+
+def test_deleted_candidates_are_skipped():
+    client = FakeQdrant(10, {})
+    retrieve = client.retrieve
+
+    async def retrieve_without_3(collection_name, ids, with_payload, with_vectors):
+        return [point for point in await retrieve(collection_name, ids, with_payload, with_vectors) if point.id != 3]
+
+    client.retrieve = retrieve_without_3
+    batches = export(make_vector_search(client), limit=10, batch_size=5, feedback_boost=False)
+
+    assert [row["id"] for batch in batches for row in batch] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
@@ -0,0 +1,159 @@
+# backend/tests/test_embedding_batcher.py
+
+import asyncio
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.embedding_batcher import EmbeddingBatcher
+
+
+class FakeEncoder:
+    """
+    Encodes a text as [len(text)]; records every call and the peak number
+    of calls running at once. While `gate` is set, calls block on it.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+        self.gate = None
+
+    def __call__(self, texts, task):
+        with self.lock:
+            self.calls.append((list(texts), task))
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        try:
+            if self.gate is not None:
+                assert self.gate.wait(5)
+            if "boom" in texts:
+                raise RuntimeError("encoder failed")
+            return [[float(len(text))] for text in texts]
+        finally:
+            with self.lock:
+                self.running -= 1
+
+
+@pytest.fixture
+def encoder():
+    return FakeEncoder()
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+def make_batcher(encoder, executor, window_ms=20, max_batch_size=32, max_in_flight=1):
+    return EmbeddingBatcher(encoder, executor, window_ms, max_batch_size, max_in_flight)
+
+
+def run(batcher, scenario):
+    async def wrapped():
+        try:
+            return await scenario()
+        finally:
+            await batcher.close()
+    return asyncio.run(wrapped())
+
+
+def test_concurrent_requests_share_one_encoder_call(encoder, executor):
+    batcher = make_batcher(encoder, executor)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.embed(text, "query") for text in ("a", "bb", "ccc", "bb")))
+
+    assert run(batcher, scenario) == [[1.0], [2.0], [3.0], [2.0]]
+    # One call, duplicate text encoded once
+    assert encoder.calls == [(["a", "bb", "ccc"], "query")]
+    assert batcher.stats()["batch_size_histogram"] == {4: 1}
+
+
+def test_requests_after_the_window_get_their_own_batch(encoder, executor):
+    batcher = make_batcher(encoder, executor, window_ms=10)
+
+    async def scenario():
+        first = await batcher.embed("a", "query")
+        await asyncio.sleep(0.05)
+        return first, await batcher.embed("b", "query")
+
+    assert run(batcher, scenario) == ([1.0], [1.0])
+    assert encoder.calls == [(["a"], "query"), (["b"], "query")]
+
+
+def test_full_batches_do_not_wait_for_the_window(encoder, executor):
+    batcher = make_batcher(encoder, executor, window_ms=10000, max_batch_size=3)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.embed(str(i) * i, "query") for i in range(1, 7))), 5
+        )
+
+    assert run(batcher, scenario) == [[float(i)] for i in range(1, 7)]
+    assert [len(texts) for texts, _ in encoder.calls] == [3, 3]
+    assert batcher.stats()["max_seen_batch_size"] == 3
+
+
+def test_tasks_are_encoded_separately(encoder, executor):
+    batcher = make_batcher(encoder, executor)
+
+    async def scenario():
+        return await asyncio.gather(batcher.embed("a", "query"), batcher.embed("bb", "passage"))
+
+    assert run(batcher, scenario) == [[1.0], [2.0]]
+    assert sorted(encoder.calls) == [(["a"], "query"), (["bb"], "passage")]
+
+
+def test_in_flight_batches_are_bounded(encoder, executor):
+    batcher = make_batcher(encoder, executor, window_ms=0, max_batch_size=1, max_in_flight=2)
+    encoder.gate = threading.Event()
+
+    async def scenario():
+        calls = asyncio.gather(*(batcher.embed(str(i), "query") for i in range(5)))
+        await asyncio.sleep(0.1)
+        blocked = len(encoder.calls)
+        encoder.gate.set()
+        await calls
+        return blocked
+
+    assert run(batcher, scenario) == 2
+    assert encoder.peak == 2
+    assert len(encoder.calls) == 5
+
+
+def test_cancelled_callers_are_skipped(encoder, executor):
+    batcher = make_batcher(encoder, executor, window_ms=50)
+
+    async def scenario():
+        cancelled = asyncio.create_task(batcher.embed("gone", "query"))
+        kept = asyncio.create_task(batcher.embed("kept", "query"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await kept
+
+    assert run(batcher, scenario) == [4.0]
+    assert encoder.calls == [(["kept"], "query")]
+
+
+def test_encoder_errors_reach_callers_and_batching_continues(encoder, executor):
+    batcher = make_batcher(encoder, executor)
+
+    async def scenario():
+        failed = await asyncio.gather(
+            batcher.embed("boom", "query"), batcher.embed("ok", "query"), return_exceptions=True
+        )
+        return failed, await batcher.embed("later", "query")
+
+    failed, later = run(batcher, scenario)
+    assert all(isinstance(result, RuntimeError) for result in failed)
+    assert later == [5.0]
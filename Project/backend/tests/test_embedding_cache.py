@@ -0,0 +1,124 @@
+# backend/tests/test_embedding_cache.py
+
+import multiprocessing
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import embedding_cache
+from app.core.embedding_cache import DiskEmbeddingStore, EmbeddingCache, make_key, normalize_text
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache.time, "time", lambda: now[0])
+    return now
+
+
+def test_keys_ignore_case_and_whitespace_but_not_task():
+    assert normalize_text("  Electrician\tHELSINKI ") == "electrician helsinki"
+    assert make_key("Electrician  Helsinki", "retrieval.query") == make_key("electrician helsinki", "retrieval.query")
+    assert make_key("electrician", "retrieval.query") != make_key("electrician", "retrieval.passage")
+
+
+def test_lru_eviction_and_counters():
+    cache = EmbeddingCache(max_size=2)
+    cache.put("a", "q", [1.0])
+    cache.put("b", "q", [2.0])
+    assert cache.get("a", "q") == [1.0]  # "a" becomes most recent
+    cache.put("c", "q", [3.0])           # evicts "b"
+
+    assert cache.get("b", "q") is None
+    assert cache.get("c", "q") == [3.0]
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_ttl_expiry(clock):
+    cache = EmbeddingCache(max_size=10, ttl=60)
+    cache.put("a", "q", [1.0])
+
+    clock[0] += 59
+    assert cache.get("a", "q") == [1.0]
+    clock[0] += 2
+    assert cache.get("a", "q") is None
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    cache = EmbeddingCache(max_size=10, disk_dir=str(tmp_path), disk_capacity=4, dim=3)
+    cache.put("a", "q", [0.5, 0.25, 1.0])
+
+    restarted = EmbeddingCache(max_size=10, disk_dir=str(tmp_path), disk_capacity=4, dim=3)
+    assert restarted.get("a", "q") == [0.5, 0.25, 1.0]
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_disk_tier_resets_on_dimension_change(tmp_path):
+    EmbeddingCache(max_size=10, disk_dir=str(tmp_path), disk_capacity=4, dim=3).put("a", "q", [1.0, 2.0, 3.0])
+
+    resized = EmbeddingCache(max_size=10, disk_dir=str(tmp_path), disk_capacity=4, dim=2)
+    assert resized.get("a", "q") is None
+
+
+def test_disk_slots_are_reused_round_robin(tmp_path):
+    cache = EmbeddingCache(max_size=0, disk_dir=str(tmp_path), disk_capacity=2, dim=1)
+    for text, value in (("a", 1.0), ("b", 2.0), ("c", 3.0)):
+        cache.put(text, "q", [value])
+
+    assert cache.get("a", "q") is None  # its slot went to "c"
+    assert cache.get("b", "q") == [2.0]
+    assert cache.get("c", "q") == [3.0]
+
+
+def test_workers_sharing_a_directory_never_reuse_each_others_slots(tmp_path):
+    # Two stores on one directory behave like two worker processes
+    first = DiskEmbeddingStore(tmp_path, capacity=2, dim=1)
+    second = DiskEmbeddingStore(tmp_path, capacity=2, dim=1)
+
+    first.put("a", [1.0], 0)
+    second.put("b", [2.0], 0)          # takes slot 1, not its own stale next_slot 0
+
+    assert first.get("b", 0) == ([2.0], 0)
+    assert second.get("a", 0) == ([1.0], 0)
+
+    first.put("c", [3.0], 0)           # wraps around onto "a"
+    assert second.get("a", 0) is None
+    assert second.get("c", 0) == ([3.0], 0)
+
+
+def test_reset_by_another_worker_is_picked_up(tmp_path):
+    first = DiskEmbeddingStore(tmp_path, capacity=4)
+    second = DiskEmbeddingStore(tmp_path, capacity=4)
+    first.put("a", [1.0, 2.0], 0)
+    assert second.get("a", 0) == ([1.0, 2.0], 0)
+
+    second.put("b", [3.0], 0)          # new dimension: fresh files
+    assert first.get("a", 0) is None
+    assert first.get("b", 0) == ([3.0], 0)
+
+
+def _fill(directory, worker, count):
+    store = DiskEmbeddingStore(directory, capacity=16, dim=2)
+    for i in range(count):
+        store.put(f"{worker}-{i}", [float(worker), float(i)], 0)
+
+
+def test_concurrent_processes_keep_index_and_vectors_consistent(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_fill, args=(tmp_path, worker, 40)) for worker in (1, 2)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(30)
+        assert process.exitcode == 0
+
+    store = DiskEmbeddingStore(tmp_path, capacity=16, dim=2)
+    assert len(store.entries) == 16
+    for key in store.entries:
+        worker, i = key.split("-")
+        assert store.get(key, 0) == ([float(worker), float(i)], 0)
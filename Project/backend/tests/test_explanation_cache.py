@@ -0,0 +1,72 @@
+# backend/tests/test_explanation_cache.py
+
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.explanation_cache import ExplanationCache
+
+
+MODEL = "gemini-test"
+
+
+def make_cache(**overrides):
+    options = dict(max_size=8, semantic_max_size=8, ttl=0, similarity_threshold=0.95, min_overlap=0.5)
+    options.update(overrides)
+    return ExplanationCache(**options)
+
+
+def test_exact_hit_ignores_query_case_and_whitespace():
+    cache = make_cache()
+    cache.put("Electrician Helsinki", ["c1", "c2"], "", MODEL, {"c1": "fit", "c2": "ok"})
+
+    assert cache.get("  electrician   helsinki", ["c1", "c2"], "", MODEL) == {"c1": "fit", "c2": "ok"}
+    assert cache.stats()["exact_hits"] == 1
+
+
+def test_exact_key_depends_on_candidates_adjustment_and_model():
+    cache = make_cache()
+    cache.put("q", ["c1", "c2"], "", MODEL, {"c1": "fit", "c2": "ok"})
+
+    assert cache.get("q", ["c2", "c1"], "", MODEL) == {}
+    assert cache.get("q", ["c1", "c2"], "Prioritize salary.", MODEL) == {}
+    assert cache.get("q", ["c1", "c2"], "", "other-model") == {}
+    assert cache.stats()["misses"] == 3
+
+
+def test_empty_explanations_are_not_stored():
+    cache = make_cache()
+    cache.put("q", ["c1", "c2"], "", MODEL, {"c1": "", "c2": "ok"})
+
+    assert cache.get("q", ["c1", "c2"], "", MODEL) == {"c2": "ok"}
+    cache.put("q2", ["c1"], "", MODEL, {"c1": ""})
+    assert cache.stats()["exact_size"] == 1
+
+
+def test_semantic_hit_for_similar_query_with_overlapping_candidates():
+    cache = make_cache()
+    cache.put("electrician", ["c1", "c2"], "", MODEL, {"c1": "fit", "c2": "ok"}, [1.0, 0.0])
+
+    hit = cache.get("electrical installer", ["c2", "c3"], "", MODEL, [0.99, 0.05])
+    assert hit == {"c2": "ok"}
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_semantic_miss_below_threshold_overlap_or_other_context():
+    cache = make_cache()
+    cache.put("electrician", ["c1", "c2"], "", MODEL, {"c1": "fit", "c2": "ok"}, [1.0, 0.0])
+
+    assert cache.get("nurse", ["c1", "c2"], "", MODEL, [0.0, 1.0]) == {}
+    assert cache.get("electrical", ["c2", "c3", "c4", "c5"], "", MODEL, [1.0, 0.01]) == {}
+    assert cache.get("electrical", ["c1", "c2"], "Prioritize salary.", MODEL, [1.0, 0.01]) == {}
+
+
+def test_exact_tier_evicts_least_recently_used():
+    cache = make_cache(max_size=2, semantic_max_size=0)
+    for query in ("a", "b", "c"):
+        cache.put(query, ["c1"], "", MODEL, {"c1": query})
+
+    assert cache.get("a", ["c1"], "", MODEL) == {}
+    assert cache.get("c", ["c1"], "", MODEL) == {"c1": "c"}
+    assert cache.stats()["exact_evictions"] == 1
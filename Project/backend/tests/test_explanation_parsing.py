@@ -0,0 +1,164 @@
+# backend/tests/test_explanation_parsing.py
+
+import asyncio
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.core.gemini import GeminiClient, parse_explanations, split_explanations
+
+
+CANDIDATES = [
+    {"id": 1, "name": "Aino Virtanen"},
+    {"id": 2, "name": "Mikko Korhonen"},
+    {"id": 3, "name": "Aino Virtanen"},
+]
+
+RESPONSE = (
+    "**Aino Virtanen**\nLicensed electrician.\n\n"
+    "**Mikko Korhonen**\nStrong on automation.\n\n"
+    "**Aino Virtanen**\nJunior, but certified.\n"
+)
+
+
+# ---------------------------
+# Text Responses
+# ---------------------------
+def test_split_explanations_yields_sections_with_end_offsets():
+    sections = list(split_explanations(RESPONSE))
+
+    assert [(name, text) for name, text, _ in sections] == [
+        ("Aino Virtanen", "Licensed electrician."),
+        ("Mikko Korhonen", "Strong on automation."),
+        ("Aino Virtanen", "Junior, but certified."),
+    ]
+    assert RESPONSE[sections[0][2]:].startswith("**Mikko")
+    assert sections[-1][2] == len(RESPONSE)
+
+
+@pytest.mark.parametrize("text", ["", "No markup at all", "**Unterminated name"])
+def test_split_explanations_without_complete_sections(text):
+    assert list(split_explanations(text)) == []
+
+
+def test_parse_explanations_maps_shared_names_in_ranking_order():
+    assert parse_explanations(RESPONSE, CANDIDATES) == {
+        1: "Licensed electrician.",
+        2: "Strong on automation.",
+        3: "Junior, but certified.",
+    }
+
+
+def test_parse_explanations_ignores_unknown_names_and_empty_text():
+    text = "**Someone Else**\nNot in the list.\n**Mikko Korhonen**\nGood fit."
+    assert parse_explanations(text, CANDIDATES) == {2: "Good fit."}
+    assert parse_explanations(None, CANDIDATES) == {}
+
+
+def test_stream_explanations_yields_each_section_once_it_is_complete():
+    client = GeminiClient()
+    events = []
+    chunks = ["**Aino Vir", "tanen**\nLicensed elec", "trician.\n\n**Mik", "ko Korhonen**\nStrong", " on automation.\n"]
+
+    async def stream_text(prompt, candidates):
+        for chunk in chunks:
+            events.append(("chunk", chunk))
+            yield chunk
+
+    client.stream_text = stream_text
+
+    async def collect():
+        async for candidate_id, text in client.stream_explanations("electrician", CANDIDATES[:2]):
+            events.append((candidate_id, text))
+
+    asyncio.run(collect())
+
+    assert [event for event in events if event[0] != "chunk"] == [
+        (1, "Licensed electrician."),
+        (2, "Strong on automation."),
+    ]
+    # The first section is released once the next name is complete, before the stream ends
+    assert events.index((1, "Licensed electrician.")) == 4
+
+
+# ---------------------------
+# Structured Responses
+# ---------------------------
+def fake_genai(text):
+    async def generate_content(model, contents, config):
+        return SimpleNamespace(parsed=None, text=text)
+
+    return SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+
+
+def test_generate_structured_maps_string_ids_back_to_payload_ids(monkeypatch):
+    text = json.dumps([
+        {"candidate_id": "1", "explanation": "Licensed electrician."},
+        {"candidate_id": "99", "explanation": "Not asked for."},
+    ])
+    monkeypatch.setattr(GeminiClient, "client", property(lambda self: fake_genai(text)))
+
+    result = asyncio.run(GeminiClient().generate_structured("electrician", CANDIDATES[:2]))
+    assert result == {1: "Licensed electrician."}
+
+
+@pytest.fixture
+def structured(monkeypatch):
+    monkeypatch.setattr(Config, "EXPLANATION_BATCH_SIZE", 1)
+    monkeypatch.setattr(Config, "EXPLANATION_CONCURRENCY", 4)
+    monkeypatch.setattr(Config, "EXPLANATION_TIMEOUT", 0.2)
+
+    client = GeminiClient()
+    client.cancelled = []
+
+    async def generate_structured(prompt, batch):
+        candidate = batch[0]
+        try:
+            if candidate["id"] == "slow":
+                await asyncio.sleep(10)
+            if candidate["id"] == "broken":
+                raise RuntimeError("quota exceeded")
+            await asyncio.sleep(candidate.get("delay", 0))
+        except asyncio.CancelledError:
+            client.cancelled.append(candidate["id"])
+            raise
+        return {candidate["id"]: f"why {candidate['id']}"}
+
+    client.generate_structured = generate_structured
+    return client
+
+
+def test_failed_and_timed_out_batches_are_dropped(structured):
+    candidates = [{"id": "a"}, {"id": "broken"}, {"id": "slow"}, {"id": "b"}]
+
+    result = asyncio.run(structured.generate_structured_explanations("electrician", candidates))
+    assert result == {"a": "why a", "b": "why b"}
+
+
+def test_batches_are_yielded_as_they_finish(structured):
+    candidates = [{"id": "late", "delay": 0.05}, {"id": "early"}]
+
+    async def collect():
+        return [candidate_id async for candidate_id, _ in structured.iter_structured_explanations("q", candidates)]
+
+    assert asyncio.run(collect()) == ["early", "late"]
+
+
+def test_closing_the_iterator_cancels_pending_batches(structured):
+    candidates = [{"id": "first"}, {"id": "pending", "delay": 5}, {"id": "also_pending", "delay": 5}]
+
+    async def take_one():
+        explanations = structured.iter_structured_explanations("q", candidates)
+        first = await explanations.__anext__()
+        await explanations.aclose()
+        await asyncio.sleep(0)
+        return first
+
+    assert asyncio.run(asyncio.wait_for(take_one(), 2)) == ("first", "why first")
+    assert sorted(structured.cancelled) == ["also_pending", "pending"]
@@ -0,0 +1,137 @@
+# backend/tests/test_feedback_ranking.py
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.core import ranking_optimizer, search_pipeline
+from app.core.ranking_optimizer import feedback_bonus, rerank_with_feedback
+from app.schemas.search import SearchRequest
+
+
+def pool(*scores):
+    return [{"id": f"c{i}", "ranking": i, "score": score} for i, score in enumerate(scores, 1)]
+
+
+# ---------------------------
+# Client-side Re-rank
+# ---------------------------
+def test_feedback_bonus():
+    assert feedback_bonus(0, 0) == 0
+    assert feedback_bonus(2, 1) == 2 * ranking_optimizer.UP_VOTE_BONUS - ranking_optimizer.DOWN_VOTE_PENALTY
+
+
+def test_rerank_applies_weights_and_renumbers():
+    candidates = pool(90.0, 80.0, 70.0)
+    reranked = rerank_with_feedback(candidates, {"c3": 1.5, "c1": 0.5}, top_k=3)
+
+    assert [(c["id"], c["score"], c["ranking"]) for c in reranked] == [
+        ("c3", 105.0, 1),
+        ("c2", 80.0, 2),
+        ("c1", 45.0, 3),
+    ]
+    # The retrieved pool is left untouched
+    assert candidates == pool(90.0, 80.0, 70.0)
+
+
+def test_rerank_keeps_vector_order_for_ties_and_cuts_to_top_k():
+    # c1 is boosted to 60 and ties with c2 and c3
+    reranked = rerank_with_feedback(pool(50.0, 60.0, 60.0, 40.0), {"c1": 1.2}, top_k=2)
+    assert [c["id"] for c in reranked] == ["c1", "c2"]
+
+
+def test_down_votes_sink_below_candidates_without_feedback():
+    weights = {"c1": 1 + feedback_bonus(0, 1), "c2": 1 + feedback_bonus(0, 2)}
+    reranked = rerank_with_feedback(pool(95.0, 94.0, 10.0), weights, top_k=3)
+    assert [c["id"] for c in reranked] == ["c3", "c1", "c2"]
+
+
+# ---------------------------
+# Server / Client Mode Switch
+# ---------------------------
+class StubVectorSearch:
+    def __init__(self, candidates):
+        self.candidates = candidates
+        self.searches = []
+
+    async def embed_query(self, query, industry=None):
+        return [0.1, 0.2]
+
+    async def search_similar(self, query, top_k, **kwargs):
+        self.searches.append({"top_k": top_k, **kwargs})
+        return [dict(c) for c in self.candidates[:top_k]]
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    vector_search = StubVectorSearch(pool(90.0, 80.0, 70.0, 60.0))
+    lookups = []
+
+    async def run_in_session(fn, candidate_ids):
+        lookups.append(list(candidate_ids))
+        return {"c4": 1.0}                              # one up-vote's worth
+
+    async def rules():
+        return "Prioritize salary."
+
+    monkeypatch.setattr(search_pipeline, "require_vector_search", lambda: vector_search)
+    monkeypatch.setattr(search_pipeline, "run_in_session", run_in_session)
+    monkeypatch.setattr(search_pipeline.feedback_rules, "get", rules)
+    monkeypatch.setattr(Config, "SEARCH_CANDIDATE_POOL", 4)
+    vector_search.lookups = lookups
+    return vector_search
+
+
+def rank(top_k):
+    return asyncio.run(search_pipeline.retrieve_ranked_candidates(SearchRequest(query="electrician", top_k=top_k)))
+
+
+def test_server_mode_ranks_inside_qdrant(pipeline, monkeypatch):
+    monkeypatch.setattr(Config, "FEEDBACK_BOOST_MODE", "server")
+
+    ranked = rank(top_k=2)
+
+    assert [c["id"] for c in ranked.candidates] == ["c1", "c2"]
+    assert pipeline.searches == [{
+        "top_k": 2, "industry": None, "salary_range": None, "location_filter": None,
+        "query_vector": [0.1, 0.2], "feedback_boost": True,
+    }]
+    assert pipeline.lookups == []
+    assert ranked.feedback_adjustment == "Prioritize salary."
+    assert ranked.query_vector == [0.1, 0.2]
+
+
+def test_client_mode_reranks_the_pool_in_process(pipeline, monkeypatch):
+    monkeypatch.setattr(Config, "FEEDBACK_BOOST_MODE", "client")
+
+    ranked = rank(top_k=2)
+
+    # c4 (60 * 2) overtakes the whole pool
+    assert [(c["id"], c["score"], c["ranking"]) for c in ranked.candidates] == [("c4", 120.0, 1), ("c1", 90.0, 2)]
+    assert pipeline.searches[0]["top_k"] == 4
+    assert "feedback_boost" not in pipeline.searches[0]
+    assert pipeline.lookups == [["c1", "c2", "c3", "c4"]]
+
+
+def test_client_mode_pool_covers_top_k(pipeline, monkeypatch):
+    monkeypatch.setattr(Config, "FEEDBACK_BOOST_MODE", "client")
+    monkeypatch.setattr(Config, "SEARCH_CANDIDATE_POOL", 2)
+
+    ranked = rank(top_k=3)
+    assert pipeline.searches[0]["top_k"] == 3
+    assert len(ranked.candidates) == 3
+
+
+def test_scores_are_only_pushed_to_qdrant_in_server_mode(monkeypatch):
+    monkeypatch.setattr(Config, "FEEDBACK_BOOST_MODE", "client")
+
+    async def fail(*args):
+        raise AssertionError("rollup read in client mode")
+
+    monkeypatch.setattr(ranking_optimizer, "run_in_session", fail)
+    asyncio.run(ranking_optimizer.push_feedback_scores(["c1"]))
@@ -0,0 +1,126 @@
+# backend/tests/test_feedback_stats.py
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.core import feedback_stats
+from app.core.feedback_stats import bucket_counts, parse_window, resolve_range, select_rollup
+from app.models.feedback import FeedbackDailyStats, FeedbackHourlyStats
+
+
+NOW = datetime(2026, 3, 10, 14, 35, 12)
+
+
+def test_bucket_counts_unnests_tags_per_dimension():
+    counts = bucket_counts([
+        {"candidate_id": "c1", "feedback_type": "down", "auto_tags": ["salary", "distance", "salary"]},
+        {"candidate_id": "c1", "feedback_type": "up", "auto_tags": []},
+        {"candidate_id": "c2", "feedback_type": "down", "auto_tags": ["salary"]},
+        {"candidate_id": None, "feedback_type": "up", "auto_tags": None},
+        {"candidate_id": "c3", "feedback_type": "neutral", "auto_tags": ["salary"]},
+    ])
+
+    assert counts == {
+        ("all", "", "down"): 2,
+        ("all", "", "up"): 2,
+        ("candidate", "c1", "down"): 1,
+        ("candidate", "c1", "up"): 1,
+        ("candidate", "c2", "down"): 1,
+        ("tag", "salary", "down"): 2,
+        ("tag", "distance", "down"): 1,
+    }
+    assert bucket_counts([]) == {}
+
+
+@pytest.mark.parametrize("window, expected", [
+    ("24h", timedelta(hours=24)),
+    ("7d", timedelta(days=7)),
+    (" 36H ", timedelta(hours=36)),
+])
+def test_parse_window(window, expected):
+    assert parse_window(window) == expected
+
+
+@pytest.mark.parametrize("window", ["", None, "7", "d", "7w", "-1d", "1.5h"])
+def test_parse_window_rejects_other_formats(window):
+    with pytest.raises(ValueError):
+        parse_window(window)
+
+
+def test_resolve_range():
+    assert resolve_range(None, "24h", end=NOW) == (NOW - timedelta(hours=24), NOW)
+
+    start = datetime(2026, 3, 1)
+    assert resolve_range(None, "24h", start=start, end=NOW) == (start, NOW)
+
+
+def test_resolve_range_converts_aware_datetimes_to_local():
+    end = datetime(2026, 3, 10, 12, tzinfo=timezone.utc)
+    _, resolved_end = resolve_range(None, "1h", end=end)
+    assert resolved_end == end.astimezone().replace(tzinfo=None)
+
+
+@pytest.mark.parametrize("start, end", [
+    (NOW, NOW),
+    (NOW, NOW - timedelta(hours=1)),
+    (NOW - timedelta(days=367), NOW),
+])
+def test_resolve_range_rejects_bad_ranges(start, end):
+    with pytest.raises(ValueError):
+        resolve_range(None, "24h", start=start, end=end)
+
+
+@pytest.fixture
+def retention(monkeypatch):
+    monkeypatch.setattr(Config, "FEEDBACK_HOURLY_RETENTION_DAYS", 30)
+    return timedelta(days=30)
+
+
+def test_short_recent_ranges_use_hourly_buckets(retention):
+    model, unit, first_bucket = select_rollup(NOW - timedelta(hours=48), NOW, NOW)
+
+    assert (model, unit) == (FeedbackHourlyStats, "hour")
+    assert first_bucket == datetime(2026, 3, 8, 14)
+
+
+def test_long_ranges_use_daily_buckets(retention):
+    model, unit, first_bucket = select_rollup(NOW - timedelta(hours=49), NOW, NOW)
+
+    assert (model, unit) == (FeedbackDailyStats, "day")
+    assert first_bucket == datetime(2026, 3, 8)
+
+
+def test_retention_boundary(retention):
+    at_horizon = NOW - retention
+    assert select_rollup(at_horizon, at_horizon + timedelta(hours=1), NOW)[0] is FeedbackHourlyStats
+
+    # Hourly buckets before the horizon are pruned: a short range there uses days
+    before = at_horizon - timedelta(seconds=1)
+    assert select_rollup(before, before + timedelta(hours=1), NOW)[0] is FeedbackDailyStats
+
+
+def test_prune_runs_in_its_own_session_and_survives_errors(monkeypatch):
+    calls = []
+
+    async def run_in_session(fn, *args):
+        calls.append(fn)
+        if len(calls) == 1:
+            raise ConnectionError("database down")
+
+    monkeypatch.setattr(feedback_stats, "run_in_session", run_in_session)
+
+    async def scenario():
+        task = asyncio.create_task(feedback_stats.prune_hourly_stats_periodically(interval=0.01))
+        while len(calls) < 3:
+            await asyncio.sleep(0.01)
+        task.cancel()
+
+    asyncio.run(asyncio.wait_for(scenario(), 5))
+    assert calls[:3] == [feedback_stats.prune_hourly_stats] * 3
@@ -0,0 +1,70 @@
+# backend/tests/test_feedback_tags.py
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.feedback_tags import FeedbackTagger, generate_auto_tags, load_tag_keywords
+
+
+@pytest.mark.parametrize("reason, tags", [
+    ("Salary too high", ["salary"]),
+    ("Not enough experience, wrong location", ["skills", "distance"]),
+    ("Missing ISO certificate and education", ["certification", "education"]),
+    ("palkka liian korkea", ["salary"]),
+    ("Ei osaamista, koulutus puuttuu, työmatka pitkä", ["skills", "distance", "education"]),
+    ("PÄTEVYYS puuttuu", ["certification"]),
+    ("", []),
+    (None, []),
+    ("great candidate", []),
+    ("palkka liian iso", ["salary"]),
+    ("liian isot palkkatoiveet", ["salary"]),
+    ("supervisor role missing", []),
+    ("Iso-Britanniassa asuva", []),
+    ("no iso 9001 training", ["certification"]),
+    ("Needs ISO-14001", ["certification"]),
+    ("iso9001 expired", ["certification"]),
+    ("No ISO background", ["certification"]),
+])
+def test_default_table(reason, tags):
+    assert generate_auto_tags(reason) == tags
+
+
+def test_tags_follow_table_order_not_text_order():
+    assert generate_auto_tags("education first, then salary") == ["salary", "education"]
+
+
+def test_overlapping_keywords_are_all_found():
+    tagger = FeedbackTagger({"a": ["abcd"], "b": ["bc"], "c": ["cde"]})
+    assert tagger("xabcdex") == ["a", "b", "c"]
+
+
+def test_keywords_match_as_substrings():
+    tagger = FeedbackTagger({"skills": ["skill"]})
+    assert tagger("Reskilling needed") == ["skills"]
+
+
+def test_override_file_replaces_and_adds_tags(tmp_path):
+    path = tmp_path / "tags.json"
+    path.write_text(json.dumps({"salary": ["pay"], "language": ["suom"]}), encoding="utf-8")
+
+    table = load_tag_keywords(str(path))
+    tagger = FeedbackTagger(table)
+
+    assert table["salary"] == ["pay"]
+    assert tagger("Pay too low, puhuu suomea") == ["salary", "language"]
+    assert tagger("salary too low") == []
+
+
+def test_regex_keywords_with_their_own_groups():
+    tagger = FeedbackTagger({"certification": [r"re:\b(iso|sfs)[\s-]?\d"], "salary": ["palkk"]})
+    assert tagger("SFS 6000 ja palkka") == ["certification", "salary"]
+    assert tagger("iso palkka") == ["salary"]
+
+
+def test_empty_table():
+    assert FeedbackTagger({})("salary") == []
@@ -0,0 +1,137 @@
+# backend/tests/test_feedback_writer.py
+
+import asyncio
+import os
+import sys
+
+import pytest
+from sqlalchemy.exc import DataError, OperationalError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core import feedback_writer
+from app.core.feedback_writer import FeedbackWriter, prepare_feedback
+
+
+def vote(candidate_id, feedback_type="up"):
+    return {"candidate_id": candidate_id, "feedback_type": feedback_type, "reason": None, "auto_tags": []}
+
+
+class FakeDatabase:
+    """
+    Rejects any batch holding a "bad*" candidate, or every write while down.
+    """
+
+    def __init__(self):
+        self.rows = []
+        self.calls = 0
+        self.down = False
+
+    async def run_in_session(self, fn, rows):
+        self.calls += 1
+        if self.down:
+            raise OperationalError("INSERT", {}, ConnectionError("database down"))
+        if any(row["candidate_id"].startswith("bad") for row in rows):
+            raise DataError("INSERT", {}, ValueError("value too long"))
+        self.rows.extend(rows)
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    written = []
+
+    async def after_feedback_write(rows):
+        written.append(list(rows))
+
+    monkeypatch.setattr(feedback_writer, "run_in_session", database.run_in_session)
+    monkeypatch.setattr(feedback_writer, "after_feedback_write", after_feedback_write)
+    database.after_write = written
+    return database
+
+
+def test_prepare_feedback_builds_a_row_with_tags():
+    row = prepare_feedback({"candidate_id": 42, "feedback_type": "down", "reason": "Salary too high"})
+    assert row == {"candidate_id": "42", "feedback_type": "down", "reason": "Salary too high", "auto_tags": ["salary"]}
+    assert prepare_feedback({"candidate_id": "c1", "feedback_type": "up"})["auto_tags"] == []
+
+
+@pytest.mark.parametrize("data", [
+    {"candidate_id": "c1", "feedback_type": "sideways"},
+    {"candidate_id": "c1", "feedback_type": "up" * 6},
+    {"candidate_id": "c1"},
+    {"candidate_id": "", "feedback_type": "up"},
+    {"candidate_id": "c" * 101, "feedback_type": "up"},
+    {"candidate_id": None, "feedback_type": "up"},
+    {"candidate_id": True, "feedback_type": "up"},
+    {"candidate_id": "c1", "feedback_type": "up", "reason": ["too", "far"]},
+])
+def test_prepare_feedback_rejects_rows_the_table_cannot_store(data):
+    with pytest.raises(ValueError):
+        prepare_feedback(data)
+
+
+def test_rejected_rows_are_isolated_and_dropped(database):
+    writer = FeedbackWriter(flush_size=8, flush_interval=1, max_pending=100)
+    rows = [vote("c1"), vote("c2"), vote("bad1"), vote("c3"), vote("c4"), vote("bad2"), vote("c5")]
+
+    async def scenario():
+        await writer.submit(rows)
+        await writer.flush()
+
+    asyncio.run(scenario())
+
+    assert [row["candidate_id"] for row in database.rows] == ["c1", "c2", "c3", "c4", "c5"]
+    assert writer.pending == []
+    assert writer.stats()["dropped"] == 2
+    assert writer.stats()["written"] == 5
+    assert sum(database.after_write, []) == database.rows
+
+
+def test_later_feedback_is_not_blocked_by_a_rejected_row(database):
+    writer = FeedbackWriter(flush_size=2, flush_interval=1, max_pending=2)
+
+    async def scenario():
+        await writer.submit([vote("bad"), vote("c1")])
+        await writer.submit([vote("c2")])              # queue full: flushes first
+        await writer.flush()
+
+    asyncio.run(scenario())
+    assert [row["candidate_id"] for row in database.rows] == ["c1", "c2"]
+
+
+def test_transient_errors_keep_the_batch_queued(database):
+    writer = FeedbackWriter(flush_size=4, flush_interval=1, max_pending=100)
+    database.down = True
+
+    async def scenario():
+        await writer.submit([vote("c1"), vote("c2")])
+        await writer.flush()
+        queued = len(writer.pending)
+        database.down = False
+        await writer.flush()
+        return queued
+
+    assert asyncio.run(scenario()) == 2
+    assert writer.stats()["failed_flushes"] == 1
+    assert [row["candidate_id"] for row in database.rows] == ["c1", "c2"]
+
+
+def test_transient_error_while_isolating_keeps_only_unwritten_rows(database, monkeypatch):
+    writer = FeedbackWriter(flush_size=4, flush_interval=1, max_pending=100)
+    run_in_session = database.run_in_session
+
+    async def fail_after_first_write(fn, rows):
+        if database.rows:
+            database.down = True
+        await run_in_session(fn, rows)
+
+    monkeypatch.setattr(feedback_writer, "run_in_session", fail_after_first_write)
+
+    async def scenario():
+        await writer.submit([vote("c1"), vote("c2"), vote("bad"), vote("c3")])
+        await writer.flush()
+
+    asyncio.run(scenario())
+    assert [row["candidate_id"] for row in database.rows] == ["c1", "c2"]
+    assert [row["candidate_id"] for row in writer.pending] == ["bad", "c3"]
@@ -2,6 +2,7 @@
 
 import sys
 import os
+import asyncio
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -132,6 +133,6 @@ job_query = "Looking for a skilled blockchain developer with expertise in Solidi
 
 if __name__ == "__main__":
     client = GeminiClient()
-    result = client.generate_text(job_query, test_candidates)
+    result = asyncio.run(client.generate_text(job_query, test_candidates))
     print("\nn\n")
     print(result)
\ No newline at end of file
@@ -0,0 +1,95 @@
+# backend/tests/test_ingestion.py
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pytest
+from qdrant_client.models import PointStruct
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.ingestion import Checkpoint, ingest
+
+
+class FakeEncoder:
+    def encode(self, texts, task=None, truncate_dim=None):
+        return np.ones((len(texts), truncate_dim or 4))
+
+
+class RecordingCheckpoint(Checkpoint):
+    def __init__(self, path):
+        super().__init__(path)
+        self.saved = []
+        self.first_save = threading.Event()
+
+    def save(self, collection_name, next_index):
+        self.saved.append(next_index)
+        super().save(collection_name, next_index)
+        self.first_save.set()
+
+
+def run_ingest(client, checkpoint, count=6, **kwargs):
+    return ingest(
+        client,
+        FakeEncoder(),
+        "candidates_v2",
+        ((i, {"id": f"c{i}"}) for i in range(count)),
+        build_text=lambda record: record["id"],
+        build_point=lambda idx, record, vector: PointStruct(id=idx, vector=vector, payload=record),
+        checkpoint=checkpoint,
+        batch_size=2,
+        report_every=10 ** 9,
+        **kwargs
+    )
+
+
+def test_checkpoint_waits_for_earlier_chunks(tmp_path):
+    """
+    Chunk [0, 2) is stored last; until then the checkpoint must not move
+    past 0 even though later chunks are already stored.
+    """
+
+    checkpoint = RecordingCheckpoint(tmp_path / "checkpoint.json")
+
+    class Client:
+        def upsert(self, collection_name, points, wait):
+            if points[0].id == 0:
+                # Finish only after a later chunk has been committed
+                assert checkpoint.first_save.wait(5)
+
+    stored = run_ingest(Client(), checkpoint, upload_workers=2)
+
+    assert stored == 6
+    assert checkpoint.saved[0] == 0
+    assert checkpoint.saved == sorted(checkpoint.saved)
+    assert checkpoint.load() == ("candidates_v2", 6)
+
+
+def test_failed_chunk_keeps_checkpoint_at_stored_prefix(tmp_path):
+    class Client:
+        def upsert(self, collection_name, points, wait):
+            if points[0].id == 2:
+                raise ConnectionError("qdrant down")
+
+    checkpoint = RecordingCheckpoint(tmp_path / "checkpoint.json")
+    with pytest.raises(ConnectionError):
+        run_ingest(Client(), checkpoint, upload_workers=1)
+
+    assert checkpoint.load() == ("candidates_v2", 2)
+
+
+def test_resume_skips_checkpointed_records(tmp_path):
+    class Client:
+        def __init__(self):
+            self.ids = []
+
+        def upsert(self, collection_name, points, wait):
+            self.ids.extend(p.id for p in points)
+
+    client = Client()
+    stored = run_ingest(client, Checkpoint(tmp_path / "checkpoint.json"), start_index=4)
+
+    assert stored == 2
+    assert sorted(client.ids) == [4, 5]
@@ -0,0 +1,61 @@
+# backend/tests/test_loaders.py
+
+import gzip
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scripts.loaders import iter_json_values, iter_records
+
+
+RECORDS = [
+    {"id": "c1", "salary": 3200, "score": 1.5, "skills": ["a", "b"]},
+    {"id": "c2", "salary": -4, "score": 2e3, "note": "comma, ] and } inside"},
+    {"id": "c3", "salary": 0, "score": -0.25e-1, "nested": {"x": [1, 2.5]}},
+]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 64, 1 << 16])
+def test_json_array_any_chunk_size(chunk_size):
+    text = json.dumps(RECORDS, indent=2)
+    assert list(iter_json_values(io.StringIO(text), chunk_size)) == RECORDS
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5])
+def test_top_level_numbers_split_after_dot_or_exponent(chunk_size):
+    values = list(iter_json_values(io.StringIO("[1.5, 2e3, -0.25E-1, 7]"), chunk_size))
+    assert values == [1.5, 2000.0, -0.025, 7]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 4, 1 << 16])
+def test_ndjson(chunk_size):
+    text = "\n".join(json.dumps(r) for r in RECORDS) + "\n12.75\ntrue\nnull\n"
+    assert list(iter_json_values(io.StringIO(text), chunk_size)) == RECORDS + [12.75, True, None]
+
+
+def test_empty_inputs():
+    assert list(iter_json_values(io.StringIO(""))) == []
+    assert list(iter_json_values(io.StringIO("  [ ]  "))) == []
+
+
+def test_unterminated_array_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_values(io.StringIO('[{"id": 1}, '), 4))
+
+
+def test_invalid_number_raises():
+    with pytest.raises(ValueError):
+        list(iter_json_values(io.StringIO("[1., 2]"), 2))
+
+
+def test_iter_records_gzip(tmp_path):
+    path = tmp_path / "candidates.json.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(RECORDS, f)
+
+    assert list(iter_records(path, chunk_size=5)) == RECORDS
@@ -0,0 +1,241 @@
+# backend/tests/test_response_cache.py
+
+import asyncio
+import os
+import sys
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.api.v1.endpoints import feedback, search
+from app.config import Config
+from app.core import feedback_writer, response_cache
+from app.core.response_cache import (
+    MemoryResponseStore,
+    ResponseCache,
+    etag_matches,
+    response_cache_ttl,
+    response_etag,
+)
+from app.core.search_pipeline import RankedCandidates
+from app.schemas.search import SearchRequest
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class BrokenStore:
+    backend = "broken"
+
+    async def get_version(self):
+        raise ConnectionError("down")
+
+    async def incr_version(self):
+        raise ConnectionError("down")
+
+    def stats(self):
+        return {}
+
+
+def test_request_key_normalizes_query_only():
+    key = ResponseCache.request_key
+    base = SearchRequest(query="Electrician  Helsinki", top_k=5, industry="Construction")
+
+    assert key(base) == key(SearchRequest(query="electrician helsinki", top_k=5, industry="Construction"))
+    assert key(base) == key(SearchRequest(query="electrician helsinki", top_k=None, industry="Construction"))
+    assert key(base) != key(SearchRequest(query="electrician helsinki", top_k=6, industry="Construction"))
+    assert key(base) != key(SearchRequest(query="electrician helsinki", top_k=5, industry="construction"))
+    assert key(base) != key(base.model_copy(update={"salary_range": {"min": 3000}}))
+
+
+def test_hit_then_invalidated_by_feedback_version():
+    cache = ResponseCache(MemoryResponseStore(8), ttl=60)
+
+    async def scenario():
+        version = await cache.version()
+        await cache.put("k", version, {"results": [1]})
+        hit = await cache.get("k", await cache.version())
+
+        await cache.invalidate()
+        miss = await cache.get("k", await cache.version())
+        return hit, miss
+
+    assert run(scenario()) == ({"results": [1]}, None)
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_result_computed_before_a_vote_is_never_served():
+    cache = ResponseCache(MemoryResponseStore(8), ttl=60)
+
+    async def scenario():
+        started_at = await cache.version()
+        await cache.invalidate()                       # vote lands mid-search
+        await cache.put("k", started_at, {"stale": True})
+        return await cache.get("k", await cache.version())
+
+    assert run(scenario()) is None
+
+
+def test_memory_store_lru_and_ttl(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    store = MemoryResponseStore(2)
+
+    async def scenario():
+        await store.set("a", {"v": 1}, 10)
+        await store.set("b", {"v": 2}, 0)
+        await store.get("a")
+        await store.set("c", {"v": 3}, 0)              # evicts "b"
+        evicted = await store.get("b")
+        now[0] += 11
+        expired = await store.get("a")
+        return evicted, expired, await store.get("c")
+
+    assert run(scenario()) == (None, None, {"v": 3})
+    assert store.stats()["evictions"] == 1
+
+
+def test_backend_errors_bypass_the_cache():
+    cache = ResponseCache(BrokenStore(), ttl=60)
+
+    assert run(cache.version()) is None
+    assert run(cache.get("k", None)) is None
+    run(cache.invalidate())
+    assert cache.stats()["errors"] == 2
+
+
+def test_disabled_cache():
+    cache = ResponseCache(None, ttl=60)
+    assert run(cache.version()) is None
+    assert cache.stats() == {"backend": "none"}
+
+
+@pytest.mark.parametrize("backend, cache_ttl, rules_ttl, expected", [
+    ("memory", 300, 60, 60),
+    ("memory", 30, 60, 30),
+    ("memory", 0, 60, 60),
+    ("memory", 300, 0, 300),
+    ("redis", 300, 60, 300),
+])
+def test_memory_ttl_is_capped_by_rules_ttl(monkeypatch, backend, cache_ttl, rules_ttl, expected):
+    monkeypatch.setattr(Config, "SEARCH_CACHE_BACKEND", backend)
+    monkeypatch.setattr(Config, "SEARCH_CACHE_TTL", cache_ttl)
+    monkeypatch.setattr(Config, "FEEDBACK_RULES_TTL", rules_ttl)
+    assert response_cache_ttl() == expected
+
+
+def test_etags():
+    etag = response_etag({"b": 1, "a": [1, 2]})
+    assert etag == response_etag({"a": [1, 2], "b": 1})
+    assert etag.startswith('"') and etag.endswith('"')
+
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+# ---------------------------
+# /search and the feedback write paths
+# ---------------------------
+CANDIDATE = {
+    "id": "c1", "name": "Aino", "industry": "Construction", "category": "Electrical",
+    "role": "Sähköasentaja", "role_en": "Electrician", "skills": ["wiring"], "experience_years": 6,
+    "education": {"degree": "Vocational"}, "additional_education": [], "licenses": [],
+    "location": {"city": "Lahti"}, "languages": [], "salary": 3600, "availability": "immediately",
+    "applicable_tes": "Sähköistysalan TES", "summary": "Site electrician", "qualification_issues": [],
+    "score": 91.5,
+}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    cache = ResponseCache(MemoryResponseStore(8), ttl=60)
+    searches = []
+
+    async def retrieve_ranked_candidates(request):
+        searches.append(request.query)
+        return RankedCandidates([dict(CANDIDATE)], "", None)
+
+    async def explain_candidates(query, ranked):
+        return {"c1": "Licensed electrician"}
+
+    async def run_in_session(fn, *args):
+        return None
+
+    async def no_op(*args):
+        return None
+
+    for module in (search, feedback, feedback_writer):
+        monkeypatch.setattr(module, "search_cache", cache)
+    monkeypatch.setattr(search, "retrieve_ranked_candidates", retrieve_ranked_candidates)
+    monkeypatch.setattr(search, "explain_candidates", explain_candidates)
+    monkeypatch.setattr(feedback, "run_in_session", run_in_session)
+    monkeypatch.setattr(feedback, "after_feedback_write", no_op)
+    monkeypatch.setattr(feedback_writer, "run_in_session", run_in_session)
+    monkeypatch.setattr(feedback_writer, "push_feedback_scores", no_op)
+    monkeypatch.setattr(Config, "FEEDBACK_WRITE_MODE", "sync")
+
+    app = FastAPI()
+    app.include_router(search.router)
+    app.include_router(feedback.router)
+    client = TestClient(app)
+    client.searches = searches
+    return client
+
+
+def search_request(client, **headers):
+    return client.post("/search", json={"query": "electrician", "top_k": 5}, headers=headers)
+
+
+def test_repeated_search_is_served_from_cache(api):
+    first = search_request(api)
+    second = search_request(api)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert first.json()["results"][0]["explanation"] == "Licensed electrician"
+    assert second.headers["etag"] == first.headers["etag"]
+    assert api.searches == ["electrician"]
+
+
+def test_feedback_write_invalidates_cached_search(api):
+    assert search_request(api).status_code == 200
+    vote = api.post("/feedback", json={"candidate_id": "c1", "feedback_type": "down"})
+    assert search_request(api).status_code == 200
+
+    assert vote.status_code == 200
+    assert api.searches == ["electrician", "electrician"]
+
+
+def test_write_behind_flush_invalidates_cached_search(api):
+    assert search_request(api).status_code == 200
+
+    writer = feedback_writer.FeedbackWriter(flush_size=1, flush_interval=1, max_pending=10)
+
+    async def vote():
+        await writer.submit([feedback_writer.prepare_feedback({"candidate_id": "c1", "feedback_type": "up"})])
+        await writer.flush()
+
+    asyncio.run(vote())
+    assert search_request(api).status_code == 200
+
+    assert api.searches == ["electrician", "electrician"]
+
+
+def test_if_none_match_returns_304(api):
+    etag = search_request(api).headers["etag"]
+
+    cached = search_request(api, **{"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert cached.headers["cache-control"] == Config.SEARCH_CACHE_CONTROL
+
+    assert search_request(api, **{"If-None-Match": '"other"'}).status_code == 200
@@ -0,0 +1,183 @@
+# backend/tests/test_search_pagination.py
+
+import asyncio
+import base64
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+
+from app.api.v1.endpoints.search import search_candidates_next_page
+from app.config import Config
+from app.core import response_cache, search_pagination
+from app.core.response_cache import MemoryResponseStore
+from app.core.search_pagination import SnapshotExpired, decode_cursor, encode_cursor, _next_cursor
+from app.core.search_pipeline import RankedCandidates
+from app.schemas.search import SearchRequest
+
+
+def raw_cursor(data):
+    return base64.urlsafe_b64encode(json.dumps(data).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_round_trip_is_url_safe_and_unpadded():
+    cursor = encode_cursor("ab-_cd", 20, 10)
+
+    assert decode_cursor(cursor) == ("ab-_cd", 20, 10)
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+
+@pytest.mark.parametrize("snapshot_id", ["a", "ab", "abc", "abcd"])
+def test_round_trip_for_every_padding_length(snapshot_id):
+    assert decode_cursor(encode_cursor(snapshot_id, 0, 1)) == (snapshot_id, 0, 1)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not a cursor",
+    "%%%",
+    raw_cursor([1, 2, 3]),
+    raw_cursor({"s": "x", "o": 0}),
+    raw_cursor({"s": "x", "o": "zero", "n": 10}),
+    raw_cursor({"s": "x", "o": -1, "n": 10}),
+    raw_cursor({"s": "x", "o": 0, "n": 0}),
+    raw_cursor({"s": "x", "o": 0, "n": Config.MAX_TOP_K + 1}),
+])
+def test_invalid_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_next_cursor_stops_at_the_end_of_the_ranking():
+    assert decode_cursor(_next_cursor("s", 0, 10, 25)) == ("s", 10, 10)
+    assert decode_cursor(_next_cursor("s", 10, 10, 25)) == ("s", 20, 10)
+    assert _next_cursor("s", 20, 10, 25) is None
+    assert _next_cursor("s", 0, 10, 10) is None
+
+
+class StubVectorSearch:
+    """
+    Live candidates: point id -> payload. The ranking returned by the
+    pipeline follows `order`, which tests reshuffle between pages.
+    """
+
+    def __init__(self, count):
+        self.payloads = {i: {"name": f"c{i}", "industry": "Construction"} for i in range(count)}
+        self.order = list(range(count))
+
+    def ranked(self, top_k):
+        return [
+            {"ranking": rank, "point_id": i, "id": i, "score": 100.0 - rank, **self.payloads[i]}
+            for rank, i in enumerate(self.order[:top_k], 1)
+        ]
+
+    async def get_candidates(self, point_ids):
+        return {i: self.payloads[i] for i in point_ids if i in self.payloads}
+
+
+@pytest.fixture
+def pager(monkeypatch):
+    vector_search = StubVectorSearch(25)
+    explained = []
+
+    async def retrieve_ranked_candidates(request):
+        return RankedCandidates(vector_search.ranked(request.top_k), "Prioritize salary.", None)
+
+    async def explain_candidates(query, ranked):
+        explained.append([c["id"] for c in ranked.candidates])
+        return {c["id"]: f"why {c['id']}" for c in ranked.candidates}
+
+    monkeypatch.setattr(Config, "SEARCH_PAGE_DEPTH", 20)
+    monkeypatch.setattr(search_pagination, "snapshot_store", MemoryResponseStore(8))
+    monkeypatch.setattr(search_pagination, "retrieve_ranked_candidates", retrieve_ranked_candidates)
+    monkeypatch.setattr(search_pagination, "explain_candidates", explain_candidates)
+    monkeypatch.setattr(search_pagination, "require_vector_search", lambda: vector_search)
+    vector_search.explained = explained
+    return vector_search
+
+
+def walk(request):
+    async def pages():
+        page = await search_pagination.first_page(request)
+        result = [page]
+        while page["next_cursor"]:
+            page = await search_pagination.next_page(page["next_cursor"])
+            result.append(page)
+        return result
+    return asyncio.run(pages())
+
+
+def test_pages_cover_the_snapshot_once(pager):
+    pages = walk(SearchRequest(query="electrician", top_k=8))
+
+    ids = [item["id"] for page in pages for item in page["results"]]
+    assert ids == list(range(20))                     # SEARCH_PAGE_DEPTH, no gaps or repeats
+    assert [len(page["results"]) for page in pages] == [8, 8, 4]
+    assert all(page["total"] == 20 for page in pages)
+    assert pages[-1]["next_cursor"] is None
+    assert pages[1]["results"][0]["explanation"] == "why 8"
+    # Gemini only ever sees one page
+    assert pager.explained == [list(range(8)), list(range(8, 16)), list(range(16, 20))]
+
+
+def test_later_pages_follow_the_snapshot_not_the_live_ranking(pager):
+    async def scenario():
+        first = await search_pagination.first_page(SearchRequest(query="electrician", top_k=5))
+
+        pager.order.reverse()                          # votes reshuffle the live ranking
+        pager.payloads[6]["name"] = "renamed"
+        del pager.payloads[7]                          # deleted since the snapshot
+
+        return first, await search_pagination.next_page(first["next_cursor"])
+
+    first, second = asyncio.run(scenario())
+
+    assert [item["id"] for item in first["results"]] == [0, 1, 2, 3, 4]
+    assert [item["id"] for item in second["results"]] == [5, 6, 8, 9]
+    assert second["results"][1]["name"] == "renamed"
+    assert second["results"][0]["match_score"] == 94.0           # snapshot score
+    assert decode_cursor(second["next_cursor"])[1] == 10
+
+
+def test_page_size_is_capped_and_depth_covers_one_page(pager, monkeypatch):
+    monkeypatch.setattr(Config, "SEARCH_PAGE_DEPTH", 3)
+
+    pages = walk(SearchRequest(query="electrician", top_k=Config.MAX_TOP_K))
+    assert len(pages) == 1
+    assert pages[0]["next_cursor"] is None
+    assert pages[0]["total"] == min(Config.MAX_TOP_K, 25)
+
+
+def test_expired_snapshot(pager, monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(response_cache.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(Config, "SEARCH_SNAPSHOT_TTL", 60)
+
+    async def scenario():
+        first = await search_pagination.first_page(SearchRequest(query="electrician", top_k=5))
+        now[0] += 61
+        await search_pagination.next_page(first["next_cursor"])
+
+    with pytest.raises(SnapshotExpired):
+        asyncio.run(scenario())
+
+
+def test_unknown_snapshot_expires(pager):
+    with pytest.raises(SnapshotExpired):
+        asyncio.run(search_pagination.next_page(encode_cursor("gone", 10, 10)))
+
+
+@pytest.mark.parametrize("cursor, status", [
+    ("garbage", 400),
+    (raw_cursor({"s": "x", "o": -5, "n": 10}), 400),
+    (encode_cursor("gone", 10, 10), 410),
+])
+def test_page_endpoint_maps_cursor_errors(pager, cursor, status):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(search_candidates_next_page(cursor))
+    assert error.value.status_code == status
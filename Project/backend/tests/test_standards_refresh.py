@@ -0,0 +1,93 @@
+# backend/tests/test_standards_refresh.py
+
+import asyncio
+import os
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import Config
+from app.core.vector_search import STANDARDS_RETRY_INTERVAL, VectorSearch
+
+
+class FakeQdrant:
+    """
+    Standards collection whose scroll fails while `down` and takes a
+    moment, so concurrent requests overlap with a load.
+    """
+
+    def __init__(self):
+        self.down = True
+        self.scrolls = 0
+        self.build_version = "v1"
+
+    async def get_collection(self, collection_name):
+        return SimpleNamespace(config=SimpleNamespace(metadata={"build_version": self.build_version}))
+
+    async def scroll(self, collection_name, limit, offset, with_payload, with_vectors):
+        self.scrolls += 1
+        await asyncio.sleep(0.01)
+        if self.down:
+            raise ConnectionError("qdrant down")
+        return [SimpleNamespace(payload={"industry": "Construction", "title": "Electrician"})], None
+
+
+@pytest.fixture
+def vector_search(monkeypatch):
+    monkeypatch.setattr(Config, "STANDARDS_REFRESH_INTERVAL", 300)
+    vector_search = VectorSearch.__new__(VectorSearch)
+    vector_search.client = FakeQdrant()
+    vector_search.standards = {}
+    vector_search.standard_queries = {}
+    vector_search.standards_version = None
+    vector_search.standards_loaded = False
+    vector_search.standards_checked_at = 0.0
+    vector_search.build_standard_query = lambda payload: payload.get("title", "")
+    return vector_search
+
+
+def refresh_concurrently(vector_search, requests=20):
+    async def burst():
+        await asyncio.gather(*(vector_search.refresh_standards() for _ in range(requests)))
+    asyncio.run(burst())
+
+
+def age(vector_search, seconds):
+    # Move the last check back instead of patching time.monotonic, which the event loop uses
+    vector_search.standards_checked_at -= seconds
+
+
+def test_failed_load_is_retried_once_per_interval_not_per_request(vector_search):
+    refresh_concurrently(vector_search)
+    assert vector_search.client.scrolls == 1
+    assert not vector_search.standards_loaded
+
+    age(vector_search, STANDARDS_RETRY_INTERVAL - 5)
+    refresh_concurrently(vector_search)
+    assert vector_search.client.scrolls == 1
+
+    age(vector_search, 5)
+    vector_search.client.down = False
+    refresh_concurrently(vector_search)
+    assert vector_search.client.scrolls == 2
+    assert vector_search.standards_loaded
+    assert vector_search.standard_queries == {"Construction": "Electrician"}
+
+
+def test_loaded_standards_reload_only_when_the_version_changes(vector_search):
+    vector_search.client.down = False
+    asyncio.run(vector_search.load_standards())
+    assert vector_search.client.scrolls == 1
+
+    age(vector_search, 301)
+    refresh_concurrently(vector_search)
+    assert vector_search.client.scrolls == 1             # same build version
+
+    age(vector_search, 301)
+    vector_search.client.build_version = "v2"
+    refresh_concurrently(vector_search)
+    assert vector_search.client.scrolls == 2
+    assert vector_search.standards_version == "v2"